@@ -7,18 +7,22 @@ the workflow for a given submission.
 
 
 import logging
+from collections import defaultdict
 
 from django.conf import settings
 from django.db import DatabaseError, IntegrityError, transaction
 from django.utils import timezone
 
 from submissions import api as sub_api
+from submissions.models import ScoreSummary
 from openassessment.assessment.errors import (PeerAssessmentInternalError, PeerAssessmentRequestError,
                                               PeerAssessmentWorkflowError)
 from openassessment.assessment.models import (Assessment, AssessmentFeedback, AssessmentPart, InvalidRubricSelection,
-                                              PeerWorkflow, PeerWorkflowItem, PeerGradingStrategy)
+                                              PeerWorkflow, PeerWorkflowItem, PeerGradingStrategy, Rubric)
 from openassessment.assessment.serializers import (AssessmentFeedbackSerializer, InvalidRubric, RubricSerializer,
-                                                   full_assessment_dict, rubric_from_dict, serialize_assessments)
+                                                   full_assessment_dict, rubric_from_dict, rubric_max_scores,
+                                                   serialize_assessments)
+from openassessment.assessment.score_type_constants import STAFF_TYPE
 
 logger = logging.getLogger("openassessment.assessment.api.peer")  # pylint: disable=invalid-name
 
@@ -38,14 +42,14 @@ def flexible_peer_grading_enabled(peer_requirements, course_settings):
     return peer_requirements.get("enable_flexible_grading")
 
 
-def flexible_peer_grading_active(submission_uuid, peer_requirements, course_settings):
+def flexible_peer_grading_active(submission_uuid, peer_requirements, course_settings, context=None):
     """
     Is flexible peer grading on, and has enough time elapsed since submission to enable it?
     """
     if not flexible_peer_grading_enabled(peer_requirements, course_settings):
         return False
 
-    submission = sub_api.get_submission(submission_uuid)
+    submission = context.submission if context is not None else sub_api.get_submission(submission_uuid)
     # find how many days elapsed since subimitted
     days_elapsed = (timezone.now().date() - submission['submitted_at'].date()).days
     # check if flexible grading applies. if it does, then update must_grade
@@ -71,7 +75,7 @@ def get_peer_grading_strategy(workflow_requirements):
     )
 
 
-def required_peer_grades(submission_uuid, peer_requirements, course_settings):
+def required_peer_grades(submission_uuid, peer_requirements, course_settings, context=None):
     """
     Given a submission id, finds how many peer assessment required.
 
@@ -80,13 +84,14 @@ def required_peer_grades(submission_uuid, peer_requirements, course_settings):
         peer_requirements (dict): Dictionary with the key "must_grade" indicating
             the required number of submissions the student must grade
             and "enable_flexible_grading" indicating if flexible grading enabled.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
         int
     """
 
     must_grade = peer_requirements["must_be_graded_by"]
-    if flexible_peer_grading_active(submission_uuid, peer_requirements, course_settings):
+    if flexible_peer_grading_active(submission_uuid, peer_requirements, course_settings, context):
         must_grade = int(must_grade * FLEXIBLE_PEER_GRADING_GRADED_BY_PERCENTAGE / 100)
         if must_grade == 0:
             must_grade = 1
@@ -109,7 +114,7 @@ def can_be_skipped(submission_uuid, peer_requirements):  # pylint: disable=unuse
     return peer_requirements is not None
 
 
-def submitter_is_finished(submission_uuid, peer_requirements):
+def submitter_is_finished(submission_uuid, peer_requirements, context=None):
     """
     Check whether the submitter has made the required number of assessments.
 
@@ -121,6 +126,7 @@ def submitter_is_finished(submission_uuid, peer_requirements):
         submission_uuid (str): The UUID of the submission being tracked.
         peer_requirements (dict): Dictionary with the key "must_grade" indicating
             the required number of submissions the student must grade.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
         bool
@@ -130,12 +136,19 @@ def submitter_is_finished(submission_uuid, peer_requirements):
         return False
 
     try:
-        workflow = PeerWorkflow.objects.get(submission_uuid=submission_uuid)
+        if context is not None:
+            workflow = context.peer_workflow
+            if workflow is None:
+                return False
+        else:
+            workflow = PeerWorkflow.objects.get(submission_uuid=submission_uuid)
+
         if workflow.completed_at is not None:
             return True
-        elif workflow.num_peers_graded() >= peer_requirements["must_grade"]:
+        num_peers_graded = context.peers_graded_count if context is not None else workflow.num_peers_graded()
+        if num_peers_graded >= peer_requirements["must_grade"]:
             workflow.completed_at = timezone.now()
-            workflow.save()
+            workflow.save(update_fields=['completed_at'])
             return True
         return False
     except PeerWorkflow.DoesNotExist:
@@ -144,11 +157,16 @@ def submitter_is_finished(submission_uuid, peer_requirements):
         raise PeerAssessmentRequestError('Requirements dict must contain "must_grade" key') from ex
 
 
-def get_graded_by_count(submission_uuid):
+def get_graded_by_count(submission_uuid, context=None):
     """
     Retrieve the number of peer assessments the submitter has received.
     Returns None if no submission with this ID.
     """
+    if context is not None:
+        if context.peer_workflow is None:
+            return None
+        return len(context.peer_graded_by_items)
+
     workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
     if workflow is None:
         return None
@@ -160,7 +178,7 @@ def get_graded_by_count(submission_uuid):
     return scored_items.count()
 
 
-def assessment_is_finished(submission_uuid, peer_requirements, course_settings):
+def assessment_is_finished(submission_uuid, peer_requirements, course_settings, context=None):
     """
     Check whether the submitter has received enough assessments
     to get a score.
@@ -174,6 +192,7 @@ def assessment_is_finished(submission_uuid, peer_requirements, course_settings):
         peer_requirements (dict): Dictionary with the key "must_be_graded_by"
             indicating the required number of assessments the student
             must receive to get a score.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
 
@@ -182,14 +201,14 @@ def assessment_is_finished(submission_uuid, peer_requirements, course_settings):
     if not peer_requirements:
         return False
 
-    count = get_graded_by_count(submission_uuid)
+    count = get_graded_by_count(submission_uuid, context)
     if count is None:
         return False
 
-    return count >= required_peer_grades(submission_uuid, peer_requirements, course_settings)
+    return count >= required_peer_grades(submission_uuid, peer_requirements, course_settings, context)
 
 
-def on_start(submission_uuid):
+def on_start(submission_uuid, context=None):
     """Create a new peer workflow for a student item and submission.
 
     Creates a unique peer workflow for a student item, associated with a
@@ -197,6 +216,8 @@ def on_start(submission_uuid):
 
     Args:
         submission_uuid (str): The submission associated with this workflow.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
+            Nothing is done if it has already loaded the peer workflow.
 
     Returns:
         None
@@ -207,16 +228,24 @@ def on_start(submission_uuid):
             creating the Workflow.
 
     """
+    if context is not None:
+        if context.is_loaded("peer_workflow") and context.peer_workflow is not None:
+            return
+        # Whether it is created here or by someone else, the workflow is about to exist.
+        context.invalidate("peer_workflow")
+
     try:
         with transaction.atomic():
-            submission = sub_api.get_submission_and_student(submission_uuid)
-            workflow, __ = PeerWorkflow.objects.get_or_create(
+            if context is not None:
+                submission = context.submission
+            else:
+                submission = sub_api.get_submission_and_student(submission_uuid)
+            PeerWorkflow.objects.get_or_create(
                 student_id=submission['student_item']['student_id'],
                 course_id=submission['student_item']['course_id'],
                 item_id=submission['student_item']['item_id'],
                 submission_uuid=submission_uuid
             )
-            workflow.save()
     except IntegrityError:
         # If we get an integrity error, it means someone else has already
         # created a workflow for this submission, so we don't need to do anything.
@@ -231,7 +260,7 @@ def on_start(submission_uuid):
         raise PeerAssessmentInternalError(error_message) from ex
 
 
-def get_score(submission_uuid, peer_requirements, course_settings):
+def get_score(submission_uuid, peer_requirements, course_settings, context=None):
     """
     Retrieve a score for a submission if requirements have been satisfied.
 
@@ -241,6 +270,7 @@ def get_score(submission_uuid, peer_requirements, course_settings):
             indicating the required number of assessments the student
             must receive to get a score.
         course_settings (dict): Dictionary with course-level settings
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
         A dictionary with the points earned, points possible, and
@@ -252,59 +282,75 @@ def get_score(submission_uuid, peer_requirements, course_settings):
         return None
 
     # User hasn't completed their own submission yet
-    if not submitter_is_finished(submission_uuid, peer_requirements):
+    if not submitter_is_finished(submission_uuid, peer_requirements, context):
         return None
 
-    workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
+    if context is not None:
+        workflow = context.peer_workflow
+    else:
+        workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
 
     if workflow is None:
         return None
 
     # Retrieve the assessments in ascending order by score date,
     # because we want to use the *first* one(s) for the score.
-    items = workflow.graded_by.filter(
-        assessment__submission_uuid=submission_uuid,
-        assessment__score_type=PEER_TYPE
-    ).order_by('-assessment')
+    if context is not None:
+        items = context.peer_graded_by_items
+    else:
+        items = list(workflow.graded_by.filter(
+            assessment__submission_uuid=submission_uuid,
+            assessment__score_type=PEER_TYPE
+        ).select_related('assessment').order_by('-assessment'))
 
     # Check if enough peers have graded this submission
     # This value will be the number configured on the peer step, or the reduced number if flexible
     # peer grading is active
-    num_required_peer_grades = required_peer_grades(submission_uuid, peer_requirements, course_settings)
-    num_recieved_peer_grades = items.count()
+    num_required_peer_grades = required_peer_grades(submission_uuid, peer_requirements, course_settings, context)
+    num_recieved_peer_grades = len(items)
     if num_recieved_peer_grades < num_required_peer_grades:
         return None
 
     # If we are in a scenario where flexible grading is active, but we have more peer grades than
     # flexible would reduces us to need, use as many grades as we can to generate the grade
     # (up to the defined requirement on the peer step)
-    if flexible_peer_grading_active(submission_uuid, peer_requirements, course_settings):
+    if flexible_peer_grading_active(submission_uuid, peer_requirements, course_settings, context):
         num_required_peer_grades = min(
             num_recieved_peer_grades,
             peer_requirements['must_be_graded_by']
         )
 
-    # Unfortunately, we cannot use update() after taking a slice,
-    # so we need to update the and save the items individually.
-    # One might be tempted to first query for the first n assessments,
-    # then select items that have those assessments.
-    # However, this generates a SQL query with a LIMIT in a subquery,
-    # which is not supported by some versions of MySQL.
-    # Although this approach generates more database queries, the number is likely to
-    # be relatively small (at least 1 and very likely less than 5).
+    # Mark the first n items as scored. We cannot use update() after taking a slice,
+    # and selecting items by a sliced subquery puts a LIMIT in a subquery, which some
+    # versions of MySQL do not support, so the ids are taken from the loaded items instead.
+    newly_scored_items = []
     for scored_item in items[:num_required_peer_grades]:
         # If we've already gone through and marked items as scored, that should
         # not change; if we've found a scored item we've done it already and should stop
         if scored_item.scored:
             break
-        scored_item.scored = True
-        scored_item.save()
+        newly_scored_items.append(scored_item)
+    if newly_scored_items:
+        PeerWorkflowItem.objects.filter(id__in=[item.id for item in newly_scored_items]).update(scored=True)
+        for scored_item in newly_scored_items:
+            scored_item.scored = True
     assessments = [item.assessment for item in items]
 
-    scores_dict = get_assessment_scores_with_grading_strategy(
-        submission_uuid,
-        peer_requirements,
+    scored_items = sorted(
+        (item for item in items if item.scored),
+        key=lambda item: (item.started_at, item.id)
     )
+    try:
+        scores_dict = _get_score_dict_with_grading_strategy(
+            [item.assessment for item in scored_items],
+            peer_requirements,
+        )
+    except DatabaseError as ex:
+        error_message = (
+            "Error getting assessment median scores for submission {uuid}"
+        ).format(uuid=submission_uuid)
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message) from ex
     return {
         "points_earned": sum(scores_dict.values()),
         "points_possible": assessments[0].points_possible,
@@ -485,7 +531,7 @@ def _complete_assessment(  # pylint: disable=too-many-positional-arguments
     return assessment
 
 
-def get_rubric_max_scores(submission_uuid):
+def get_rubric_max_scores(submission_uuid, assessments=None):
     """Gets the maximum possible value for each criterion option
 
     Iterates over the rubric used to grade the given submission, and creates a
@@ -493,6 +539,9 @@ def get_rubric_max_scores(submission_uuid):
 
     Args:
         submission_uuid: The submission to get the associated rubric max scores.
+        assessments (list of dict): Optional serialized assessments of the
+            submission that the caller has already loaded. When given, the
+            rubric of the latest of them is used and no query is made.
     Returns:
         A dictionary of max scores for this rubric's criteria options. Returns
             None if no assessments are found for this submission.
@@ -500,25 +549,56 @@ def get_rubric_max_scores(submission_uuid):
         PeerAssessmentInternalError: Raised when there is an error retrieving
             the submission, or its associated rubric.
     """
+    assessments = [assessment for assessment in assessments or [] if assessment]
+    if assessments:
+        latest = max(assessments, key=lambda assessment: (assessment["scored_at"], assessment["id"]))
+        return rubric_max_scores(latest["rubric"])
+
+    return get_bulk_rubric_max_scores([submission_uuid])[submission_uuid]
+
+
+def get_bulk_rubric_max_scores(submission_uuids):
+    """Gets the maximum possible value for each criterion of many submissions.
+
+    Bulk variant of `get_rubric_max_scores` for reporting: the rubrics of the
+    latest assessments are looked up in one query, and the max scores of each
+    distinct rubric are read from the cache.
+
+    Args:
+        submission_uuids (list): The submissions to get the rubric max scores of.
+    Returns:
+        dict: Mapping of submission UUIDs to a dictionary of max scores for their
+            rubric's criteria, or None if no assessments are found for the submission.
+    Raises:
+        PeerAssessmentInternalError: Raised when there is an error retrieving
+            the submissions, or their associated rubrics.
+    """
+    submission_uuids = list(submission_uuids)
     try:
-        assessments = list(
-            Assessment.objects.filter(
-                submission_uuid=submission_uuid
-            ).order_by("-scored_at", "-id").select_related("rubric")[:1]
+        latest_rubrics = {}
+        rubric_rows = Assessment.objects.filter(
+            submission_uuid__in=submission_uuids
+        ).order_by("submission_uuid", "-scored_at", "-id").values_list(
+            "submission_uuid", "rubric_id", "rubric__content_hash", "rubric__structure_hash"
         )
-        if not assessments:
-            return None
+        for submission_uuid, rubric_id, content_hash, structure_hash in rubric_rows:
+            if submission_uuid not in latest_rubrics:
+                latest_rubrics[submission_uuid] = Rubric(
+                    id=rubric_id, content_hash=content_hash, structure_hash=structure_hash
+                )
 
-        assessment = assessments[0]
-        rubric_dict = RubricSerializer.serialized_from_cache(assessment.rubric)
+        max_scores_cache = {}
         return {
-            criterion["name"]: criterion["points_possible"]
-            for criterion in rubric_dict["criteria"]
+            submission_uuid: (
+                RubricSerializer.max_scores_from_cache(latest_rubrics[submission_uuid], max_scores_cache)
+                if submission_uuid in latest_rubrics else None
+            )
+            for submission_uuid in submission_uuids
         }
     except DatabaseError as ex:
         error_message = (
-            "Error getting rubric options max scores for submission uuid {uuid}"
-        ).format(uuid=submission_uuid)
+            "Error getting rubric options max scores for submission uuids {uuids}"
+        ).format(uuids=submission_uuids)
         logger.exception(error_message)
         raise PeerAssessmentInternalError(error_message) from ex
 
@@ -544,16 +624,11 @@ def get_assessment_scores_with_grading_strategy(submission_uuid, workflow_requir
         PeerAssessmentInternalError: If any error occurs while retrieving
             information to form the median/mean scores, an error is raised.
     """
-    current_grading_strategy = get_peer_grading_strategy(workflow_requirements)
     try:
         workflow = PeerWorkflow.objects.get(submission_uuid=submission_uuid)
         items = workflow.graded_by.filter(scored=True)
         assessments = [item.assessment for item in items]
-        scores = Assessment.scores_by_criterion(assessments)
-        return Assessment.get_score_dict(
-            scores,
-            grading_strategy=current_grading_strategy,
-        )
+        return _get_score_dict_with_grading_strategy(assessments, workflow_requirements)
     except PeerWorkflow.DoesNotExist:
         return {}
     except DatabaseError as ex:
@@ -564,7 +639,178 @@ def get_assessment_scores_with_grading_strategy(submission_uuid, workflow_requir
         raise PeerAssessmentInternalError(error_message) from ex
 
 
-def has_finished_required_evaluating(submission_uuid, required_assessments):
+def _get_score_dict_with_grading_strategy(assessments, workflow_requirements):
+    """
+    Calculate the score for each rubric criterion from already loaded assessments,
+    using the grading strategy of the peer requirements.
+
+    Args:
+        assessments (list): The scored peer assessments of a submission.
+        workflow_requirements (dict): Dictionary with the key "grading_strategy"
+
+    Returns:
+        dict: A dictionary of rubric criterion names,
+        with a median/mean score of the assessments.
+    """
+    scores = Assessment.scores_by_criterion(assessments)
+    return Assessment.get_score_dict(
+        scores,
+        grading_strategy=get_peer_grading_strategy(workflow_requirements),
+    )
+
+
+def recompute_peer_scores(course_id, grading_strategy, item_id=None):
+    """
+    Recompute the peer scores of every graded submission in a course or item
+    and report the ones that differ from the score currently recorded.
+
+    This is the bulk counterpart of `get_score`, used when an author switches
+    the grading strategy of a peer step or a scoring bug has to be corrected.
+    The parts of all peer assessments are loaded in one query: those of scored
+    assessments are reduced per submission with the same median / mean rules,
+    and points possible come from the rubric of the same assessment as in
+    `get_score`, so the result matches what it would return for each submission.
+
+    Submissions are left out when their peer workflow is cancelled, when they
+    have a staff assessment (which takes priority over peer scores), or when
+    their latest recorded score is not theirs (not yet scored, or reset).
+
+    Args:
+        course_id (str): The course to recompute.
+        grading_strategy (str): Either "median" or "mean".
+        item_id (str): Optionally restrict the recomputation to one item.
+
+    Returns:
+        list of dicts with the keys "submission_uuid", "old_points_earned",
+        "old_points_possible", "points_earned" and "points_possible", one
+        for each submission whose recomputed score differs, ordered by
+        submission uuid.
+
+    Raises:
+        PeerAssessmentRequestError: The grading strategy is not supported.
+        PeerAssessmentInternalError: Error loading the assessments or scores.
+
+    Examples:
+        >>> recompute_peer_scores("course-v1:edX+Demo+2024", "mean")
+        [
+            {
+                'submission_uuid': 'b2ff2a1e-...',
+                'old_points_earned': 6,
+                'old_points_possible': 10,
+                'points_earned': 7,
+                'points_possible': 10,
+            }
+        ]
+    """
+    if grading_strategy not in (PeerGradingStrategy.MEDIAN, PeerGradingStrategy.MEAN):
+        raise PeerAssessmentRequestError(
+            "Unsupported grading strategy {strategy}".format(strategy=grading_strategy)
+        )
+
+    workflow_filters = {"course_id": course_id}
+    if item_id is not None:
+        workflow_filters["item_id"] = item_id
+
+    try:
+        current_scores = _get_current_scores(workflow_filters)
+        staff_graded = PeerWorkflow.objects.filter(
+            submission_uuid__in=Assessment.objects.filter(score_type=STAFF_TYPE).values("submission_uuid"),
+            **workflow_filters
+        ).values_list("submission_uuid", flat=True)
+        for submission_uuid in staff_graded:
+            current_scores.pop(submission_uuid, None)
+
+        parts = PeerWorkflowItem.objects.filter(
+            author__cancelled_at__isnull=True,
+            assessment__score_type=PEER_TYPE,
+            **{"author__{}".format(field): value for field, value in workflow_filters.items()}
+        ).values_list(
+            "author__submission_uuid",
+            "scored",
+            "assessment__scored_at",
+            "assessment_id",
+            "assessment__rubric_id",
+            "assessment__parts__criterion__name",
+            "assessment__parts__option__points",
+        )
+
+        scores = defaultdict(lambda: defaultdict(list))
+        first_assessments = {}
+        for submission_uuid, scored, scored_at, assessment_id, rubric_id, criterion_name, points in parts.iterator():
+            if submission_uuid not in current_scores:
+                continue
+            # As in `get_score`, points possible come from the rubric of the first peer
+            # assessment in the items' "-assessment" order, whether or not it is scored
+            first = first_assessments.get(submission_uuid)
+            if first is None or (scored_at, assessment_id) < first[:2]:
+                first_assessments[submission_uuid] = (scored_at, assessment_id, rubric_id)
+            if not scored:
+                continue
+            criterion_scores = scores[submission_uuid]
+            if criterion_name is not None:
+                # By convention, a part with no option (only feedback) earns 0 points
+                criterion_scores[criterion_name].append(points or 0)
+
+        points_possible = Rubric.bulk_points_possible(
+            {rubric_id for __, __, rubric_id in first_assessments.values()}
+        )
+    except DatabaseError as ex:
+        error_message = "Error recomputing peer scores for course {course_id}, item {item_id}".format(
+            course_id=course_id, item_id=item_id
+        )
+        logger.exception(error_message)
+        raise PeerAssessmentInternalError(error_message) from ex
+
+    changes = []
+    for submission_uuid in sorted(scores):
+        old_points_earned, old_points_possible = current_scores[submission_uuid]
+        score_dict = Assessment.get_score_dict(scores[submission_uuid], grading_strategy)
+        new_points_earned = sum(score_dict.values())
+        new_points_possible = points_possible[first_assessments[submission_uuid][2]]
+        if (new_points_earned, new_points_possible) != (old_points_earned, old_points_possible):
+            changes.append({
+                "submission_uuid": submission_uuid,
+                "old_points_earned": old_points_earned,
+                "old_points_possible": old_points_possible,
+                "points_earned": new_points_earned,
+                "points_possible": new_points_possible,
+            })
+    return changes
+
+
+def apply_peer_score_changes(changes):
+    """
+    Record the scores reported by `recompute_peer_scores`.
+
+    Args:
+        changes (list): The dicts returned by `recompute_peer_scores`.
+
+    Returns:
+        int: The number of scores recorded.
+    """
+    for change in changes:
+        sub_api.set_score(change["submission_uuid"], change["points_earned"], change["points_possible"])
+    return len(changes)
+
+
+def _get_current_scores(workflow_filters):
+    """
+    Map the submission uuid of each peer workflow matching the filters to the
+    (points earned, points possible) of its student item's latest score, for
+    the student items whose latest score belongs to that submission.
+    """
+    latest_scores = ScoreSummary.objects.filter(
+        latest__reset=False,
+        latest__submission__isnull=False,
+        **{"student_item__{}".format(field): value for field, value in workflow_filters.items()}
+    ).values_list("latest__submission__uuid", "latest__points_earned", "latest__points_possible")
+    return {
+        str(submission_uuid): (points_earned, points_possible)
+        for submission_uuid, points_earned, points_possible in latest_scores.iterator()
+    }
+
+
+def has_finished_required_evaluating(submission_uuid, required_assessments, context=None):
     """Check if a student still needs to evaluate more submissions
 
     Per the contract of the peer assessment workflow, a student must evaluate a
@@ -577,6 +823,7 @@ def has_finished_required_evaluating(submission_uuid, required_assessments):
         required_assessments (int): The number of assessments a student has to
             submit before receiving the feedback on their submission. This is a
             required argument.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
         tuple: True if the student has evaluated enough peer submissions to move
@@ -595,11 +842,14 @@ def has_finished_required_evaluating(submission_uuid, required_assessments):
         True, 3
 
     """
-    workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
+    if context is not None:
+        workflow = context.peer_workflow
+    else:
+        workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
     done = False
     peers_graded = 0
     if workflow:
-        peers_graded = workflow.num_peers_graded()
+        peers_graded = context.peers_graded_count if context is not None else workflow.num_peers_graded()
         done = (peers_graded >= required_assessments)
     return done, peers_graded
 
@@ -715,12 +965,11 @@ def get_submitted_assessments(submission_uuid, limit=None):
         # If no workflow is found associated with the uuid, this returns None,
         # and an empty set of assessments will be returned.
         workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
-        items = PeerWorkflowItem.objects.filter(
+        assessment_ids = PeerWorkflowItem.objects.filter(
             scorer=workflow,
             assessment__isnull=False
-        )
-        assessments = Assessment.objects.filter(
-            pk__in=[item.assessment.pk for item in items])[:limit]
+        ).values_list('assessment_id', flat=True)
+        assessments = Assessment.objects.filter(pk__in=list(assessment_ids))[:limit]
         return serialize_assessments(assessments)
     except DatabaseError as ex:
         error_message = (
@@ -819,18 +1068,26 @@ def get_submission_to_assess(submission_uuid, graded_by, peek=False):
 
     open_item = workflow.find_active_assessments()
     peer_submission_uuid = open_item.submission_uuid if open_item else None
+    claimed = False
     # If there is an active assessment for this user, get that submission,
     # otherwise, get the first assessment for review, otherwise,
     # get the first submission available for over grading ("over-grading").
     if peer_submission_uuid is None:
-        peer_submission_uuid = workflow.get_submission_for_review(graded_by)
+        if not peek and getattr(settings, "ORA_PEER_ATOMIC_ALLOCATION", False):
+            # Reserve the submission in the same transaction that selects it, so that
+            # simultaneous requests cannot hand it to more than graded_by reviewers.
+            peer_submission_uuid = workflow.claim_submission_for_review(graded_by)
+            claimed = peer_submission_uuid is not None
+        else:
+            peer_submission_uuid = workflow.get_submission_for_review(graded_by)
     if peer_submission_uuid is None:
         peer_submission_uuid = workflow.get_submission_for_over_grading()
     if peer_submission_uuid:
         try:
             submission_data = sub_api.get_submission(peer_submission_uuid)
             if not peek:
-                PeerWorkflow.create_item(workflow, peer_submission_uuid)
+                if not claimed:
+                    PeerWorkflow.create_item(workflow, peer_submission_uuid)
                 _log_workflow(peer_submission_uuid, workflow)
             return submission_data
         except sub_api.SubmissionNotFoundError as ex:
@@ -872,13 +1129,12 @@ def create_peer_workflow(submission_uuid):
     try:
         with transaction.atomic():
             submission = sub_api.get_submission_and_student(submission_uuid)
-            workflow, __ = PeerWorkflow.objects.get_or_create(
+            PeerWorkflow.objects.get_or_create(
                 student_id=submission['student_item']['student_id'],
                 course_id=submission['student_item']['course_id'],
                 item_id=submission['student_item']['item_id'],
                 submission_uuid=submission_uuid
             )
-            workflow.save()
     except IntegrityError:
         # If we get an integrity error, it means someone else has already
         # created a workflow for this submission, so we don't need to do anything.
@@ -1075,7 +1331,7 @@ def on_cancel(submission_uuid):
         workflow = PeerWorkflow.get_by_submission_uuid(submission_uuid)
         if workflow:
             workflow.cancelled_at = timezone.now()
-            workflow.save()
+            workflow.save(update_fields=['cancelled_at'])
     except (PeerAssessmentWorkflowError, DatabaseError) as ex:
         error_message = (
             "An internal error occurred while cancelling the peer"
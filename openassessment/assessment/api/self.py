@@ -17,7 +17,7 @@ from openassessment.assessment.score_type_constants import SELF_TYPE
 logger = logging.getLogger("openassessment.assessment.api.self")  # pylint: disable=invalid-name
 
 
-def submitter_is_finished(submission_uuid, self_requirements):  # pylint: disable=unused-argument
+def submitter_is_finished(submission_uuid, self_requirements, context=None):  # pylint: disable=unused-argument
     """
     Check whether a self-assessment has been completed for a submission.
 
@@ -26,18 +26,22 @@ def submitter_is_finished(submission_uuid, self_requirements):  # pylint: disabl
         self_requirements (dict): Any attributes of the assessment module required
             to determine if this assessment is complete. There are currently
             no requirements for a self-assessment.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
     Returns:
         True if the submitter has assessed their answer
     Examples:
         >>> submitter_is_finished('222bdf3d-a88e-11e3-859e-040ccee02800', {})
         True
     """
+    if context is not None:
+        return context.latest_assessment(SELF_TYPE) is not None
+
     return Assessment.objects.filter(
         score_type=SELF_TYPE, submission_uuid=submission_uuid
     ).exists()
 
 
-def assessment_is_finished(submission_uuid, self_requirements, _):
+def assessment_is_finished(submission_uuid, self_requirements, _, context=None):
     """
     Check whether a self-assessment has been completed. For self-assessment,
     this function is synonymous with submitter_is_finished.
@@ -47,16 +51,17 @@ def assessment_is_finished(submission_uuid, self_requirements, _):
         self_requirements (dict): Any attributes of the assessment module required
             to determine if this assessment is complete. There are currently
             no requirements for a self-assessment.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
     Returns:
         True if the assessment is complete.
     Examples:
         >>> assessment_is_finished('222bdf3d-a88e-11e3-859e-040ccee02800', {})
         True
     """
-    return submitter_is_finished(submission_uuid, self_requirements)
+    return submitter_is_finished(submission_uuid, self_requirements, context)
 
 
-def get_score(submission_uuid, self_requirements, course_settings):  # pylint: disable=unused-argument
+def get_score(submission_uuid, self_requirements, course_settings, context=None):  # pylint: disable=unused-argument
     """
     Get the score for this particular assessment.
 
@@ -64,6 +69,7 @@ def get_score(submission_uuid, self_requirements, course_settings):  # pylint: d
         submission_uuid (str): The unique identifier for the submission
         self_requirements (dict): Not used.
         course_settings (dict): Not used.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
     Returns:
         A dictionary with the points earned, points possible, and
         contributing_assessments information, along with a None staff_id.
@@ -74,6 +80,17 @@ def get_score(submission_uuid, self_requirements, course_settings):  # pylint: d
             'points_possible': 10
         }
     """
+    if context is not None:
+        assessment = context.latest_assessment(SELF_TYPE)
+        if assessment is None:
+            return None
+        return {
+            "points_earned": assessment.points_earned,
+            "points_possible": assessment.points_possible,
+            "contributing_assessments": [assessment.id],
+            "staff_id": None,
+        }
+
     assessment = get_assessment(submission_uuid)
     if not assessment:
         return None
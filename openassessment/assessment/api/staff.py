@@ -40,7 +40,7 @@ def submitter_is_finished(submission_uuid, staff_requirements):  # pylint: disab
     return True
 
 
-def assessment_is_finished(submission_uuid, staff_requirements, _):
+def assessment_is_finished(submission_uuid, staff_requirements, _, context=None):
     """
     Determine if the staff assessment step of the given submission is completed.
     This checks to see if staff have completed the assessment.
@@ -48,6 +48,7 @@ def assessment_is_finished(submission_uuid, staff_requirements, _):
     Args:
         submission_uuid (str): The UUID of the submission being graded.
         staff_requirements (dict): Any variables that may effect this state.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
         True if a staff assessment has been completed for this submission or if not required.
@@ -57,6 +58,8 @@ def assessment_is_finished(submission_uuid, staff_requirements, _):
         return False
 
     if staff_requirements.get('required', False):
+        if context is not None:
+            return context.latest_assessment(STAFF_TYPE) is not None
         return bool(get_latest_staff_assessment(submission_uuid))
 
     return True
@@ -132,7 +135,7 @@ def on_cancel(submission_uuid):
         raise StaffAssessmentInternalError(error_message) from ex
 
 
-def get_score(submission_uuid, staff_requirements, course_settings):  # pylint: disable=unused-argument
+def get_score(submission_uuid, staff_requirements, course_settings, context=None):  # pylint: disable=unused-argument
     """
     Generate a score based on a completed assessment for the given submission.
     If no assessment has been completed for this submission, this will return
@@ -142,12 +145,24 @@ def get_score(submission_uuid, staff_requirements, course_settings):  # pylint:
         submission_uuid (str): The UUID for the submission to get a score for.
         staff_requirements (dict): Not used.
         course_settings (dict): Not used.
+        context (WorkflowUpdateContext): Optional preloaded data of a workflow update.
 
     Returns:
         A dictionary with the points earned, points possible,
         contributing_assessments, and staff_id information.
 
     """
+    if context is not None:
+        assessment = context.latest_assessment(STAFF_TYPE)
+        if assessment is None:
+            return None
+        return {
+            "points_earned": assessment.points_earned,
+            "points_possible": assessment.points_possible,
+            "contributing_assessments": [assessment.id],
+            "staff_id": assessment.scorer_id,
+        }
+
     assessment = get_latest_staff_assessment(submission_uuid)
     if not assessment:
         return None
@@ -187,10 +202,10 @@ def get_latest_staff_assessment(submission_uuid):
 
     """
     try:
-        assessments = Assessment.objects.filter(
+        serialized_assessments = serialize_assessments(Assessment.objects.filter(
             submission_uuid=submission_uuid,
             score_type=STAFF_TYPE,
-        )[:1]
+        )[:1])
     except DatabaseError as ex:
         msg = (
             "An error occurred while retrieving staff assessments "
@@ -199,8 +214,8 @@ def get_latest_staff_assessment(submission_uuid):
         logger.exception(msg)
         raise StaffAssessmentInternalError(msg) from ex
 
-    if assessments:
-        return full_assessment_dict(assessments[0])
+    if serialized_assessments:
+        return serialized_assessments[0]
 
     return None
 
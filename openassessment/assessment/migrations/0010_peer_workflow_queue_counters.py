@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:46
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_queue_counters(apps, schema_editor):
+    """
+    Fill in the peer queue counters from each workflow's existing items.
+    """
+    PeerWorkflow = apps.get_model('assessment', 'PeerWorkflow')
+    PeerWorkflowItem = apps.get_model('assessment', 'PeerWorkflowItem')
+
+    authored_items = PeerWorkflowItem.objects.filter(author_id=OuterRef('pk')).order_by().values('author_id')
+    assessed_items = authored_items.filter(assessment__isnull=False)
+    reserved_items = authored_items.filter(assessment__isnull=True)
+    PeerWorkflow.objects.update(
+        assessed_count=Coalesce(Subquery(assessed_items.annotate(count=Count('id')).values('count')), Value(0)),
+        reserved_count=Coalesce(Subquery(reserved_items.annotate(count=Count('id')).values('count')), Value(0)),
+        last_reserved_at=Subquery(reserved_items.annotate(latest=Max('started_at')).values('latest')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0009_increase_item_id_max_length_peer_staff_studenttraining_workflows'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='peerworkflow',
+            name='assessed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='peerworkflow',
+            name='last_reserved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='peerworkflow',
+            name='reserved_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='peerworkflow',
+            index=models.Index(
+                fields=['course_id', 'item_id', 'grading_completed_at', 'cancelled_at', 'created_at', 'id'],
+                name='assessment_peer_queue_idx',
+            ),
+        ),
+        migrations.RunPython(populate_queue_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0010_peer_workflow_queue_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='stored_points_earned',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='stored_points_possible',
+            field=models.PositiveIntegerField(default=None, null=True),
+        ),
+    ]
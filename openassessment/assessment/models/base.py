@@ -13,13 +13,14 @@ need to then generate a matching migration for it using:
 """
 
 
-from collections import defaultdict
-from copy import deepcopy
+from collections import OrderedDict, defaultdict
 from hashlib import sha1
 import json
 import logging
 import math
+import threading
 
+from django.conf import settings
 from django.core.cache import cache
 from django.db import models
 from django.utils.functional import cached_property
@@ -88,6 +89,29 @@ class Rubric(models.Model):
         criteria_points = [crit.points_possible for crit in self.criteria.all()]
         return sum(criteria_points) if criteria_points else 0
 
+    @staticmethod
+    def bulk_points_possible(rubric_ids):
+        """
+        Batched version of `points_possible`, loading the options of all the rubrics in one query.
+
+        Args:
+            rubric_ids (iterable): The ids of the rubrics.
+
+        Returns:
+            dict mapping each rubric id to the total number of points that could be earned in that rubric.
+        """
+        max_points = defaultdict(int)
+        options = CriterionOption.objects.filter(criterion__rubric_id__in=rubric_ids).values_list(
+            "criterion__rubric_id", "criterion_id", "points"
+        )
+        for rubric_id, criterion_id, points in options:
+            max_points[(rubric_id, criterion_id)] = max(max_points[(rubric_id, criterion_id)], points)
+
+        points_possible = dict.fromkeys(rubric_ids, 0)
+        for (rubric_id, __), points in max_points.items():
+            points_possible[rubric_id] += points
+        return points_possible
+
     @lazy
     def index(self):
         """
@@ -98,7 +122,7 @@ class Rubric(models.Model):
             RubricIndex
 
         """
-        return RubricIndex(self)
+        return RUBRIC_INDEX_CACHE.get(self)
 
     @staticmethod
     def content_hash_from_dict(rubric_dict):
@@ -112,7 +136,8 @@ class Rubric(models.Model):
         database, the child object needs to have the ID of the parent, meaning
         that Rubric would have to have already been created and persisted.
         """
-        rubric_dict = deepcopy(rubric_dict)
+        # Only top-level keys are removed, so a shallow copy is enough
+        rubric_dict = dict(rubric_dict)
 
         # Neither "id" nor "content_hash" would count towards calculating the
         # content_hash.
@@ -296,6 +321,12 @@ class RubricIndex:
             for option in options
         }
 
+        # By convention, criteria with 0 options (only feedback) have 0 points possible
+        max_points = {}
+        for option in options:
+            max_points[option.criterion_id] = max(max_points.get(option.criterion_id, 0), option.points)
+        self.points_possible = sum(max_points.values())
+
     def find_criterion(self, criterion_name):
         """
         Find a criterion by its name.
@@ -418,6 +449,82 @@ class RubricIndex:
         return self._criteria_without_options
 
 
+class RubricIndexCache:
+    """
+    A bounded, thread-safe, least recently used cache of `RubricIndex`
+    objects, shared by the whole process.
+
+    Rubrics are never changed after they are written, so the index built for
+    a rubric's content hash stays valid, and freshly loaded `Rubric` models
+    can skip reloading their criteria and options.
+    """
+
+    def __init__(self, max_size):
+        """
+        Args:
+            max_size (int): The number of rubric indexes to keep.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, rubric):
+        """
+        Return the index of the rubric, building it on a miss.
+
+        Args:
+            rubric (Rubric): The Rubric model to index.
+
+        Returns:
+            RubricIndex
+        """
+        with self._lock:
+            rubric_index = self._indexes.get(rubric.content_hash)
+            # A rubric re-created under the same content hash gets new criteria / options
+            if rubric_index is not None and rubric_index.rubric.id == rubric.id:
+                self._indexes.move_to_end(rubric.content_hash)
+                self.hits += 1
+                return rubric_index
+            self.misses += 1
+
+        # Build the index outside of the lock, since it queries the database
+        rubric_index = RubricIndex(rubric)
+        if self.max_size > 0:
+            with self._lock:
+                self._indexes[rubric.content_hash] = rubric_index
+                self._indexes.move_to_end(rubric.content_hash)
+                while len(self._indexes) > self.max_size:
+                    self._indexes.popitem(last=False)
+        return rubric_index
+
+    def stats(self):
+        """
+        Returns:
+            dict with the number of "hits" and "misses", and the current and maximum "size".
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._indexes),
+                "max_size": self.max_size,
+            }
+
+    def clear(self):
+        """
+        Remove every index and reset the statistics.
+        """
+        with self._lock:
+            self._indexes.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+RUBRIC_INDEX_CACHE = RubricIndexCache(getattr(settings, "ORA_RUBRIC_INDEX_CACHE_SIZE", 256))
+
+
 class Assessment(models.Model):
     """An evaluation made against a particular Submission and Rubric.
 
@@ -430,6 +537,9 @@ class Assessment(models.Model):
     """
     MAX_FEEDBACK_SIZE = 1024 * 100
 
+    # Bump to stop reading scores cached by `scores_by_criterion` in an older format
+    SCORES_BY_CRITERION_CACHE_VERSION = 2
+
     submission_uuid = models.CharField(max_length=128, db_index=True)
     rubric = models.ForeignKey(Rubric, on_delete=models.CASCADE)
 
@@ -439,19 +549,44 @@ class Assessment(models.Model):
 
     feedback = models.TextField(max_length=10000, default="", blank=True)
 
+    # The score, written once when the assessment parts are created.
+    # Assessments made before these were added are null until backfilled
+    # with the `backfill_assessment_points` management command.
+    stored_points_earned = models.PositiveIntegerField(null=True, default=None)
+    stored_points_possible = models.PositiveIntegerField(null=True, default=None)
+
     class Meta:
         ordering = ["-scored_at", "-id"]
         app_label = "assessment"
 
     @property
     def points_earned(self):
+        if self.stored_points_earned is not None:
+            return self.stored_points_earned
         parts = [part.points_earned for part in self.parts.all()]
         return sum(parts) if parts else 0
 
     @property
     def points_possible(self):
+        if self.stored_points_possible is not None:
+            return self.stored_points_possible
         return self.rubric.points_possible
 
+    def store_points(self, parts, rubric_index):
+        """
+        Record the score of the assessment from its newly created parts.
+
+        Args:
+            parts (list of AssessmentPart): All the parts of the assessment.
+            rubric_index (RubricIndex): The index of the assessment's rubric.
+        """
+        self.stored_points_earned = sum(part.points_earned for part in parts)
+        self.stored_points_possible = rubric_index.points_possible
+        Assessment.objects.filter(pk=self.pk).update(
+            stored_points_earned=self.stored_points_earned,
+            stored_points_possible=self.stored_points_possible,
+        )
+
     def to_float(self):
         """
         Calculate the score percentage (points earned / points possible).
@@ -663,27 +798,113 @@ class Assessment(models.Model):
                 "bar": [6, 7, 8]
             }
         """
-        assessments = list(assessments)  # Force us to read it all
-        if not assessments:
-            return {}
+        return cls.bulk_scores_by_criterion({None: assessments})[None]
+
+    @classmethod
+    def bulk_scores_by_criterion(cls, assessments_by_key):
+        """Batched version of `scores_by_criterion`.
+
+        Scores are looked up in the cache for all the groups of assessments at
+        once. The parts of the assessments that are not cached are read from
+        their prefetched `parts` when those are loaded, and otherwise fetched
+        with their criterion names in a single query.
+
+        Args:
+            assessments_by_key (dict): Maps any key (usually a submission uuid)
+                to the list of assessments to sort scores for.
+
+        Returns:
+            dict: Maps each key to the `scores_by_criterion` dictionary of its
+                assessments.
+
+        Examples:
+            >>> Assessment.bulk_scores_by_criterion({
+            >>>     "abc123": Assessment.objects.filter(submission_uuid="abc123"),
+            >>>     "def456": Assessment.objects.filter(submission_uuid="def456"),
+            >>> })
+            {
+                "abc123": {"foo": [1, 2, 3], "bar": [6, 7, 8]},
+                "def456": {"foo": [3], "bar": [8]}
+            }
+        """
+        # Force us to read them all
+        assessments_by_key = {key: list(assessments) for key, assessments in assessments_by_key.items()}
+        scores_by_key = {key: {} for key, assessments in assessments_by_key.items() if not assessments}
+
+        cache_keys = {
+            key: cls.scores_by_criterion_cache_key(assessment.id for assessment in assessments)
+            for key, assessments in assessments_by_key.items()
+            if assessments
+        }
+        cached_scores = cache.get_many(list(cache_keys.values()))
+
+        missed_assessments = []
+        for key, cache_key in cache_keys.items():
+            if cached_scores.get(cache_key):
+                scores_by_key[key] = cached_scores[cache_key]
+            else:
+                missed_assessments.extend(assessments_by_key[key])
+        if not missed_assessments:
+            return scores_by_key
+
+        points_by_assessment = cls._parts_points_by_assessment(missed_assessments)
+        scores_to_cache = {}
+        for key, cache_key in cache_keys.items():
+            if key in scores_by_key:
+                continue
+            scores = defaultdict(list)
+            for assessment in assessments_by_key[key]:
+                for criterion_name, points in points_by_assessment[assessment.id]:
+                    scores[criterion_name].append(points)
+            scores_by_key[key] = scores_to_cache[cache_key] = scores
+
+        cache.set_many(scores_to_cache)
+        return scores_by_key
+
+    @classmethod
+    def scores_by_criterion_cache_key(cls, assessment_ids):
+        """
+        Cache key for the scores by criterion of the given assessments.
+
+        The ids are hashed so that the key has the same length however many
+        assessments there are.
 
-        # Generate a cache key that represents all the assessments we're being
-        # asked to grab scores from (comma separated list of assessment IDs)
-        cache_key = "assessments.scores_by_criterion.{}".format(
-            ",".join(str(assessment.id) for assessment in assessments)
+        Args:
+            assessment_ids (iterable): The assessment ids, in order.
+
+        Returns:
+            str
+        """
+        digest = sha1(",".join(str(assessment_id) for assessment_id in assessment_ids).encode('utf-8')).hexdigest()
+        return "assessments.scores_by_criterion.v{version}.{digest}".format(
+            version=cls.SCORES_BY_CRITERION_CACHE_VERSION,
+            digest=digest,
         )
-        scores = cache.get(cache_key)
-        if scores:
-            return scores
 
-        scores = defaultdict(list)
+    @staticmethod
+    def _parts_points_by_assessment(assessments):
+        """
+        Map the id of each assessment to the list of (criterion name, points earned)
+        of its parts.
+        """
+        points_by_assessment = defaultdict(list)
+        unloaded_ids = []
         for assessment in assessments:
-            for part in assessment.parts.all().select_related():
-                criterion_name = part.criterion.name
-                scores[criterion_name].append(part.points_earned)
+            if 'parts' in getattr(assessment, '_prefetched_objects_cache', {}):
+                points_by_assessment[assessment.id] = [
+                    (part.criterion.name, part.points_earned) for part in assessment.parts.all()
+                ]
+            else:
+                unloaded_ids.append(assessment.id)
 
-        cache.set(cache_key, scores)
-        return scores
+        if unloaded_ids:
+            parts = AssessmentPart.objects.filter(assessment_id__in=unloaded_ids).order_by('id').values_list(
+                'assessment_id', 'criterion__name', 'option__points'
+            )
+            for assessment_id, criterion_name, points in parts:
+                # By convention, an assessment part with no options (only feedback) earns 0 points.
+                points_by_assessment[assessment_id].append((criterion_name, points or 0))
+        return points_by_assessment
 
 
 class AssessmentPart(models.Model):
@@ -794,7 +1015,7 @@ class AssessmentPart(models.Model):
         # Create assessment parts for each criterion and associate them with the assessment
         # We use the dictionary we created earlier, which may have null options
         # for feedback-only assessment parts.
-        return cls.objects.bulk_create([
+        parts = cls.objects.bulk_create([
             cls(
                 assessment=assessment,
                 criterion=assessment_part['criterion'],
@@ -803,6 +1024,8 @@ class AssessmentPart(models.Model):
             )
             for assessment_part in assessment_parts
         ])
+        assessment.store_points(parts, rubric_index)
+        return parts
 
     @classmethod
     def create_from_option_points(cls, assessment, selected):
@@ -854,7 +1077,7 @@ class AssessmentPart(models.Model):
 
         # Create assessment parts for each criterion and associate them with the assessment
         # Since we're not accepting written feedback, set all feedback to an empty string.
-        return cls.objects.bulk_create([
+        parts = cls.objects.bulk_create([
             cls(
                 assessment=assessment,
                 criterion=assessment_part['criterion'],
@@ -863,6 +1086,8 @@ class AssessmentPart(models.Model):
             )
             for assessment_part in assessment_parts
         ])
+        assessment.store_points(parts, rubric_index)
+        return parts
 
     @classmethod
     def _check_has_all_criteria(cls, rubric_index, selected_criteria):
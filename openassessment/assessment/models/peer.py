@@ -9,12 +9,16 @@ need to then generate a matching migration for it using:
 """
 
 
+from contextlib import nullcontext
 from datetime import timedelta
 import logging
 import random
+import threading
 
 from django.conf import settings
-from django.db import DatabaseError, models
+from django.db import DatabaseError, connections, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 from django.utils.timezone import now
 
 from openassessment.assessment.errors import PeerAssessmentInternalError, PeerAssessmentWorkflowError
@@ -23,6 +27,9 @@ from openassessment.assessment.score_type_constants import PEER_TYPE
 
 logger = logging.getLogger("openassessment.assessment.models")  # pylint: disable=invalid-name
 
+# Serializes peer claims on databases that cannot lock rows
+_LOCAL_CLAIM_LOCK = threading.Lock()
+
 
 class AssessmentFeedbackOption(models.Model):
     """
@@ -116,6 +123,9 @@ class PeerWorkflow(models.Model):
     # Amount of time before a lease on a submission expires
     TIME_LIMIT = timedelta(hours=getattr(settings, "ORA_PEER_LEASE_EXPIRATION_HOURS", 8))
 
+    # Number of candidates claim_submission_for_review re-checks before giving up
+    MAX_CLAIM_ATTEMPTS = 10
+
     student_id = models.CharField(max_length=40, db_index=True)
     item_id = models.CharField(max_length=255, db_index=True)
     course_id = models.CharField(max_length=255, db_index=True)
@@ -125,9 +135,27 @@ class PeerWorkflow(models.Model):
     grading_completed_at = models.DateTimeField(null=True, db_index=True)
     cancelled_at = models.DateTimeField(null=True, db_index=True)
 
+    # Denormalized counters backing the peer review queue. These are kept in
+    # step with this workflow's PeerWorkflowItems (as author) by `create_item`
+    # and `close_active_assessment`:
+    #  - assessed_count: items with a completed assessment.
+    #  - reserved_count: items handed out for review but not yet assessed,
+    #    whether or not their lease has expired.
+    #  - last_reserved_at: the latest time one of those items was handed out,
+    #    so that once it is older than TIME_LIMIT every reservation is expired.
+    assessed_count = models.PositiveIntegerField(default=0)
+    reserved_count = models.PositiveIntegerField(default=0)
+    last_reserved_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ["created_at", "id"]
         app_label = "assessment"
+        indexes = [
+            models.Index(
+                fields=["course_id", "item_id", "grading_completed_at", "cancelled_at", "created_at", "id"],
+                name="assessment_peer_queue_idx",
+            ),
+        ]
 
     @property
     def is_cancelled(self):
@@ -202,6 +230,7 @@ class PeerWorkflow(models.Model):
                 submission_uuid=submission_uuid
             )
 
+            counters = {}
             if workflow_items:
                 item = workflow_items[0]
             else:
@@ -210,8 +239,10 @@ class PeerWorkflow(models.Model):
                     author=peer_workflow,
                     submission_uuid=submission_uuid
                 )
+                counters['reserved_count'] = F('reserved_count') + 1
             item.started_at = now()
             item.save()
+            cls.objects.filter(pk=peer_workflow.pk).update(last_reserved_at=item.started_at, **counters)
             return item
         except DatabaseError as ex:
             error_message = (
@@ -317,22 +348,17 @@ class PeerWorkflow(models.Model):
 
         """
         oldest_acceptable = now() - self.TIME_LIMIT
-        items = list(self.graded.all().select_related('author').order_by("-started_at", "-id"))
-        valid_open_items = []
-        completed_sub_uuids = []
-        # First, remove all completed items.
-        for item in items:
-            if item.assessment is not None or item.author.is_cancelled:
-                completed_sub_uuids.append(item.submission_uuid)
-            else:
-                valid_open_items.append(item)
-
-        # Remove any open items which have a submission which has been completed.
-        for item in valid_open_items:
-            if (item.started_at < oldest_acceptable) or (item.submission_uuid in completed_sub_uuids):
-                valid_open_items.remove(item)   # pylint: disable=modified-iterating-list
-
-        return valid_open_items[0] if valid_open_items else None
+        # Submissions this student has already assessed, or which were cancelled
+        completed_sub_uuids = self.graded.filter(
+            Q(assessment__isnull=False) | Q(author__cancelled_at__isnull=False)
+        ).values('submission_uuid')
+        return self.graded.filter(
+            assessment__isnull=True,
+            author__cancelled_at__isnull=True,
+            started_at__gte=oldest_acceptable,
+        ).exclude(
+            submission_uuid__in=completed_sub_uuids
+        ).order_by("-started_at", "-id").first()
 
     def get_submission_for_review(self, graded_by):
         """
@@ -340,6 +366,10 @@ class PeerWorkflow(models.Model):
         submission that requires assessment, excluding any submission that has been
         completely graded, or is actively being reviewed by other students.
 
+        The queue is read from the denormalized counters on each workflow unless
+        the ORA_PEER_QUEUE_USE_COUNTERS setting is disabled, in which case the
+        original correlated-subquery SQL is used. Both return the same submission.
+
         Args:
             graded_by (unicode): Student ID of the scorer.
 
@@ -351,6 +381,160 @@ class PeerWorkflow(models.Model):
                 the workflows or workflow items for this request.
 
         """
+        try:
+            if getattr(settings, "ORA_PEER_QUEUE_USE_COUNTERS", True):
+                return self._get_submission_from_review_queue(graded_by)
+            return self._get_submission_from_review_query(graded_by)
+        except DatabaseError as ex:
+            error_message = (
+                "An internal error occurred while retrieving a peer submission "
+                "for learner {}"
+            ).format(self)
+            logger.exception(error_message)
+            raise PeerAssessmentInternalError(error_message) from ex
+
+    def _get_submission_from_review_queue(self, graded_by):
+        """
+        Find the next submission for review using the per-workflow counters.
+
+        Args:
+            graded_by (int): The number of assessments a submission requires.
+
+        Returns:
+            submission_uuid (str) or None
+        """
+        return self._review_queue(graded_by).values_list('submission_uuid', flat=True).first()
+
+    def _review_queue(self, graded_by):
+        """
+        Build the peer review queue for this learner from the per-workflow counters.
+
+        Walks the `assessment_peer_queue_idx` index in creation order. A workflow
+        is available when its completed assessments plus its unexpired
+        reservations are fewer than `graded_by`. The counters settle this for
+        almost every row: if all reservations together stay under the
+        requirement, or the latest reservation has already expired, no per-item
+        lookup is needed. Only workflows with both live and expired
+        reservations fall back to counting their items against TIME_LIMIT.
+
+        Args:
+            graded_by (int): The number of assessments a submission requires.
+
+        Returns:
+            QuerySet of PeerWorkflow, next submission first.
+        """
+        timeout = now() - self.TIME_LIMIT
+        scored_authors = self.graded.filter(assessment__isnull=False).values('author_id')
+        active_count = PeerWorkflowItem.objects.order_by().filter(
+            Q(assessment__isnull=False) | Q(started_at__gt=timeout),
+            author_id=OuterRef('id'),
+        ).values('author_id').annotate(count=Count('id')).values('count')
+        no_live_reservation = Q(last_reserved_at__isnull=True) | Q(last_reserved_at__lte=timeout)
+
+        return PeerWorkflow.objects.filter(
+            item_id=self.item_id,
+            course_id=self.course_id,
+            grading_completed_at__isnull=True,
+            cancelled_at__isnull=True,
+            assessed_count__lt=graded_by,
+        ).exclude(
+            student_id=self.student_id
+        ).exclude(
+            id__in=scored_authors
+        ).alias(
+            claimed_count=F('assessed_count') + F('reserved_count'),
+            active_count=Coalesce(Subquery(active_count), Value(0)),
+        ).filter(
+            Q(claimed_count__lt=graded_by) | no_live_reservation | Q(active_count__lt=graded_by)
+        ).order_by('created_at', 'id')
+
+    def claim_submission_for_review(self, graded_by):
+        """
+        Find the next submission for review and reserve it for this learner atomically.
+
+        `get_submission_for_review` followed by `create_item` lets concurrent
+        requests for the same item hand the head of the queue to more reviewers
+        than `graded_by`. Here the candidate row is locked with
+        SELECT ... FOR UPDATE (SKIP LOCKED where supported) while its leases
+        are re-counted with a locking read, which sees the latest committed
+        leases whatever the isolation level, and the PeerWorkflowItem is
+        created, so a concurrent
+        request either moves on to the next submission or sees the new
+        reservation. If every candidate is locked by another claim, the
+        queue is read again with a blocking lock rather than giving up.
+        Databases without row locks (SQLite) serialize claims in-process.
+
+        Args:
+            graded_by (int): The number of assessments a submission requires.
+
+        Returns:
+            submission_uuid (str): The submission reserved for review, or None.
+
+        Raises:
+            PeerAssessmentInternalError: Raised when there is an error retrieving
+                or reserving the submission.
+
+        """
+        features = connections[PeerWorkflow.objects.db].features
+        skip_locked = features.has_select_for_update_skip_locked
+        claim_lock = nullcontext() if features.has_select_for_update else _LOCAL_CLAIM_LOCK
+        skipped_ids = []
+        try:
+            with claim_lock, transaction.atomic():
+                while len(skipped_ids) < self.MAX_CLAIM_ATTEMPTS:
+                    queue = self._review_queue(graded_by).exclude(id__in=skipped_ids)
+                    if features.has_select_for_update:
+                        queue = queue.select_for_update(skip_locked=skip_locked)
+                    candidate = queue.first()
+                    if candidate is None:
+                        if not skip_locked:
+                            return None
+                        skip_locked = False
+                        continue
+                    active_count = candidate.count_active_reservations(for_update=features.has_select_for_update)
+                    if active_count < graded_by:
+                        return PeerWorkflow.create_item(self, candidate.submission_uuid).submission_uuid
+                    skipped_ids.append(candidate.id)
+                return None
+        except DatabaseError as ex:
+            error_message = (
+                "An internal error occurred while reserving a peer submission "
+                "for learner {}"
+            ).format(self)
+            logger.exception(error_message)
+            raise PeerAssessmentInternalError(error_message) from ex
+
+    def count_active_reservations(self, for_update=False):
+        """
+        Count the assessments and unexpired leases held on this submission.
+
+        Keyword Arguments:
+            for_update (bool): Lock the counted items with SELECT ... FOR UPDATE.
+                A locking read sees the latest committed items, while a plain read
+                may use the snapshot of the transaction (REPEATABLE READ) and miss
+                leases committed by concurrent claims.
+
+        Returns:
+            int
+        """
+        items = self.graded_by.filter(
+            Q(assessment__isnull=False) | Q(started_at__gt=now() - self.TIME_LIMIT)
+        )
+        if for_update:
+            # Aggregates cannot be locked on every backend, so lock and count the rows.
+            return len(items.select_for_update().values_list('id', flat=True))
+        return items.count()
+
+    def _get_submission_from_review_query(self, graded_by):
+        """
+        Find the next submission for review with the original raw SQL queue query.
+
+        Args:
+            graded_by (int): The number of assessments a submission requires.
+
+        Returns:
+            submission_uuid (str) or None
+        """
         timeout = (now() - self.TIME_LIMIT).strftime("%Y-%m-%d %H:%M:%S")
         # The follow query behaves as the Peer Assessment Queue. This will
         # find the next submission (via PeerWorkflow) in this course / question
@@ -361,83 +545,52 @@ class PeerWorkflow(models.Model):
         #  4) Does not have a combination of completed assessments or open
         #     assessments equal to or more than the requirement.
         #  5) Has not been cancelled.
-        try:
-            peer_workflows = list(PeerWorkflow.objects.raw(
-                "select pw.id, pw.submission_uuid "
-                "from assessment_peerworkflow pw "
-                "where pw.item_id=%s "
-                "and pw.course_id=%s "
-                "and pw.student_id<>%s "
-                "and pw.grading_completed_at is NULL "
-                "and pw.cancelled_at is NULL "
-                "and pw.id not in ("
-                "   select pwi.author_id "
-                "   from assessment_peerworkflowitem pwi "
-                "   where pwi.scorer_id=%s "
-                "   and pwi.assessment_id is not NULL "
-                ") "
-                "and ("
-                "   select count(pwi.id) as c "
-                "   from assessment_peerworkflowitem pwi "
-                "   where pwi.author_id=pw.id "
-                "   and (pwi.assessment_id is not NULL or pwi.started_at > %s) "
-                ") < %s "
-                "order by pw.created_at, pw.id "
-                "limit 1; ",
-                [
-                    self.item_id,
-                    self.course_id,
-                    self.student_id,
-                    self.id,
-                    timeout,
-                    graded_by
-                ]
-            ))
-            if not peer_workflows:
-                return None
+        peer_workflows = list(PeerWorkflow.objects.raw(
+            "select pw.id, pw.submission_uuid "
+            "from assessment_peerworkflow pw "
+            "where pw.item_id=%s "
+            "and pw.course_id=%s "
+            "and pw.student_id<>%s "
+            "and pw.grading_completed_at is NULL "
+            "and pw.cancelled_at is NULL "
+            "and pw.id not in ("
+            "   select pwi.author_id "
+            "   from assessment_peerworkflowitem pwi "
+            "   where pwi.scorer_id=%s "
+            "   and pwi.assessment_id is not NULL "
+            ") "
+            "and ("
+            "   select count(pwi.id) as c "
+            "   from assessment_peerworkflowitem pwi "
+            "   where pwi.author_id=pw.id "
+            "   and (pwi.assessment_id is not NULL or pwi.started_at > %s) "
+            ") < %s "
+            "order by pw.created_at, pw.id "
+            "limit 1; ",
+            [
+                self.item_id,
+                self.course_id,
+                self.student_id,
+                self.id,
+                timeout,
+                graded_by
+            ]
+        ))
+        if not peer_workflows:
+            return None
 
-            return peer_workflows[0].submission_uuid
-        except DatabaseError as ex:
-            error_message = (
-                "An internal error occurred while retrieving a peer submission "
-                "for learner {}"
-            ).format(self)
-            logger.exception(error_message)
-            raise PeerAssessmentInternalError(error_message) from ex
+        return peer_workflows[0].submission_uuid
 
     def get_submission_for_over_grading(self):
         """
         Retrieve the next submission uuid for over grading in peer assessment.
+
+        A submission is chosen uniformly at random among the eligible ones:
+        they are counted, and the one at a random offset in id order is read,
+        so only the chosen row is loaded.
         """
-        # The follow query behaves as the Peer Assessment Over Grading Queue. This
-        # will find a random submission (via PeerWorkflow) in this course / question
-        # that:
-        #  1) Does not belong to you
-        #  2) Is not something you have already scored
-        #  3) Has not been cancelled.
         try:
-            query = list(PeerWorkflow.objects.raw(
-                "select pw.id, pw.submission_uuid "
-                "from assessment_peerworkflow pw "
-                "where course_id=%s "
-                "and item_id=%s "
-                "and student_id<>%s "
-                "and pw.cancelled_at is NULL "
-                "and pw.id not in ( "
-                "select pwi.author_id "
-                "from assessment_peerworkflowitem pwi "
-                "where pwi.scorer_id=%s"
-                "); ",
-                [self.course_id, self.item_id, self.student_id, self.id]
-            ))
-            workflow_count = len(query)
-            if workflow_count < 1:
-                return None
-
-            random_int = random.randint(0, workflow_count - 1)
-            random_workflow = query[random_int]
-
-            return random_workflow.submission_uuid
+            return self._sample_over_grading_candidate()
         except DatabaseError as ex:
             error_message = (
                 "An internal error occurred while retrieving a peer submission "
@@ -446,6 +599,43 @@ class PeerWorkflow(models.Model):
             logger.exception(error_message)
             raise PeerAssessmentInternalError(error_message) from ex
 
+    def _over_grading_candidates(self):
+        """
+        Return the workflows available to this learner for over grading.
+
+        This is the Peer Assessment Over Grading Queue: every submission in this
+        course / question that:
+         1) Does not belong to you
+         2) Is not something you have already scored
+         3) Has not been cancelled.
+        """
+        return PeerWorkflow.objects.filter(
+            course_id=self.course_id,
+            item_id=self.item_id,
+            cancelled_at__isnull=True,
+        ).exclude(
+            student_id=self.student_id
+        ).exclude(
+            id__in=self.graded.values('author_id')
+        )
+
+    def _sample_over_grading_candidate(self):
+        """
+        Pick a uniformly random over grading candidate.
+
+        Returns:
+            submission_uuid (str) or None
+        """
+        candidates = self._over_grading_candidates().order_by('id').values_list('submission_uuid', flat=True)
+        candidate_count = candidates.count()
+        if not candidate_count:
+            return None
+
+        offset = random.randrange(candidate_count)
+        # Candidates may have gone away since they were counted
+        chosen = list(candidates[offset:offset + 1]) or list(candidates[:1])
+        return chosen[0] if chosen else None
+
     def close_active_assessment(self, submission_uuid, assessment, num_required_grades):
         """
         Updates a workflow item on the student's workflow with the associated
@@ -474,13 +664,20 @@ class PeerWorkflow(models.Model):
                 ).format(self.student_id, submission_uuid)
                 raise PeerAssessmentWorkflowError(msg)
             item = items[0]
+            newly_assessed = item.assessment_id is None
             item.assessment = assessment
             item.save()
 
+            if newly_assessed:
+                PeerWorkflow.objects.filter(pk=item.author_id).update(
+                    assessed_count=F('assessed_count') + 1,
+                    reserved_count=Greatest(F('reserved_count') - 1, Value(0)),
+                )
+
             if not item.author.grading_completed_at:
                 if item.author.graded_by.filter(assessment__isnull=False).count() >= num_required_grades:
                     item.author.grading_completed_at = now()
-                    item.author.save()
+                    item.author.save(update_fields=['grading_completed_at'])
 
         except (DatabaseError, PeerWorkflowItem.DoesNotExist) as ex:
             error_message = (
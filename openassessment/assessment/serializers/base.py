@@ -3,18 +3,29 @@ Serializers common to all assessment types.
 """
 
 
+from collections import OrderedDict, defaultdict
 from copy import deepcopy
+from hashlib import sha1
 import logging
+import threading
 
 from rest_framework import serializers
 from rest_framework.fields import DateTimeField, IntegerField
 
+from django.conf import settings
 from django.core.cache import cache
+from django.db import router, transaction
 
 from openassessment.assessment.models import Assessment, AssessmentPart, Criterion, CriterionOption, Rubric
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
 
+# Process-wide memo of rubric dict fingerprints to (content_hash, structure_hash, rubric id),
+# see `rubric_from_dict`.
+RUBRIC_LOOKUP_CACHE_SIZE = getattr(settings, "ORA_RUBRIC_LOOKUP_CACHE_SIZE", 256)
+_rubric_lookups = OrderedDict()
+_rubric_lookups_lock = threading.Lock()
+
 
 class InvalidRubric(Exception):
     """This can be raised during the deserialization process."""
@@ -79,7 +90,8 @@ class RubricSerializer(serializers.ModelSerializer):
         """
         # Optional local cache you can send in (for when you're calling this
         # in a loop).
-        local_cache = local_cache or {}
+        if local_cache is None:
+            local_cache = {}
 
         # Check our in-memory cache...
         if rubric.content_hash in local_cache:
@@ -95,13 +107,54 @@ class RubricSerializer(serializers.ModelSerializer):
             local_cache[rubric.content_hash] = rubric_dict
             return rubric_dict
 
-        # Grab it from the database
+        # Grab it from the database, and store the max scores of its criteria
+        # alongside it, since they are read on every grade render.
         rubric_dict = RubricSerializer(rubric).data
-        cache.set(rubric_dict_cache_key, rubric_dict)
+        cache.set_many({
+            rubric_dict_cache_key: rubric_dict,
+            cls._max_scores_cache_key(rubric.content_hash): rubric_max_scores(rubric_dict),
+        })
         local_cache[rubric.content_hash] = rubric_dict
 
         return rubric_dict
 
+    @classmethod
+    def max_scores_from_cache(cls, rubric, local_cache=None):
+        """For a given `Rubric` model object, return the max score of each criterion.
+
+        The map only depends on the rubric content, so it is cached under
+        `rubric.content_hash` and the rubric is serialized at most once to
+        build it.
+
+        Args:
+            rubric (Rubric): The Rubric model to get the max scores of.
+            local_cache (dict): Mapping of `rubric.content_hash` to max scores,
+                for when this method is called in a loop.
+
+        Returns:
+            dict: Mapping of criterion names to their points possible.
+        """
+        if local_cache is None:
+            local_cache = {}
+
+        if rubric.content_hash in local_cache:
+            return local_cache[rubric.content_hash]
+
+        max_scores = cache.get(cls._max_scores_cache_key(rubric.content_hash))
+        if max_scores is None:
+            # Serializing the rubric also caches its max scores.
+            max_scores = rubric_max_scores(cls.serialized_from_cache(rubric))
+
+        local_cache[rubric.content_hash] = max_scores
+        return max_scores
+
+    @staticmethod
+    def _max_scores_cache_key(content_hash):
+        """
+        Cache key of the max scores of the rubric with the given content hash.
+        """
+        return "RubricSerializer.max_scores_from_cache.{}".format(content_hash)
+
     def create(self, validated_data):
         """
         Create the rubric model, including its nested models.
@@ -162,17 +215,7 @@ class AssessmentSerializer(serializers.ModelSerializer):
 
 def serialize_assessments(assessments_qset):
     assessments = list(assessments_qset.select_related("rubric"))
-    rubric_cache = {}
-
-    return [
-        full_assessment_dict(
-            assessment,
-            RubricSerializer.serialized_from_cache(
-                assessment.rubric, rubric_cache
-            )
-        )
-        for assessment in assessments
-    ]
+    return full_assessment_dicts(assessments)
 
 
 def full_assessment_dict(assessment, rubric_dict=None):
@@ -190,17 +233,98 @@ def full_assessment_dict(assessment, rubric_dict=None):
     Returns:
         dict with keys 'rubric' (serialized Rubric model) and 'parts' (serialized assessment parts)
     """
-    assessment_cache_key = "assessment.full_assessment_dict.{}.{}.{}".format(
-        assessment.id, assessment.submission_uuid, assessment.scored_at.isoformat()
-    )
+    assessment_cache_key = _full_assessment_dict_cache_key(assessment)
     assessment_dict = cache.get(assessment_cache_key)
     if assessment_dict:
         return assessment_dict
 
-    assessment_dict = AssessmentSerializer(assessment).data
     if not rubric_dict:
         rubric_dict = RubricSerializer.serialized_from_cache(assessment.rubric)
+    parts = assessment.parts.order_by('criterion__order_num').all().select_related("criterion", "option")
+    assessment_dict = _build_full_assessment_dict(assessment, rubric_dict, parts)
+
+    cache.set(assessment_cache_key, assessment_dict)
+
+    return assessment_dict
+
+
+def full_assessment_dicts(assessments):
+    """
+    Batched version of `full_assessment_dict`.
+
+    All the cached dicts are read with a single `get_many`, the parts of the
+    assessments that were not cached are loaded in one query, and the new
+    dicts are written back with a single `set_many`.
+
+    Args:
+        assessments (list of Assessment): The Assessment models to serialize,
+            preferably with their rubric selected.
+
+    Returns:
+        list of dicts, in the order of `assessments`, as returned by
+        `full_assessment_dict`.
+    """
+    cache_keys = [_full_assessment_dict_cache_key(assessment) for assessment in assessments]
+    cached_dicts = cache.get_many(cache_keys) if cache_keys else {}
+    missed_assessments = [
+        assessment for assessment, cache_key in zip(assessments, cache_keys)
+        if not cached_dicts.get(cache_key)
+    ]
+    if not missed_assessments:
+        return [cached_dicts[cache_key] for cache_key in cache_keys]
+
+    parts_by_assessment = defaultdict(list)
+    parts = AssessmentPart.objects.filter(
+        assessment__in=[assessment.id for assessment in missed_assessments]
+    ).order_by('criterion__order_num').select_related("criterion", "option")
+    for part in parts:
+        parts_by_assessment[part.assessment_id].append(part)
+
+    rubric_cache = {}
+    dicts_to_cache = {}
+    for assessment in missed_assessments:
+        cache_key = _full_assessment_dict_cache_key(assessment)
+        rubric_dict = RubricSerializer.serialized_from_cache(assessment.rubric, rubric_cache)
+        dicts_to_cache[cache_key] = _build_full_assessment_dict(
+            assessment, rubric_dict, parts_by_assessment[assessment.id]
+        )
+    cache.set_many(dicts_to_cache)
+
+    cached_dicts.update(dicts_to_cache)
+    return [cached_dicts[cache_key] for cache_key in cache_keys]
 
+
+def _full_assessment_dict_cache_key(assessment):
+    """
+    Cache key of the `full_assessment_dict` of an assessment.
+    """
+    return "assessment.full_assessment_dict.{}.{}.{}".format(
+        assessment.id, assessment.submission_uuid, assessment.scored_at.isoformat()
+    )
+
+
+def rubric_max_scores(rubric_dict):
+    """
+    Map the criteria of a serialized rubric to their max scores.
+
+    Args:
+        rubric_dict (dict): The serialized rubric.
+
+    Returns:
+        dict: Mapping of criterion names to their points possible.
+    """
+    return {
+        criterion["name"]: criterion["points_possible"]
+        for criterion in rubric_dict["criteria"]
+    }
+
+
+def _build_full_assessment_dict(assessment, rubric_dict, parts):
+    """
+    Serialize an assessment with its parts, ordered by criterion, and the
+    serialized rubric it was made with.
+    """
+    assessment_dict = AssessmentSerializer(assessment).data
     assessment_dict["rubric"] = rubric_dict
 
     # This part looks a little goofy, but it's in the name of saving dozens of
@@ -210,14 +334,14 @@ def full_assessment_dict(assessment, rubric_dict=None):
     # the DB model. Instead of invoking the serializers for `Criterion` and
     # `CriterionOption` again, we simply index into the places we expect them to
     # be from the big, saved `Rubric` serialization.
-    parts = []
-    for part in assessment.parts.order_by('criterion__order_num').all().select_related("criterion", "option"):
+    part_dicts = []
+    for part in parts:
         criterion_dict = dict(rubric_dict["criteria"][part.criterion.order_num])
         options_dict = None
         if part.option is not None:
             options_dict = criterion_dict["options"][part.option.order_num]
             options_dict["criterion"] = criterion_dict
-        parts.append({
+        part_dicts.append({
             "option": options_dict,
             "criterion": criterion_dict,
             "feedback": part.feedback
@@ -225,17 +349,14 @@ def full_assessment_dict(assessment, rubric_dict=None):
 
     # Now manually built up the dynamically calculated values on the
     # `Assessment` so we can again avoid DB calls.
-    assessment_dict["parts"] = parts
+    assessment_dict["parts"] = part_dicts
     assessment_dict["points_earned"] = sum(
         part_dict["option"]["points"]
         if part_dict["option"] is not None else 0
-        for part_dict in parts
+        for part_dict in part_dicts
     )
     assessment_dict["points_possible"] = rubric_dict["points_possible"]
     assessment_dict["id"] = assessment.id
-
-    cache.set(assessment_cache_key, assessment_dict)
-
     return assessment_dict
 
 
@@ -271,8 +392,20 @@ def rubric_from_dict(rubric_dict):
           ]
         }
 
+    Rubrics are looked up by a fingerprint of the dict first, in process and
+    then in the Django cache, so the same rubric is not hashed and fetched
+    again for every assessment.
+
     """
-    rubric_dict = deepcopy(rubric_dict)
+    fingerprint = _rubric_dict_fingerprint(rubric_dict)
+    lookup = _get_rubric_lookup(fingerprint)
+    if lookup is not None:
+        content_hash, structure_hash, rubric_id = lookup
+        return Rubric.from_db(
+            router.db_for_read(Rubric),
+            ["id", "content_hash", "structure_hash"],
+            [rubric_id, content_hash, structure_hash],
+        )
 
     # Calculate the hash based on the rubric content...
     content_hash = Rubric.content_hash_from_dict(rubric_dict)
@@ -280,6 +413,7 @@ def rubric_from_dict(rubric_dict):
     try:
         rubric = Rubric.objects.get(content_hash=content_hash)
     except Rubric.DoesNotExist as ex:
+        rubric_dict = deepcopy(rubric_dict)
         rubric_dict["content_hash"] = content_hash
         rubric_dict["structure_hash"] = Rubric.structure_hash_from_dict(rubric_dict)
         for crit_idx, criterion in enumerate(rubric_dict.get("criteria", {})):
@@ -294,4 +428,63 @@ def rubric_from_dict(rubric_dict):
             raise InvalidRubric(rubric_serializer.errors) from ex
         rubric = rubric_serializer.save()
 
+    # Only remember the rubric once it is committed, so that a rolled back
+    # rubric is never handed out
+    lookup = (rubric.content_hash, rubric.structure_hash, rubric.id)
+    transaction.on_commit(lambda: _set_rubric_lookup(fingerprint, lookup))
     return rubric
+
+
+def _rubric_dict_fingerprint(rubric_dict):
+    """
+    A cheap fingerprint of a rubric dict, as it was passed in.
+
+    Unlike `Rubric.content_hash_from_dict`, the dict is neither copied nor
+    sorted, so equal rubrics built in a different key order can have different
+    fingerprints; they still resolve to the same rubric.
+    """
+    return sha1(repr(rubric_dict).encode('utf-8')).hexdigest()
+
+
+def _get_rubric_lookup(fingerprint):
+    """
+    Return the (content_hash, structure_hash, rubric id) remembered for the
+    fingerprint, or None.
+    """
+    with _rubric_lookups_lock:
+        lookup = _rubric_lookups.get(fingerprint)
+        if lookup is not None:
+            _rubric_lookups.move_to_end(fingerprint)
+            return lookup
+
+    lookup = cache.get("rubric_from_dict.lookup.{}".format(fingerprint))
+    if lookup is not None:
+        _remember_rubric_lookup(fingerprint, lookup)
+    return lookup
+
+
+def _set_rubric_lookup(fingerprint, lookup):
+    """
+    Remember the (content_hash, structure_hash, rubric id) of the fingerprint.
+    """
+    cache.set("rubric_from_dict.lookup.{}".format(fingerprint), lookup)
+    _remember_rubric_lookup(fingerprint, lookup)
+
+
+def _remember_rubric_lookup(fingerprint, lookup):
+    """
+    Add a lookup to the process-wide memo, evicting the least recently used ones.
+    """
+    with _rubric_lookups_lock:
+        _rubric_lookups[fingerprint] = lookup
+        _rubric_lookups.move_to_end(fingerprint)
+        while len(_rubric_lookups) > RUBRIC_LOOKUP_CACHE_SIZE:
+            _rubric_lookups.popitem(last=False)
+
+
+def clear_rubric_lookups():
+    """
+    Forget the rubric lookups remembered by this process.
+    """
+    with _rubric_lookups_lock:
+        _rubric_lookups.clear()
@@ -6,6 +6,7 @@ Tests for the assessment Django models.
 import copy
 
 import ddt
+from django.db.models import Prefetch
 
 from submissions.api import create_submission
 from openassessment.assessment.api.self import create_assessment
@@ -139,6 +140,84 @@ class AssessmentTest(CacheResetTest):
         with self.assertRaises(InvalidRubricSelection):
             AssessmentPart.create_from_option_names(assessment, selected, feedback=feedback)
 
+    def test_points_stored_at_creation(self):
+        rubric = self._rubric_with_one_feedback_only_criterion()
+        assessment = Assessment.create(rubric, "Bob", "submission UUID", "PE")
+        AssessmentPart.create_from_option_names(
+            assessment,
+            {"vøȼȺƀᵾłȺɍɏ": "𝓰𝓸𝓸𝓭", "ﻭɼค๓๓คɼ": "єχ¢єℓℓєηт"},
+            feedback={"feedback": "𝕿𝖍𝖎𝖘 𝖎𝖘 𝖘𝖔𝖒𝖊 𝖋𝖊𝖊𝖉𝖇𝖆𝖈𝖐."},
+        )
+
+        loaded = Assessment.objects.get(pk=assessment.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(loaded.points_earned, 3)
+            self.assertEqual(loaded.points_possible, 4)
+
+    def test_points_fallback_when_not_stored(self):
+        rubric = self._rubric_with_one_feedback_only_criterion()
+        assessment = self._create_assessment_with_points(rubric, "submission UUID", 2, 0)
+        Assessment.objects.filter(pk=assessment.pk).update(stored_points_earned=None, stored_points_possible=None)
+
+        loaded = Assessment.objects.get(pk=assessment.pk)
+        self.assertEqual(loaded.points_earned, 2)
+        self.assertEqual(loaded.points_possible, 4)
+
+    def _create_assessment_with_points(self, rubric, submission_uuid, vocabulary, grammar):
+        """Create an assessment of the given submission with the given points for each criterion."""
+        assessment = Assessment.create(rubric, "Bob", submission_uuid, "PE")
+        AssessmentPart.create_from_option_points(
+            assessment, {"vøȼȺƀᵾłȺɍɏ": vocabulary, "ﻭɼค๓๓คɼ": grammar}
+        )
+        return assessment
+
+    def test_bulk_scores_by_criterion(self):
+        rubric = self._rubric_with_one_feedback_only_criterion()
+        assessments = {
+            "first": [
+                self._create_assessment_with_points(rubric, "first", 2, 1),
+                self._create_assessment_with_points(rubric, "first", 0, 1),
+            ],
+            "second": [self._create_assessment_with_points(rubric, "second", 1, 2)],
+            "none": [],
+        }
+
+        # All the parts are fetched in one query
+        with self.assertNumQueries(1):
+            scores = Assessment.bulk_scores_by_criterion(assessments)
+        self.assertEqual(scores, {
+            "first": {"vøȼȺƀᵾłȺɍɏ": [2, 0], "ﻭɼค๓๓คɼ": [1, 1], "feedback": [0, 0]},
+            "second": {"vøȼȺƀᵾłȺɍɏ": [1], "ﻭɼค๓๓คɼ": [2], "feedback": [0]},
+            "none": {},
+        })
+
+        # Afterwards the scores are cached, also for `scores_by_criterion`
+        with self.assertNumQueries(0):
+            self.assertEqual(Assessment.bulk_scores_by_criterion(assessments), scores)
+            self.assertEqual(Assessment.scores_by_criterion(assessments["first"]), scores["first"])
+
+    def test_bulk_scores_by_criterion_prefetched_parts(self):
+        rubric = self._rubric_with_one_feedback_only_criterion()
+        self._create_assessment_with_points(rubric, "first", 2, 1)
+        assessments = Assessment.objects.filter(submission_uuid="first").prefetch_related(
+            Prefetch("parts", queryset=AssessmentPart.objects.select_related("criterion", "option"))
+        )
+        assessments = list(assessments)
+
+        with self.assertNumQueries(0):
+            scores = Assessment.bulk_scores_by_criterion({"first": assessments})
+        self.assertEqual(scores["first"], {"vøȼȺƀᵾłȺɍɏ": [2], "ﻭɼค๓๓คɼ": [1], "feedback": [0]})
+
+    def test_scores_by_criterion_cache_key(self):
+        short_key = Assessment.scores_by_criterion_cache_key([1])
+        long_key = Assessment.scores_by_criterion_cache_key(range(100000))
+        self.assertEqual(len(short_key), len(long_key))
+        self.assertLess(len(long_key), 250)
+        self.assertNotEqual(
+            Assessment.scores_by_criterion_cache_key([1, 2]),
+            Assessment.scores_by_criterion_cache_key([12]),
+        )
+
     def _rubric_with_one_feedback_only_criterion(self):
         """Create a rubric with one feedback-only criterion."""
         rubric_dict = copy.deepcopy(RUBRIC)
@@ -2,15 +2,17 @@
 
 import copy
 import datetime
+import threading
 from unittest.mock import Mock, patch
 
 from ddt import ddt, file_data, data, unpack
 import pytz
 
 from django.conf import settings
-from django.db import DatabaseError, IntegrityError
+from django.db import DatabaseError, IntegrityError, connection
+from django.db.models import Count, QuerySet
 from django.utils import timezone
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from freezegun import freeze_time
 from pytest import raises
 
@@ -25,8 +27,9 @@ from openassessment.assessment.models import (
     PeerWorkflow,
     PeerWorkflowItem
 )
+from openassessment.assessment.serializers import rubric_from_dict
 from openassessment.workflow.models import AssessmentWorkflow
-from openassessment.test_utils import CacheResetTest
+from openassessment.test_utils import CacheResetTest, TransactionCacheResetTest
 from openassessment.workflow import api as workflow_api
 
 STUDENT_ITEM = {
@@ -181,7 +184,7 @@ class TestPeerApi(CacheResetTest):
     Tests for the peer assessment API functions.
     """
 
-    CREATE_ASSESSMENT_NUM_QUERIES = 38
+    CREATE_ASSESSMENT_NUM_QUERIES = 40
 
     def test_create_assessment_points(self):
         self._create_student_and_submission("Tim", "Tim's answer")
@@ -1009,6 +1012,59 @@ class TestPeerApi(CacheResetTest):
         item = buffy_workflow.find_active_assessments()
         self.assertIsNone(item)
 
+    def test_find_active_assessments_num_queries(self):
+        buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
+        buffy_workflow = PeerWorkflow.get_by_submission_uuid(buffy_answer['uuid'])
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+
+        # Buffy has over graded many submissions, and let many leases expire
+        for index in range(20):
+            answer, _ = self._create_student_and_submission("Student{}".format(index), "Answer {}".format(index))
+            with freeze_time(yesterday):
+                PeerWorkflow.create_item(buffy_workflow, answer["uuid"])
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+        PeerWorkflow.create_item(buffy_workflow, xander_answer["uuid"])
+
+        with self.assertNumQueries(1):
+            item = buffy_workflow.find_active_assessments()
+        self.assertEqual(item.submission_uuid, xander_answer["uuid"])
+
+    def test_find_active_assessments_all_expired(self):
+        buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+        willow_answer, _ = self._create_student_and_submission("Willow", "Willow's answer")
+        buffy_workflow = PeerWorkflow.get_by_submission_uuid(buffy_answer['uuid'])
+
+        # Every expired lease is ignored, not just alternating ones
+        with freeze_time(timezone.now() - datetime.timedelta(days=1)):
+            PeerWorkflow.create_item(buffy_workflow, xander_answer["uuid"])
+            PeerWorkflow.create_item(buffy_workflow, willow_answer["uuid"])
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(buffy_workflow.find_active_assessments())
+
+    def test_find_active_assessments_completed_submission(self):
+        buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+        buffy_workflow = PeerWorkflow.get_by_submission_uuid(buffy_answer['uuid'])
+        xander_workflow = PeerWorkflow.get_by_submission_uuid(xander_answer['uuid'])
+
+        # Buffy assessed Xander, and still has a stray open item for the same submission
+        peer_api.get_submission_to_assess(buffy_answer['uuid'], REQUIRED_GRADED_BY)
+        peer_api.create_assessment(
+            buffy_answer["uuid"], "Buffy",
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            RUBRIC_DICT,
+            REQUIRED_GRADED_BY,
+        )
+        PeerWorkflowItem.objects.create(
+            scorer=buffy_workflow, author=xander_workflow, submission_uuid=xander_answer["uuid"]
+        )
+
+        self.assertIsNone(buffy_workflow.find_active_assessments())
+
     def test_submission_cancelled_while_being_assessed(self):
         # Test that if student pulls the submission for review and the
         # submission is cancelled their assessment will not be accepted.
@@ -1122,6 +1178,134 @@ class TestPeerApi(CacheResetTest):
         submission_uuid = buffy_workflow.get_submission_for_review(3)
         self.assertNotEqual(xander_answer["uuid"], submission_uuid)
 
+    def _create_review_queue(self):
+        """
+        Set up a peer queue with completed assessments, live leases and expired leases.
+        """
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        answers = {}
+        for student in ("Buffy", "Xander", "Willow", "Giles", "Anya"):
+            answers[student], __ = self._create_student_and_submission(student, "{}'s answer".format(student))
+        workflows = {
+            student: PeerWorkflow.get_by_submission_uuid(answer['uuid'])
+            for student, answer in answers.items()
+        }
+
+        # Xander has an expired lease (from Giles) and a live lease (from Willow)
+        with freeze_time(yesterday):
+            PeerWorkflow.create_item(workflows["Giles"], answers["Xander"]["uuid"])
+        PeerWorkflow.create_item(workflows["Willow"], answers["Xander"]["uuid"])
+
+        # Willow has been assessed by Anya
+        PeerWorkflow.create_item(workflows["Anya"], answers["Willow"]["uuid"])
+        peer_api.create_assessment(
+            answers["Anya"]["uuid"], "Anya",
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            RUBRIC_DICT,
+            REQUIRED_GRADED_BY,
+        )
+        return answers, workflows
+
+    def test_review_queue_counters(self):
+        answers, __ = self._create_review_queue()
+
+        xander_workflow = PeerWorkflow.get_by_submission_uuid(answers["Xander"]["uuid"])
+        self.assertEqual(xander_workflow.assessed_count, 0)
+        self.assertEqual(xander_workflow.reserved_count, 2)
+        self.assertGreater(xander_workflow.last_reserved_at, timezone.now() - PeerWorkflow.TIME_LIMIT)
+
+        willow_workflow = PeerWorkflow.get_by_submission_uuid(answers["Willow"]["uuid"])
+        self.assertEqual(willow_workflow.assessed_count, 1)
+        self.assertEqual(willow_workflow.reserved_count, 0)
+
+        buffy_workflow = PeerWorkflow.get_by_submission_uuid(answers["Buffy"]["uuid"])
+        self.assertEqual(buffy_workflow.assessed_count, 0)
+        self.assertEqual(buffy_workflow.reserved_count, 0)
+        self.assertIsNone(buffy_workflow.last_reserved_at)
+
+    def test_starting_existing_workflow_keeps_counters(self):
+        answers, workflows = self._create_review_queue()
+        get_or_create = PeerWorkflow.objects.get_or_create
+        scorers = iter([workflows["Buffy"], workflows["Anya"]])
+
+        def get_then_reserve(**kwargs):
+            # A reservation is made by another request right after the workflow is read
+            result = get_or_create(**kwargs)
+            PeerWorkflow.create_item(next(scorers), answers["Xander"]["uuid"])
+            return result
+
+        for reserved_count, start in ((3, peer_api.on_start), (4, peer_api.create_peer_workflow)):
+            with patch.object(PeerWorkflow.objects, 'get_or_create', side_effect=get_then_reserve):
+                start(answers["Xander"]["uuid"])
+
+            xander_workflow = PeerWorkflow.get_by_submission_uuid(answers["Xander"]["uuid"])
+            self.assertEqual(xander_workflow.reserved_count, reserved_count)
+            self.assertEqual(xander_workflow.reserved_count, xander_workflow.graded_by.count())
+
+    def test_review_queue_respects_lease_expiration(self):
+        answers, workflows = self._create_review_queue()
+
+        # Xander's expired lease does not count against him, the live one does
+        self.assertEqual(workflows["Buffy"].get_submission_for_review(2), answers["Xander"]["uuid"])
+        self.assertEqual(workflows["Buffy"].get_submission_for_review(1), answers["Giles"]["uuid"])
+
+        # Once every lease has expired, Xander is back in the queue
+        with freeze_time(timezone.now() + PeerWorkflow.TIME_LIMIT + datetime.timedelta(minutes=1)):
+            self.assertEqual(workflows["Buffy"].get_submission_for_review(1), answers["Xander"]["uuid"])
+
+    @data(1, 2, 3)
+    def test_review_queue_matches_legacy_query(self, graded_by):
+        __, workflows = self._create_review_queue()
+
+        for workflow in workflows.values():
+            with override_settings(ORA_PEER_QUEUE_USE_COUNTERS=False):
+                expected = workflow.get_submission_for_review(graded_by)
+            with override_settings(ORA_PEER_QUEUE_USE_COUNTERS=True):
+                self.assertEqual(workflow.get_submission_for_review(graded_by), expected)
+
+    @override_settings(ORA_PEER_ATOMIC_ALLOCATION=True)
+    def test_claim_submission_for_review(self):
+        answers, workflows = self._create_review_queue()
+
+        # The claimed submission is the head of the queue, reserved for the scorer
+        expected = workflows["Buffy"].get_submission_for_review(2)
+        self.assertEqual(workflows["Buffy"].claim_submission_for_review(2), expected)
+        self.assertTrue(workflows["Buffy"].graded.filter(submission_uuid=expected).exists())
+        self.assertEqual(workflows["Buffy"].find_active_assessments().submission_uuid, expected)
+
+        # The API reserves it once, rather than creating a second item
+        submission = peer_api.get_submission_to_assess(answers["Giles"]["uuid"], 2)
+        self.assertEqual(submission["uuid"], workflows["Giles"].find_active_assessments().submission_uuid)
+        self.assertEqual(PeerWorkflowItem.objects.filter(scorer=workflows["Giles"]).count(), 2)
+
+    def test_claim_submission_for_review_rechecks_candidate(self):
+        answers, workflows = self._create_review_queue()
+
+        # A candidate whose leases filled up after it was read is skipped
+        with patch.object(PeerWorkflow, 'count_active_reservations', side_effect=[2, 0]):
+            submission_uuid = workflows["Buffy"].claim_submission_for_review(2)
+        self.assertEqual(submission_uuid, answers["Willow"]["uuid"])
+
+    def test_count_active_reservations_for_update(self):
+        answers, workflows = self._create_review_queue()
+        candidate = PeerWorkflow.get_by_submission_uuid(answers["Willow"]["uuid"])
+        reservations = candidate.count_active_reservations()
+        PeerWorkflow.create_item(workflows["Buffy"], answers["Willow"]["uuid"])
+
+        # The locking read counts the same items as the plain one
+        with patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update) as lock:
+            self.assertEqual(candidate.count_active_reservations(for_update=True), reservations + 1)
+        lock.assert_called_once()
+        self.assertEqual(candidate.count_active_reservations(), reservations + 1)
+
+    def test_claim_submission_for_review_error(self):
+        __, workflows = self._create_review_queue()
+        with patch.object(PeerWorkflow, 'create_item', side_effect=DatabaseError("Oh no.")):
+            with raises(peer_api.PeerAssessmentInternalError):
+                workflows["Buffy"].claim_submission_for_review(2)
+
     def test_get_submission_for_over_grading(self):
         buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
         xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
@@ -1144,6 +1328,54 @@ class TestPeerApi(CacheResetTest):
         if not (submission_uuid in (buffy_answer['uuid'], willow_answer['uuid'])):
             self.fail("Submission was not Buffy or Willow's.")
 
+    def test_get_submission_for_over_grading_is_uniform(self):
+        # The scorer has already graded a contiguous block of the oldest submissions
+        graded = [
+            self._create_student_and_submission(name, "{}'s answer".format(name))[0]
+            for name in ("Buffy", "Willow", "Giles")
+        ]
+        dawn_answer, _ = self._create_student_and_submission("Dawn", "Dawn's answer")
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+        eligible = [dawn_answer['uuid']] + [
+            self._create_student_and_submission(name, "{}'s answer".format(name))[0]['uuid']
+            for name in ("Anya", "Spike")
+        ]
+        xander_workflow = PeerWorkflow.get_by_submission_uuid(xander_answer['uuid'])
+        for answer in graded:
+            PeerWorkflow.create_item(xander_workflow, answer["uuid"])
+
+        # Every random offset maps to a distinct eligible submission, so each
+        # of them is equally likely to be chosen
+        with patch(
+            'openassessment.assessment.models.peer.random.randrange',
+            side_effect=range(len(eligible)),
+        ) as mock_randrange:
+            chosen = [xander_workflow.get_submission_for_over_grading() for _ in eligible]
+        self.assertEqual(chosen, eligible)
+        for call in mock_randrange.call_args_list:
+            self.assertEqual(call.args, (len(eligible),))
+
+        # The candidates are counted, then only the chosen one is read
+        with self.assertNumQueries(2):
+            xander_workflow.get_submission_for_over_grading()
+
+    def test_get_submission_for_over_grading_none_available(self):
+        buffy_answer, _ = self._create_student_and_submission("Buffy", "Buffy's answer")
+        xander_answer, _ = self._create_student_and_submission("Xander", "Xander's answer")
+
+        xander_workflow = PeerWorkflow.get_by_submission_uuid(xander_answer['uuid'])
+        PeerWorkflow.create_item(xander_workflow, buffy_answer["uuid"])
+
+        self.assertIsNone(xander_workflow.get_submission_for_over_grading())
+
+    @patch('openassessment.assessment.models.peer.PeerWorkflow.objects.filter')
+    def test_failure_to_get_over_grading_submission(self, mock_filter):
+        with raises(peer_api.PeerAssessmentInternalError):
+            tim_answer, _ = self._create_student_and_submission("Tim", "Tim's answer", MONDAY)
+            tim_workflow = PeerWorkflow.get_by_submission_uuid(tim_answer['uuid'])
+            mock_filter.side_effect = DatabaseError("Oh no.")
+            tim_workflow.get_submission_for_over_grading()
+
     def test_create_feedback_on_an_assessment(self):
         tim_sub, tim = self._create_student_and_submission("Tim", "Tim's answer")
         bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
@@ -1236,6 +1468,7 @@ class TestPeerApi(CacheResetTest):
             submitted_assessments = peer_api.get_submitted_assessments(bob_sub["uuid"])
             self.assertEqual(1, len(submitted_assessments))
 
+    @override_settings(ORA_PEER_QUEUE_USE_COUNTERS=False)
     @patch('openassessment.assessment.models.peer.PeerWorkflow.objects.raw')
     def test_failure_to_get_review_submission(self, mock_filter):
         with raises(peer_api.PeerAssessmentInternalError):
@@ -1244,6 +1477,14 @@ class TestPeerApi(CacheResetTest):
             mock_filter.side_effect = DatabaseError("Oh no.")
             tim_workflow.get_submission_for_review(3)
 
+    @patch('openassessment.assessment.models.peer.PeerWorkflow.objects.filter')
+    def test_failure_to_get_review_submission_from_queue(self, mock_filter):
+        with raises(peer_api.PeerAssessmentInternalError):
+            tim_answer, _ = self._create_student_and_submission("Tim", "Tim's answer", MONDAY)
+            tim_workflow = PeerWorkflow.get_by_submission_uuid(tim_answer['uuid'])
+            mock_filter.side_effect = DatabaseError("Oh no.")
+            tim_workflow.get_submission_for_review(3)
+
     @patch('openassessment.assessment.models.AssessmentFeedback.objects.get')
     def test_get_assessment_feedback_error(self, mock_filter):
         with raises(peer_api.PeerAssessmentInternalError):
@@ -1350,6 +1591,59 @@ class TestPeerApi(CacheResetTest):
         self.assertEqual(max_scores['secret'], 1)
         self.assertEqual(max_scores['giveup'], 10)
 
+    def test_get_max_scores_cached(self):
+        self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
+        sub = peer_api.get_submission_to_assess(bob_sub['uuid'], 1)
+        peer_api.create_assessment(
+            bob_sub["uuid"], bob["student_id"],
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            RUBRIC_DICT,
+            1
+        )
+        expected = peer_api.get_rubric_max_scores(sub["uuid"])
+
+        # The max scores are cached by rubric, so only the latest assessment is looked up
+        with self.assertNumQueries(1):
+            self.assertEqual(peer_api.get_rubric_max_scores(sub["uuid"]), expected)
+
+        # The assessments already loaded by the caller are used without any query
+        assessments = peer_api.get_assessments(sub["uuid"])
+        with self.assertNumQueries(0):
+            self.assertEqual(peer_api.get_rubric_max_scores(sub["uuid"], assessments + [None]), expected)
+
+    def test_get_bulk_max_scores(self):
+        tim_sub, __ = self._create_student_and_submission("Tim", "Tim's answer")
+        bob_sub, bob = self._create_student_and_submission("Bob", "Bob's answer")
+        sally_sub, sally = self._create_student_and_submission("Sally", "Sally's answer")
+        for scorer_sub, scorer in ((bob_sub, bob), (sally_sub, sally)):
+            peer_api.get_submission_to_assess(scorer_sub['uuid'], 1)
+            peer_api.create_assessment(
+                scorer_sub["uuid"], scorer["student_id"],
+                ASSESSMENT_DICT['options_selected'],
+                ASSESSMENT_DICT['criterion_feedback'],
+                ASSESSMENT_DICT['overall_feedback'],
+                RUBRIC_DICT,
+                1
+            )
+
+        assessed_uuids = set(
+            Assessment.objects.values_list('submission_uuid', flat=True)
+        )
+        submission_uuids = [tim_sub["uuid"], bob_sub["uuid"], sally_sub["uuid"]]
+        with self.assertNumQueries(1):
+            max_scores = peer_api.get_bulk_rubric_max_scores(submission_uuids)
+
+        self.assertEqual(set(max_scores), set(submission_uuids))
+        for submission_uuid in submission_uuids:
+            if submission_uuid in assessed_uuids:
+                self.assertEqual(max_scores[submission_uuid], peer_api.get_rubric_max_scores(submission_uuid))
+                self.assertEqual(max_scores[submission_uuid]['giveup'], 10)
+            else:
+                self.assertIsNone(max_scores[submission_uuid])
+
     def test_no_open_assessment(self):
         with raises(peer_api.PeerAssessmentWorkflowError):
             self._create_student_and_submission("Tim", "Tim's answer")
@@ -1424,6 +1718,163 @@ class TestPeerApi(CacheResetTest):
             mock_filter.side_effect = DatabaseError("Bad things happened")
             peer_api.get_assessments(sub["uuid"])
 
+    def _create_peer_assessments(self, submission, num_assessments, assessment_dicts=None):
+        """
+        Have `num_assessments` new learners assess the given submission,
+        with the given assessment dicts in turn (ASSESSMENT_DICT by default).
+        """
+        assessment_dicts = assessment_dicts or [ASSESSMENT_DICT] * num_assessments
+        for index, assessment_dict in enumerate(assessment_dicts):
+            scorer_sub, scorer = self._create_student_and_submission(
+                "Scorer{}".format(index), "Scorer {} answer".format(index)
+            )
+            peer_api.get_submission_to_assess(scorer_sub['uuid'], num_assessments)
+            assessment = peer_api.create_assessment(
+                scorer_sub['uuid'],
+                scorer['student_id'],
+                assessment_dict['options_selected'],
+                assessment_dict['criterion_feedback'],
+                assessment_dict['overall_feedback'],
+                RUBRIC_DICT,
+                num_assessments,
+            )
+            self.assertEqual(assessment['submission_uuid'], submission['uuid'])
+
+    def test_get_score_marks_items_scored_in_bulk(self):
+        tim_sub, __ = self._create_student_and_submission("Tim", "Tim's answer")
+        self._create_peer_assessments(tim_sub, 4)
+        requirements = {'must_grade': 0, 'must_be_graded_by': 3}
+
+        with CaptureQueriesContext(connection) as queries:
+            score = peer_api.get_score(tim_sub['uuid'], requirements, COURSE_SETTINGS)
+        item_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "assessment_peerworkflowitem"')
+        ]
+        self.assertEqual(len(item_updates), 1)
+
+        # The three earliest assessments are scored, and all four are reported
+        workflow = PeerWorkflow.get_by_submission_uuid(tim_sub['uuid'])
+        scored_ids = set(workflow.graded_by.filter(scored=True).values_list('assessment_id', flat=True))
+        self.assertEqual(scored_ids, set(sorted(score['contributing_assessments'])[:3]))
+        self.assertEqual(len(score['contributing_assessments']), 4)
+        self.assertEqual(score['points_earned'], 6)
+        self.assertEqual(score['points_possible'], 14)
+
+        # Once scored, the items are not updated again and the score does not change
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(peer_api.get_score(tim_sub['uuid'], requirements, COURSE_SETTINGS), score)
+        self.assertFalse(any(query['sql'].startswith('UPDATE') for query in queries.captured_queries))
+
+    def test_get_score_num_queries(self):
+        tim_sub, __ = self._create_student_and_submission("Tim", "Tim's answer")
+        self._create_peer_assessments(tim_sub, 3)
+        requirements = {'must_grade': 0, 'must_be_graded_by': 3}
+
+        # Finishing the submitter step (3), loading the workflow and its items with their
+        # assessments (2), marking the items scored (1) and the parts of the scored assessments (1)
+        with self.assertNumQueries(7):
+            peer_api.get_score(tim_sub['uuid'], requirements, COURSE_SETTINGS)
+
+    def _create_scored_submission(self):
+        """
+        Create a peer-only submission graded 6 out of 14 by the median of three
+        peer assessments, which would be graded 9 out of 14 by their mean.
+        """
+        tim_sub, __ = self._create_student_and_submission("Tim", "Tim's answer", steps=['peer'])
+        self._create_peer_assessments(tim_sub, 3, [ASSESSMENT_DICT, ASSESSMENT_DICT_FAIL, ASSESSMENT_DICT_PASS])
+        requirements = {'peer': {'must_grade': 0, 'must_be_graded_by': 3}}
+        workflow = workflow_api.update_from_assessments(tim_sub['uuid'], requirements, COURSE_SETTINGS)
+        self.assertEqual(workflow['score']['points_earned'], 6)
+        return tim_sub
+
+    def test_recompute_peer_scores(self):
+        tim_sub = self._create_scored_submission()
+        course_id, item_id = STUDENT_ITEM['course_id'], STUDENT_ITEM['item_id']
+
+        # The recorded score already uses the median, and unscored submissions are left out
+        self.assertEqual(peer_api.recompute_peer_scores(course_id, 'median'), [])
+
+        with self.assertNumQueries(4):
+            changes = peer_api.recompute_peer_scores(course_id, 'mean', item_id=item_id)
+        self.assertEqual(changes, [{
+            'submission_uuid': tim_sub['uuid'],
+            'old_points_earned': 6,
+            'old_points_possible': 14,
+            'points_earned': 9,
+            'points_possible': 14,
+        }])
+        self.assertEqual(peer_api.recompute_peer_scores(course_id, 'mean', item_id='other_item'), [])
+        self.assertEqual(peer_api.recompute_peer_scores('other_course', 'mean'), [])
+
+        self.assertEqual(peer_api.apply_peer_score_changes(changes), 1)
+        self.assertEqual(sub_api.get_latest_score_for_submission(tim_sub['uuid'])['points_earned'], 9)
+        self.assertEqual(peer_api.recompute_peer_scores(course_id, 'mean'), [])
+
+    @override_settings(FEATURES=FEATURES_WITH_GRADING_STRATEGY_ON)
+    @data('median', 'mean')
+    def test_recompute_peer_scores_matches_get_score(self, grading_strategy):
+        tim_sub = self._create_scored_submission()
+        requirements = {'must_grade': 0, 'must_be_graded_by': 3, 'grading_strategy': grading_strategy}
+        score = peer_api.get_score(tim_sub['uuid'], requirements, COURSE_SETTINGS)
+
+        sub_api.set_score(tim_sub['uuid'], 0, 1)
+        changes = peer_api.recompute_peer_scores(STUDENT_ITEM['course_id'], grading_strategy)
+        self.assertEqual(
+            [(change['points_earned'], change['points_possible']) for change in changes],
+            [(score['points_earned'], score['points_possible'])],
+        )
+
+    @data('median', 'mean')
+    def test_recompute_peer_scores_points_possible_from_rubric_used_by_get_score(self, grading_strategy):
+        tim_sub = self._create_scored_submission()
+
+        # An unscored peer assessment, dated before the scored ones, uses an edited rubric worth 24 points
+        rubric_dict = copy.deepcopy(RUBRIC_DICT)
+        rubric_dict['criteria'][2]['options'][2]['points'] = "20"
+        xander_sub, xander = self._create_student_and_submission("Xander", "Xander's answer")
+        PeerWorkflow.create_item(PeerWorkflow.get_by_submission_uuid(xander_sub['uuid']), tim_sub['uuid'])
+        peer_api.create_assessment(
+            xander_sub['uuid'],
+            xander['student_id'],
+            ASSESSMENT_DICT['options_selected'],
+            ASSESSMENT_DICT['criterion_feedback'],
+            ASSESSMENT_DICT['overall_feedback'],
+            rubric_dict,
+            3,
+            scored_at=datetime.datetime(2000, 1, 1, tzinfo=pytz.UTC),
+        )
+
+        # `get_score` takes points possible from the first of the items ordered by "-assessment"
+        workflow = PeerWorkflow.get_by_submission_uuid(tim_sub['uuid'])
+        items = workflow.graded_by.filter(assessment__score_type='PE').order_by('-assessment')
+        self.assertFalse(items[0].scored)
+        self.assertEqual(items[0].assessment.points_possible, 24)
+
+        # Points earned still only come from the three scored assessments
+        changes = peer_api.recompute_peer_scores(STUDENT_ITEM['course_id'], grading_strategy)
+        self.assertEqual(
+            [(change['points_earned'], change['points_possible']) for change in changes],
+            [({'median': 6, 'mean': 9}[grading_strategy], 24)],
+        )
+
+    def test_recompute_peer_scores_skips_staff_graded(self):
+        tim_sub = self._create_scored_submission()
+        rubric = rubric_from_dict(RUBRIC_DICT)
+        Assessment.create(rubric, "staff", tim_sub['uuid'], "ST")
+
+        self.assertEqual(peer_api.recompute_peer_scores(STUDENT_ITEM['course_id'], 'mean'), [])
+
+    def test_recompute_peer_scores_invalid_strategy(self):
+        with raises(peer_api.PeerAssessmentRequestError):
+            peer_api.recompute_peer_scores(STUDENT_ITEM['course_id'], 'mode')
+
+    @patch.object(PeerWorkflowItem.objects, 'filter')
+    def test_recompute_peer_scores_error(self, mock_filter):
+        mock_filter.side_effect = DatabaseError("Bad things happened")
+        with raises(PeerAssessmentInternalError):
+            peer_api.recompute_peer_scores(STUDENT_ITEM['course_id'], 'mean')
+
     def test_choose_score(self):
         self.assertEqual(0, Assessment.get_median_score([]))
         self.assertEqual(5, Assessment.get_median_score([5]))
@@ -1554,7 +2005,7 @@ class TestPeerApi(CacheResetTest):
         xander_sub, _ = self._create_student_and_submission("Xander", "Xander's answer")
 
         # buffy peer grades xander
-        peer_api.get_submission_to_assess(buffy_sub['uuid'], buffy['student_id'])
+        peer_api.get_submission_to_assess(buffy_sub['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             buffy_sub['uuid'],
             buffy['student_id'],
@@ -1574,7 +2025,7 @@ class TestPeerApi(CacheResetTest):
         xander_sub, _ = self._create_student_and_submission("Xander", "Xander's answer")
 
         # buffy peer grades xander
-        peer_api.get_submission_to_assess(buffy_sub['uuid'], buffy['student_id'])
+        peer_api.get_submission_to_assess(buffy_sub['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             buffy_sub['uuid'],
             buffy['student_id'],
@@ -1658,7 +2109,7 @@ class TestPeerApi(CacheResetTest):
         tim_sub, tim = self._create_student_and_submission('Tim', 'Tim submission')
 
         # Bob assesses someone else, satisfying his requirements
-        peer_api.get_submission_to_assess(bob_sub['uuid'], bob['student_id'])
+        peer_api.get_submission_to_assess(bob_sub['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             bob_sub['uuid'],
             bob['student_id'],
@@ -1670,7 +2121,7 @@ class TestPeerApi(CacheResetTest):
         )
 
         # Tim grades Bob, so now Bob has one assessment with a good grade
-        peer_api.get_submission_to_assess(tim_sub['uuid'], tim['student_id'])
+        peer_api.get_submission_to_assess(tim_sub['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             tim_sub['uuid'],
             tim['student_id'],
@@ -1692,7 +2143,7 @@ class TestPeerApi(CacheResetTest):
         sue_sub, sue = self._create_student_and_submission('Sue', 'Sue submission')
 
         # Sue grades the only person in the queue, who is Tim because Tim still needs an assessment
-        peer_api.get_submission_to_assess(sue_sub['uuid'], sue['student_id'])
+        peer_api.get_submission_to_assess(sue_sub['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             sue_sub['uuid'],
             sue['student_id'],
@@ -1704,7 +2155,7 @@ class TestPeerApi(CacheResetTest):
         )
 
         # Sue grades the only person she hasn't graded yet (Bob), with a failing grade
-        peer_api.get_submission_to_assess(sue_sub['uuid'], sue['student_id'])
+        peer_api.get_submission_to_assess(sue_sub['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             sue_sub['uuid'],
             sue['student_id'],
@@ -1816,7 +2267,7 @@ class TestPeerApi(CacheResetTest):
         for i in range(4):
             sub, student = user_submissions[i]
             # User 0 can't assess themselves so they assess learner 1 but the next three assess learner 0
-            submission_to_assess = peer_api.get_submission_to_assess(sub['uuid'], student['student_id'])
+            submission_to_assess = peer_api.get_submission_to_assess(sub['uuid'], REQUIRED_GRADED_BY)
             assert get_submission_index(submission_to_assess) == (1 if i == 0 else 0)
 
             peer_api.create_assessment(
@@ -1895,7 +2346,7 @@ class TestPeerApi(CacheResetTest):
         # Have the target student submit her required assessment, they should now be waiting.
         peer_api.get_submission_to_assess(
             target_learner_sub['uuid'],
-            target_learner['student_id']
+            REQUIRED_GRADED_BY
         )
         peer_api.create_assessment(
             target_learner_sub['uuid'],
@@ -1914,12 +2365,12 @@ class TestPeerApi(CacheResetTest):
         )
 
         # Call get_submission_to_assess once more so that target_learner has an open incomplete peer assessment
-        peer_api.get_submission_to_assess(target_learner_sub['uuid'], target_learner['student_id'])
+        peer_api.get_submission_to_assess(target_learner_sub['uuid'], REQUIRED_GRADED_BY)
 
         # Call get_submission_to_assess so all five learners in other_learner_submissions are
         # currently assessing target_learner
         for sub, student in other_learner_submissions:
-            chosen_submission = peer_api.get_submission_to_assess(sub['uuid'], student['student_id'])
+            chosen_submission = peer_api.get_submission_to_assess(sub['uuid'], len(other_learner_submissions) + 1)
             self.assertIsNotNone(chosen_submission)
             self.assertEqual(chosen_submission['uuid'], target_learner_sub['uuid'])
 
@@ -1990,7 +2441,7 @@ class TestPeerApi(CacheResetTest):
         self.assertEqual(1, peer_api.required_peer_grades(submission['uuid'], peer_requirements, COURSE_SETTINGS))
 
         # The target learner assesses a peer, so they have completed their requirements.
-        peer_api.get_submission_to_assess(submission['uuid'], learner['student_id'])
+        peer_api.get_submission_to_assess(submission['uuid'], REQUIRED_GRADED_BY)
         peer_api.create_assessment(
             submission['uuid'],
             learner['student_id'],
@@ -2008,7 +2459,7 @@ class TestPeerApi(CacheResetTest):
             while current_peer_review_uuid != submission['uuid']:
                 submission_to_assess = peer_api.get_submission_to_assess(
                     grading_learner_submission['uuid'],
-                    grading_learner['student_id']
+                    peer_requirements['must_be_graded_by']
                 )
                 current_peer_review_uuid = submission_to_assess['uuid']
                 peer_api.create_assessment(
@@ -2204,7 +2655,7 @@ class TestPeerApi(CacheResetTest):
         with freeze_time(t0 + datetime.timedelta(days=1)):
             for submission, learner in other_students:
                 for _ in range(5):
-                    peer_api.get_submission_to_assess(submission['uuid'], learner['student_id'])
+                    peer_api.get_submission_to_assess(submission['uuid'], REQUIRED_GRADED_BY)
                     peer_api.create_assessment(
                         submission['uuid'],
                         learner['student_id'],
@@ -2226,7 +2677,7 @@ class TestPeerApi(CacheResetTest):
         # Alice doesn't complete her required grades until t8, which then gives her a score
         with freeze_time(t0 + datetime.timedelta(days=8)):
             for _ in range(5):
-                peer_api.get_submission_to_assess(alice_sub['uuid'], alice['student_id'])
+                peer_api.get_submission_to_assess(alice_sub['uuid'], REQUIRED_GRADED_BY)
                 peer_api.create_assessment(
                     alice_sub['uuid'],
                     alice['student_id'],
@@ -2423,6 +2874,57 @@ class PeerWorkflowTest(CacheResetTest):
         PeerWorkflow.create_item(scorer_workflow, submitter_sub['uuid'])
 
 
+class PeerAllocationConcurrencyTest(TransactionCacheResetTest):
+    """
+    Claim peer submissions for many simultaneous requesters.
+
+    On databases with row locks this exercises SELECT ... FOR UPDATE SKIP LOCKED;
+    the SQLite test database falls back to serializing claims in-process.
+    """
+    REQUESTERS = 200
+    GRADED_BY = 3
+
+    def _claim_concurrently(self, workflows):
+        """
+        Call claim_submission_for_review for every workflow at the same time.
+        """
+        barrier = threading.Barrier(len(workflows))
+        errors = []
+
+        def claim(workflow):
+            try:
+                barrier.wait()
+                workflow.claim_submission_for_review(self.GRADED_BY)
+            except Exception as ex:  # pylint: disable=broad-except
+                errors.append(ex)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim, args=(workflow,)) for workflow in workflows]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_no_over_allocation(self):
+        for index in range(self.REQUESTERS):
+            student_item = dict(STUDENT_ITEM, student_id='learner_{}'.format(index))
+            submission = sub_api.create_submission(student_item, 'answer {}'.format(index))
+            peer_api.on_start(submission['uuid'])
+
+        errors = self._claim_concurrently(list(PeerWorkflow.objects.all()))
+        self.assertEqual(errors, [])
+
+        # Every requester got a submission, and none went to more than GRADED_BY reviewers
+        self.assertEqual(PeerWorkflowItem.objects.count(), self.REQUESTERS)
+        self.assertEqual(PeerWorkflowItem.objects.values('scorer').distinct().count(), self.REQUESTERS)
+        reviewers = PeerWorkflowItem.objects.values('author').annotate(count=Count('id'))
+        self.assertLessEqual(max(row['count'] for row in reviewers), self.GRADED_BY)
+        for workflow in PeerWorkflow.objects.all():
+            self.assertEqual(workflow.reserved_count, workflow.graded_by.count())
+
+
 class AssessmentFeedbackTest(CacheResetTest):
     """
     Tests for assessment feedback.
@@ -4,7 +4,14 @@ Tests for assessment models.
 
 import copy
 
-from openassessment.assessment.models import Criterion, CriterionOption, InvalidRubricSelection, Rubric
+from openassessment.assessment.models import (
+    RUBRIC_INDEX_CACHE,
+    Criterion,
+    CriterionOption,
+    InvalidRubricSelection,
+    Rubric,
+    RubricIndexCache,
+)
 from openassessment.assessment.test.constants import RUBRIC
 from openassessment.test_utils import CacheResetTest
 
@@ -150,6 +157,60 @@ class RubricIndexTest(CacheResetTest):
             self.rubric.index.find_option_for_points("test criterion 1", 10)
 
 
+class RubricIndexCacheTest(CacheResetTest):
+    """
+    Test the process-wide cache of rubric indexes.
+    """
+
+    def _create_rubric(self, num):
+        """
+        Create a rubric with one criterion and one option.
+        """
+        rubric = Rubric.objects.create(content_hash=f"rubric {num}")
+        criterion = Criterion.objects.create(rubric=rubric, name="test criterion", order_num=0)
+        CriterionOption.objects.create(criterion=criterion, name="test option", order_num=0, points=1)
+        return rubric
+
+    def test_freshly_loaded_rubrics_share_the_index(self):
+        rubric = self._create_rubric(0)
+        option = rubric.index.find_option("test criterion", "test option")
+
+        with self.assertNumQueries(1):
+            loaded_rubric = Rubric.objects.get(content_hash="rubric 0")
+            self.assertEqual(loaded_rubric.index.find_option("test criterion", "test option"), option)
+
+        self.assertEqual(RUBRIC_INDEX_CACHE.stats(), {"hits": 1, "misses": 1, "size": 1, "max_size": 256})
+
+    def test_recreated_rubric_is_reindexed(self):
+        rubric = self._create_rubric(0)
+        old_index = rubric.index
+        rubric.delete()
+
+        new_rubric = self._create_rubric(0)
+        self.assertIsNot(new_rubric.index, old_index)
+        self.assertEqual(new_rubric.index.rubric.id, new_rubric.id)
+        self.assertEqual(RUBRIC_INDEX_CACHE.stats()["misses"], 2)
+
+    def test_least_recently_used_index_is_evicted(self):
+        cache = RubricIndexCache(max_size=2)
+        rubrics = [self._create_rubric(num) for num in range(3)]
+        cache.get(rubrics[0])
+        cache.get(rubrics[1])
+        cache.get(rubrics[0])
+        cache.get(rubrics[2])
+
+        # The second rubric was used least recently, so it was evicted
+        with self.assertNumQueries(0):
+            cache.get(rubrics[0])
+            cache.get(rubrics[2])
+        with self.assertNumQueries(2):
+            cache.get(rubrics[1])
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 4, "size": 2, "max_size": 2})
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "size": 0, "max_size": 2})
+
+
 class RubricHashTest(CacheResetTest):
     """
     Tests of the rubric content and structure hash.
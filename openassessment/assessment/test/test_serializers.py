@@ -5,10 +5,14 @@ Tests for assessment serializers.
 import copy
 import json
 import os.path
+from unittest.mock import patch
 
-from openassessment.assessment.models import Assessment, AssessmentFeedback, AssessmentPart
-from openassessment.assessment.serializers import (AssessmentFeedbackSerializer, InvalidRubric, full_assessment_dict,
-                                                   rubric_from_dict)
+from django.core.cache import cache
+
+from openassessment.assessment.models import Assessment, AssessmentFeedback, AssessmentPart, Rubric
+from openassessment.assessment.serializers import (AssessmentFeedbackSerializer, InvalidRubric, RubricSerializer,
+                                                   clear_rubric_lookups, full_assessment_dict, full_assessment_dicts,
+                                                   rubric_from_dict, serialize_assessments)
 from openassessment.test_utils import CacheResetTest
 
 from .constants import RUBRIC
@@ -37,6 +41,51 @@ class RubricDeserializationTest(CacheResetTest):
         self.assertEqual(rubric_i.id, rubric_j.id)
         rubric_i.delete()
 
+    def test_rubric_lookup_memoized(self):
+        rubric_data = json_data('data/rubric/project_plan_rubric.json')
+        with self.captureOnCommitCallbacks(execute=True):
+            rubric = rubric_from_dict(rubric_data)
+
+        # Once committed, the same rubric dict is resolved without hashing or queries
+        with self.assertNumQueries(0):
+            with patch.object(Rubric, 'content_hash_from_dict') as mock_hash:
+                memoized_rubric = rubric_from_dict(rubric_data)
+        mock_hash.assert_not_called()
+        self.assertEqual(memoized_rubric, rubric)
+        self.assertEqual(memoized_rubric.content_hash, rubric.content_hash)
+        self.assertEqual(memoized_rubric.structure_hash, rubric.structure_hash)
+
+        # Other processes find it in the Django cache
+        clear_rubric_lookups()
+        with self.assertNumQueries(0):
+            self.assertEqual(rubric_from_dict(rubric_data), rubric)
+
+    def test_rubric_lookup_not_memoized_before_commit(self):
+        rubric_data = json_data('data/rubric/project_plan_rubric.json')
+        with self.captureOnCommitCallbacks(execute=False):
+            rubric = rubric_from_dict(rubric_data)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(rubric_from_dict(rubric_data), rubric)
+
+    def test_max_scores_from_cache(self):
+        rubric = rubric_from_dict(json_data('data/rubric/project_plan_rubric.json'))
+        cache.clear()
+
+        max_scores = RubricSerializer.max_scores_from_cache(rubric)
+        self.assertEqual(max_scores, {
+            criterion.name: max(option.points for option in criterion.options.all())
+            for criterion in rubric.criteria.all()
+        })
+
+        # Serializing the rubric stored its max scores alongside it
+        with self.assertNumQueries(0):
+            self.assertEqual(RubricSerializer.max_scores_from_cache(rubric), max_scores)
+
+        local_cache = {}
+        RubricSerializer.max_scores_from_cache(rubric, local_cache)
+        self.assertEqual(local_cache, {rubric.content_hash: max_scores})
+
     def test_rubric_requires_positive_score(self):
         with self.assertRaises(InvalidRubric):
             rubric_from_dict(json_data('data/rubric/no_points.json'))
@@ -153,3 +202,46 @@ class AssessmentSerializerTest(CacheResetTest):
         # Verify that the assessment dict correctly serialized the criterion with no options.
         self.assertIs(serialized['parts'][2]['option'], None)
         self.assertEqual(serialized['parts'][2]['criterion']['name'], "feedback only")
+
+    def test_full_assessment_dicts(self):
+        rubric = rubric_from_dict(RUBRIC)
+        for scorer, selected in (
+            ("Bob", {"vøȼȺƀᵾłȺɍɏ": "𝓰𝓸𝓸𝓭", "ﻭɼค๓๓คɼ": "єχ¢єℓℓєηт"}),
+            ("Tim", {"vøȼȺƀᵾłȺɍɏ": "𝒑𝒐𝒐𝒓", "ﻭɼค๓๓คɼ": "𝓰𝓸𝓸𝓭"}),
+            ("Sue", {"vøȼȺƀᵾłȺɍɏ": "єχ¢єℓℓєηт", "ﻭɼค๓๓คɼ": "єχ¢єℓℓєηт"}),
+        ):
+            assessment = Assessment.create(rubric, scorer, "submission-UUID", "PE")
+            AssessmentPart.create_from_option_names(assessment, selected)
+        expected = [
+            self._summarize(full_assessment_dict(assessment)) for assessment in Assessment.objects.all()
+        ]
+        cache.clear()
+
+        # The assessments with their rubric (1), the parts of all of them (1) and serializing the rubric once (8)
+        with self.assertNumQueries(10):
+            serialized = serialize_assessments(Assessment.objects.all())
+        self.assertEqual([self._summarize(assessment) for assessment in serialized], expected)
+        self.assertEqual([assessment['points_earned'] for assessment in serialized], [4, 1, 3])
+
+        # Afterwards, only the assessments are queried
+        with self.assertNumQueries(1):
+            serialized = serialize_assessments(Assessment.objects.all())
+        self.assertEqual([self._summarize(assessment) for assessment in serialized], expected)
+
+    def test_full_assessment_dicts_empty(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(full_assessment_dicts([]), [])
+
+    @staticmethod
+    def _summarize(assessment_dict):
+        """
+        The scorer, points and selected options of a serialized assessment. The
+        serialized parts refer back to their criterion, so they cannot be compared whole.
+        """
+        return (
+            assessment_dict['id'],
+            assessment_dict['scorer_id'],
+            assessment_dict['points_earned'],
+            assessment_dict['points_possible'],
+            [(part['criterion']['name'], part['option']['name']) for part in assessment_dict['parts']],
+        )
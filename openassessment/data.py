@@ -2,35 +2,46 @@
 Aggregate data for openassessment.
 """
 
-from collections import OrderedDict, defaultdict, namedtuple
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, closing, contextmanager
 import csv
+import glob
 from io import StringIO
-from itertools import chain
+from itertools import chain, islice
 import json
 import logging
+import math
 import os
+import shutil
+import tempfile
+import threading
+import time
 from urllib.parse import urljoin
-from zipfile import ZipFile
+from zipfile import ZIP64_LIMIT, ZipFile
 from typing import List, Set
+from uuid import UUID
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import CharField, F, OuterRef, Subquery, QuerySet
+from django.db import connections
+from django.db.models import CharField, Count, F, OuterRef, Prefetch, Q, Subquery, QuerySet
 from django.db.models.functions import Coalesce
+from django.utils.timezone import now
 from django.utils.translation import gettext as _
 import requests
+from requests.adapters import HTTPAdapter
 
-from submissions.models import Submission
+from submissions.models import Score, ScoreSummary, Submission
 from submissions import api as sub_api
-from submissions.errors import SubmissionNotFoundError
-from openassessment.assessment.score_type_constants import score_type_to_string
+from openassessment.assessment.score_type_constants import STAFF_TYPE, score_type_to_string
 from openassessment.fileupload.exceptions import FileUploadInternalError
 from openassessment.runtime_imports.classes import import_block_structure_transformers, import_external_id
 from openassessment.runtime_imports.functions import get_course_blocks, modulestore
 from openassessment.assessment.api import peer as peer_api
-from openassessment.assessment.models import Assessment, AssessmentFeedback, AssessmentPart
+from openassessment.assessment.models import Assessment, AssessmentFeedback, AssessmentPart, PeerWorkflowItem
 from openassessment.fileupload.api import get_download_url
-from openassessment.workflow.models import AssessmentWorkflow, TeamAssessmentWorkflow
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowStep, TeamAssessmentWorkflow
 
 
 logger = logging.getLogger(__name__)
@@ -61,6 +72,52 @@ def _use_read_replica(queryset):
     )
 
 
+def _chunked(iterable, chunk_size):
+    """
+    Split an iterable into lists of at most `chunk_size` items.
+
+    Args:
+        iterable (iterable): The items to split.
+        chunk_size (int): The maximum number of items in each chunk.
+    Yields:
+        list
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_assessment_parts(assessment):
+    """
+    Return the parts of an assessment ordered by criterion.
+
+    If the parts were already prefetched (see `OraAggregateData._bulk_load_assessments`),
+    they are sorted in memory instead of being queried again.
+
+    Args:
+        assessment (Assessment): The assessment whose parts we want.
+    Returns:
+        iterable of AssessmentPart
+    """
+    if 'parts' in getattr(assessment, '_prefetched_objects_cache', {}):
+        return sorted(assessment.parts.all(), key=lambda part: part.criterion.order_num)
+    return assessment.parts.order_by('criterion__order_num')
+
+
+def _normalize_uuid(submission_uuid):
+    """
+    Submission uuids may be stored with or without hyphens.
+    Return the canonical (hyphenated) form, so they can be used as lookup keys.
+    """
+    try:
+        return str(UUID(submission_uuid))
+    except ValueError:
+        return submission_uuid
+
+
 def _get_course_blocks(course_id):  # pragma: no cover
     """
     Returns untransformed block structure for a given course key.
@@ -147,6 +204,224 @@ def map_anonymized_ids_to_user_data(anonymized_ids: Set[str]) -> dict:
     return anonymous_id_to_user_info_mapping
 
 
+def _stream_position(stream):
+    """
+    Return the current position of a stream, which is the number of bytes
+    written to it for files opened for writing, or 0 if it can't be told.
+    """
+    try:
+        return stream.tell()
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+class ExportPhaseStats:
+    """
+    Statistics of one phase of a data export, see `ExportStats`.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wall_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.bytes = 0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.wall_time if self.wall_time else 0.0
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'wall_time': self.wall_time,
+            'queries': self.queries,
+            'rows': self.rows,
+            'rows_per_second': self.rows_per_second,
+            'bytes': self.bytes,
+        }
+
+    def __str__(self):
+        return (
+            f"{self.name}: {self.wall_time:.2f}s, {self.queries} queries, "
+            f"{self.rows} rows ({self.rows_per_second:.1f} rows/s), {self.bytes} bytes"
+        )
+
+
+def _close_downloaded_file(download):
+    """
+    Close the file of a finished attachment download that will not be archived.
+    """
+    if not download.cancelled() and download.exception() is None:
+        download.result().close()
+
+
+def percentile(sorted_values, percent):
+    """
+    Nearest-rank percentile of an already sorted, non-empty list.
+    """
+    rank = max(math.ceil(percent * len(sorted_values) / 100), 1)
+    return sorted_values[rank - 1]
+
+
+class ExportStats:
+    """
+    Collect the wall time, database query count, rows and bytes of each phase
+    of a data export, and the latency of attachment downloads.
+
+    Phases are measured with the `phase` context manager, or `iter_phase` for
+    generators.  Measuring a phase several times accumulates its statistics.
+    Queries made by nested phases are counted by the enclosing phases too.
+
+    Example usage:
+        >>> stats = ExportStats(callback=lambda phase: logger.info(str(phase)))
+        >>> header, rows = OraAggregateData.collect_ora2_data(course_id, stats=stats)
+        >>> for line in stats.report():
+        >>>     print(line)
+    """
+
+    DOWNLOAD_LATENCY_PERCENTILES = (50, 90, 99)
+
+    def __init__(self, callback=None):
+        """
+        Keyword Arguments:
+            callback (callable): Called with the `ExportPhaseStats` of a phase each time it finishes.
+        """
+        self.phases = OrderedDict()
+        self.download_latencies = []
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def _get_phase(self, name):
+        with self._lock:
+            return self.phases.setdefault(name, ExportPhaseStats(name))
+
+    @contextmanager
+    def _measure(self, phase_stats):
+        """
+        Add the wall time and database queries of the block to `phase_stats`.
+        """
+        query_count = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal query_count
+            query_count += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            try:
+                yield
+            finally:
+                phase_stats.wall_time += time.perf_counter() - start
+                phase_stats.queries += query_count
+
+    def _finish(self, phase_stats):
+        if self._callback is not None:
+            self._callback(phase_stats)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Measure a phase of the export.
+
+        Yields:
+            ExportPhaseStats: the statistics of the phase, whose `rows` and `bytes` can be updated.
+        """
+        phase_stats = self._get_phase(name)
+        with self._measure(phase_stats):
+            yield phase_stats
+        self._finish(phase_stats)
+
+    def iter_phase(self, name, rows):
+        """
+        Measure a phase that produces rows lazily.
+
+        Only the time spent producing the rows is measured, not the time spent consuming them.
+
+        Args:
+            name (str): The name of the phase.
+            rows (iterable): The rows produced by the phase.
+        Yields:
+            the rows
+        """
+        phase_stats = self._get_phase(name)
+        rows = iter(rows)
+        end = object()
+        while True:
+            with self._measure(phase_stats):
+                row = next(rows, end)
+            if row is end:
+                break
+            phase_stats.rows += 1
+            yield row
+        self._finish(phase_stats)
+
+    def record_download(self, latency):
+        """
+        Record the latency, in seconds, of an attachment download.  Thread-safe.
+        """
+        with self._lock:
+            self.download_latencies.append(latency)
+
+    def download_latency_percentiles(self):
+        """
+        Returns:
+            dict mapping each of `DOWNLOAD_LATENCY_PERCENTILES` to a latency in seconds,
+            or an empty dict if there were no downloads.
+        """
+        latencies = sorted(self.download_latencies)
+        if not latencies:
+            return {}
+        return {
+            percent: percentile(latencies, percent)
+            for percent in self.DOWNLOAD_LATENCY_PERCENTILES
+        }
+
+    def as_dict(self):
+        return {
+            'phases': [phase_stats.as_dict() for phase_stats in self.phases.values()],
+            'downloads': len(self.download_latencies),
+            'download_latency_percentiles': self.download_latency_percentiles(),
+        }
+
+    def report(self):
+        """
+        Returns:
+            list of human-readable lines, one per phase, and one for downloads if there were any.
+        """
+        lines = [str(phase_stats) for phase_stats in self.phases.values()]
+        percentiles = self.download_latency_percentiles()
+        if percentiles:
+            lines.append(
+                f"downloads: {len(self.download_latencies)} files, latency " + ", ".join(
+                    f"p{percentile} {latency:.3f}s" for percentile, latency in percentiles.items()
+                )
+            )
+        return lines
+
+
+class NullExportStats(ExportStats):
+    """
+    `ExportStats` that measures nothing, used when no statistics were requested.
+
+    Phases still yield an `ExportPhaseStats`, so that callers can update their
+    rows and bytes, but no time or queries are measured and nothing is kept.
+    """
+
+    @contextmanager
+    def phase(self, name):
+        yield ExportPhaseStats(name)
+
+    def iter_phase(self, name, rows):
+        return iter(rows)
+
+    def record_download(self, latency):
+        pass
+
+
 class CsvWriter:
     """
     Dump openassessment data to CSV files.
@@ -191,7 +466,7 @@ class CsvWriter:
     # to avoid loading thousands of records into memory at once.
     QUERY_INTERVAL = 100
 
-    def __init__(self, output_streams, progress_callback=None):
+    def __init__(self, output_streams, progress_callback=None, stats=None):
         """
         Configure where the writer will write data.
 
@@ -208,6 +483,8 @@ class CsvWriter:
             progress_callback (callable): Callable that accepts
                 no arguments.  Called once per submission loaded
                 from the database.
+            stats (ExportStats): Collects the timings of the 'paginate',
+                'load' and 'write' phases of the export.
 
         Example usage:
             >>> output_streams = {
@@ -223,58 +500,147 @@ class CsvWriter:
             for key, file_handle in output_streams.items()
             if key in self.MODELS
         }
+        self._output_streams = [
+            file_handle for key, file_handle in output_streams.items() if key in self.MODELS
+        ]
         self._progress_callback = progress_callback
+        self._stats = stats if stats is not None else NullExportStats()
 
-    def write_to_csv(self, course_id):
+    def write_to_csv(self, course_id, since=None):
         """
         Write assessment and submission data for a course to CSV files.
 
-        NOTE: The current implementation optimizes for memory usage,
-        but not for the number of database queries.  All the queries
-        use indexed fields (the submission uuid), so they should be
-        relatively quick.
+        Submissions are loaded one page (`QUERY_INTERVAL` submissions) at a time.
+        Each page costs a constant number of queries: the submissions, scores,
+        assessment parts and feedback for the whole page are fetched in bulk.
+
+        If `since` is provided, only an incremental (delta) export is written:
+        the submissions whose workflow was modified or that were assessed
+        after `since`, along with the assessments and scores created after `since`.
+        Assessment feedback has no timestamp, so it is exported for every
+        submission included in the delta.
 
         Args:
             course_id (unicode): The course ID from which to pull data.
 
+        Keyword Arguments:
+            since (datetime): The watermark of a previous export.
+
         Returns:
-            None
+            datetime: The time at which this export started, to be used
+            as the watermark of the next incremental export.
 
         """
+        watermark = now()
+        initial_size = sum(_stream_position(stream) for stream in self._output_streams)
         self._write_csv_headers()
 
         rubric_points_cache = {}
         feedback_option_set = set()
-        for submission_uuid in self._submission_uuids(course_id):
-            self._write_submission_to_csv(submission_uuid)
-
-            # Django 1.4 doesn't follow reverse relations when using select_related,
-            # so we select AssessmentPart and follow the foreign key to the Assessment.
-            parts = _use_read_replica(
-                AssessmentPart.objects.select_related('assessment', 'option', 'option__criterion')
-                .filter(assessment__submission_uuid=submission_uuid)
-                .order_by('assessment__pk')
-            )
-            self._write_assessment_to_csv(parts, rubric_points_cache)
+        pages = self._stats.iter_phase('paginate', self._submission_uuid_pages(course_id, since=since))
+        for submission_uuids in pages:
+            with self._stats.phase('load') as load_phase:
+                submissions = self._bulk_load_submissions(submission_uuids)
+                scores = self._bulk_load_latest_scores(submission_uuids, since=since)
+                parts = self._bulk_load_assessment_parts(submission_uuids, since=since)
+                feedback = self._bulk_load_assessment_feedback(submission_uuids)
+                load_phase.rows += len(submission_uuids)
+
+            with self._stats.phase('write') as write_phase:
+                for submission_uuid in submission_uuids:
+                    submission = submissions.get(_normalize_uuid(submission_uuid))
+                    if submission is not None:
+                        self._write_submission_to_csv(submission)
+
+                    score = scores.get(_normalize_uuid(submission_uuid))
+                    if score is not None:
+                        self._write_score_to_csv(score)
 
-            feedback_query = _use_read_replica(
-                AssessmentFeedback.objects
-                .filter(submission_uuid=submission_uuid)
-                .prefetch_related('options')
+                    self._write_assessment_to_csv(parts.get(submission_uuid, []), rubric_points_cache)
+
+                    assessment_feedback = feedback.get(submission_uuid)
+                    if assessment_feedback is not None:
+                        self._write_assessment_feedback_to_csv(assessment_feedback)
+                        feedback_option_set.update(assessment_feedback.options.all())
+
+                    if self._progress_callback is not None:
+                        self._progress_callback()
+                write_phase.rows += len(submission_uuids)
+
+        with self._stats.phase('write') as write_phase:
+            # The set of available options should be relatively small,
+            # since they're not (currently) user-defined.
+            self._write_feedback_options_to_csv(feedback_option_set)
+            write_phase.bytes = sum(_stream_position(stream) for stream in self._output_streams) - initial_size
+
+        return watermark
+
+    def _submission_uuid_pages(self, course_id, since=None):
+        """
+        Iterate over pages of submission uuids, ordered by workflow creation.
+
+        Uses keyset pagination on (created, id), so each page is an indexed
+        range scan regardless of how far into the course we are.
+
+        Args:
+            course_id (unicode): The ID of the course to retrieve submissions from.
+
+        Keyword Arguments:
+            since (datetime): If provided, only include submissions whose workflow
+                was modified, or that were assessed or scored, after this time.
+
+        Yields:
+            list of submission_uuid (unicode), at most `QUERY_INTERVAL` long
+
+        """
+        workflows = AssessmentWorkflow.objects.filter(course_id=course_id)
+        if since is not None:
+            assessed_since = Assessment.objects.filter(
+                scored_at__gt=since, submission_uuid__in=workflows.values('submission_uuid')
+            ).values('submission_uuid')
+            scored_since = self._submission_uuids_scored_since(course_id, since)
+            changed_since = Q(submission_uuid__in=assessed_since) | Q(submission_uuid__in=scored_since)
+            workflows = workflows.filter(Q(modified__gt=since) | changed_since)
+        last_workflow = None
+
+        while True:
+            query = workflows
+            if last_workflow is not None:
+                later = Q(created__gt=last_workflow['created'])
+                same_time_later_id = Q(created=last_workflow['created'], id__gt=last_workflow['id'])
+                query = query.filter(later | same_time_later_id)
+            page = list(
+                _use_read_replica(query.order_by('created', 'id'))
+                .values('id', 'created', 'submission_uuid')[:self.QUERY_INTERVAL]
             )
-            for assessment_feedback in feedback_query:
-                self._write_assessment_feedback_to_csv(assessment_feedback)
-                # pylint: disable=unnecessary-comprehension
-                feedback_option_set.update({
-                    option for option in assessment_feedback.options.all()
-                })
+            if not page:
+                return
 
-            if self._progress_callback is not None:
-                self._progress_callback()
+            yield [workflow_dict['submission_uuid'] for workflow_dict in page]
+            last_workflow = page[-1]
 
-        # The set of available options should be relatively small,
-        # since they're not (currently) user-defined.
-        self._write_feedback_options_to_csv(feedback_option_set)
+    def _submission_uuids_scored_since(self, course_id, since):
+        """
+        Scores can be set or reset straight through the submissions API (staff
+        overrides, recomputed peer scores) without touching the workflow or its
+        assessments.  Reset scores are not attached to a submission, so every
+        submission of a rescored student item is included.
+
+        Args:
+            course_id (unicode): The ID of the course to retrieve submissions from.
+            since (datetime): Only consider scores created after this time.
+
+        Returns:
+            list of submission_uuid (unicode)
+
+        """
+        rescored_items = Score.objects.filter(
+            student_item__course_id=course_id, created_at__gt=since
+        ).values('student_item_id')
+        submissions = Submission.objects.filter(student_item_id__in=rescored_items)
+        # Workflows store submission uuids as strings, which do not compare
+        # with the submissions' UUID column on every backend.
+        return [str(uuid) for uuid in _use_read_replica(submissions).values_list('uuid', flat=True)]
 
     def _submission_uuids(self, course_id):
         """
@@ -289,29 +655,94 @@ class CsvWriter:
             submission_uuid (unicode)
 
         """
-        num_results = 0
-        start = 0
-        total_results = _use_read_replica(
-            AssessmentWorkflow.objects.filter(course_id=course_id)
-        ).count()
-
-        while num_results < total_results:
-            # Load a subset of the submission UUIDs
-            # We're assuming that peer workflows are immutable,
-            # so if we counted N at the start of the loop,
-            # there should be >= N for us to process.
-            end = start + self.QUERY_INTERVAL
-            query = _use_read_replica(
-                AssessmentWorkflow.objects
-                .filter(course_id=course_id)
-                .order_by('created')
-            ).values('submission_uuid')[start:end]
-
-            for workflow_dict in query:
-                num_results += 1
-                yield workflow_dict['submission_uuid']
-
-            start += self.QUERY_INTERVAL
+        for submission_uuids in self._submission_uuid_pages(course_id):
+            yield from submission_uuids
+
+    def _bulk_load_submissions(self, submission_uuids):
+        """
+        Args:
+            submission_uuids (list of unicode): The submissions to load.
+
+        Returns:
+            dict mapping normalized submission uuids to `Submission` models
+            (with their student items).
+
+        """
+        submissions = _use_read_replica(
+            Submission.objects.select_related('student_item').filter(uuid__in=submission_uuids)
+        )
+        return {str(submission.uuid): submission for submission in submissions}
+
+    def _bulk_load_latest_scores(self, submission_uuids, since=None):
+        """
+        Args:
+            submission_uuids (list of unicode): The submissions to load scores for.
+
+        Keyword Arguments:
+            since (datetime): If provided, only consider scores created after this time.
+
+        Returns:
+            dict mapping normalized submission uuids to the latest `Score` of each
+            submission.  Submissions whose latest score is hidden are left out,
+            matching `sub_api.get_latest_score_for_submission`.
+
+        """
+        scores = Score.objects.select_related('submission').filter(submission__uuid__in=submission_uuids)
+        if since is not None:
+            scores = scores.filter(created_at__gt=since)
+        scores = _use_read_replica(scores.order_by('-id'))
+        latest_scores = {}
+        for score in scores:
+            latest_scores.setdefault(str(score.submission.uuid), score)
+        return {
+            submission_uuid: score
+            for submission_uuid, score in latest_scores.items()
+            if not score.is_hidden()
+        }
+
+    def _bulk_load_assessment_parts(self, submission_uuids, since=None):
+        """
+        Args:
+            submission_uuids (list of unicode): The submissions to load assessment parts for.
+
+        Keyword Arguments:
+            since (datetime): If provided, only include parts of assessments scored after this time.
+
+        Returns:
+            dict mapping submission uuids to lists of `AssessmentPart`s ordered by assessment.
+
+        """
+        # Django 1.4 doesn't follow reverse relations when using select_related,
+        # so we select AssessmentPart and follow the foreign key to the Assessment.
+        parts = AssessmentPart.objects.select_related('assessment', 'criterion', 'option').filter(
+            assessment__submission_uuid__in=submission_uuids
+        )
+        if since is not None:
+            parts = parts.filter(assessment__scored_at__gt=since)
+        parts = _use_read_replica(parts.order_by('assessment__pk', 'pk'))
+        parts_by_submission = defaultdict(list)
+        for part in parts:
+            parts_by_submission[part.assessment.submission_uuid].append(part)
+        return parts_by_submission
+
+    def _bulk_load_assessment_feedback(self, submission_uuids):
+        """
+        Args:
+            submission_uuids (list of unicode): The submissions to load assessment feedback for.
+
+        Returns:
+            dict mapping submission uuids to `AssessmentFeedback` models, with their options.
+
+        """
+        feedback = _use_read_replica(
+            AssessmentFeedback.objects
+            .filter(submission_uuid__in=submission_uuids)
+            .prefetch_related('options')
+        )
+        return {
+            assessment_feedback.submission_uuid: assessment_feedback
+            for assessment_feedback in feedback
+        }
 
     def _write_csv_headers(self):
         """
@@ -320,35 +751,43 @@ class CsvWriter:
         for name, writer in self.writers.items():
             writer.writerow(self.HEADERS[name])
 
-    def _write_submission_to_csv(self, submission_uuid):
+    def _write_submission_to_csv(self, submission):
         """
         Write submission data to CSV.
 
         Args:
-            submission_uuid (unicode): The UUID of the submission to write.
+            submission (Submission): The submission to write.
 
         Returns:
             None
 
         """
-        submission = sub_api.get_submission_and_student(submission_uuid, read_replica=True)
         self._write_unicode('submission', [
-            submission['uuid'],
-            submission['student_item']['student_id'],
-            submission['student_item']['item_id'],
-            submission['submitted_at'],
-            submission['created_at'],
-            json.dumps(submission['answer'])
+            submission.uuid,
+            submission.student_item.student_id,
+            submission.student_item.item_id,
+            submission.submitted_at,
+            submission.created_at,
+            json.dumps(submission.answer)
         ])
 
-        score = sub_api.get_latest_score_for_submission(submission_uuid, read_replica=True)
-        if score is not None:
-            self._write_unicode('score', [
-                score['submission_uuid'],
-                score['points_earned'],
-                score['points_possible'],
-                score['created_at']
-            ])
+    def _write_score_to_csv(self, score):
+        """
+        Write score data to CSV.
+
+        Args:
+            score (Score): The score to write.
+
+        Returns:
+            None
+
+        """
+        self._write_unicode('score', [
+            score.submission.uuid,
+            score.points_earned,
+            score.points_possible,
+            score.created_at
+        ])
 
     def _write_assessment_to_csv(self, assessment_parts, rubric_points_cache):
         """
@@ -463,6 +902,11 @@ class OraAggregateData:
     Aggregate all the ORA data into a single table-like data structure.
     """
 
+    # Number of submissions whose assessments and feedback are loaded
+    # together when building report rows.  Each chunk costs a constant
+    # number of queries, regardless of the number of assessments.
+    BULK_CHUNK_SIZE = 500
+
     @classmethod
     def _map_students_and_scorers_ids_to_usernames(cls, all_submission_information):
         """
@@ -550,7 +994,7 @@ class OraAggregateData:
         returned_string = ""
         for assessment in assessments:
             returned_string += f"Assessment #{assessment.id}\n"
-            for part in assessment.parts.order_by('criterion__order_num'):
+            for part in _ordered_assessment_parts(assessment):
                 returned_string += f"-- {part.criterion.label}"
                 if part.option is not None and part.option.label is not None:
                     option_label = part.option.label
@@ -574,7 +1018,7 @@ class OraAggregateData:
         """
         parts = OrderedDict()
         number = 1
-        for part in assessment.parts.order_by('criterion__order_num'):
+        for part in _ordered_assessment_parts(assessment):
             option_label = None
             option_points = None
             if part.option:
@@ -637,50 +1081,81 @@ class OraAggregateData:
         return "\n".join(file_links)
 
     @classmethod
-    def collect_ora2_data(cls, course_id):
+    def _bulk_load_assessments(cls, submission_uuids):
         """
-        Query database for aggregated ora2 response data.
+        Load the assessments for a batch of submissions, along with their parts
+        (criteria and options) and the feedback options selected for them.
+
+        The number of queries is constant, no matter how many submissions
+        or assessments are loaded.
 
         Args:
-            course_id (string) - the course id of the course whose data we would like to return
+            submission_uuids (list) - the submission uuids to load assessments for.
+        Returns:
+            dictionary that maps submission uuids to lists of assessments, in the
+            default assessment ordering.
+        """
+        assessments = _use_read_replica(
+            Assessment.objects.filter(submission_uuid__in=submission_uuids).select_related('rubric').prefetch_related(
+                Prefetch(
+                    'parts',
+                    queryset=AssessmentPart.objects.select_related('criterion', 'option'),
+                ),
+                'assessment_feedback__options',
+            )
+        )
 
+        assessments_by_submission = defaultdict(list)
+        for assessment in assessments:
+            assessments_by_submission[assessment.submission_uuid].append(assessment)
+        return assessments_by_submission
+
+    @classmethod
+    def _bulk_load_feedback_text(cls, submission_uuids):
+        """
+        Args:
+            submission_uuids (list) - the submission uuids to load assessment feedback for.
         Returns:
-            A tuple containing two lists: headers and data.
+            dictionary that maps submission uuids to the text of the feedback on their assessments.
+        """
+        feedback = _use_read_replica(
+            AssessmentFeedback.objects.filter(submission_uuid__in=submission_uuids)
+        ).values_list('submission_uuid', 'feedback_text')
+        return dict(feedback)
 
-            headers is a list containing strings corresponding to the column headers of the data.
-            data is a list of lists, where each sub-list corresponds to a row in the table of all the data
-                for this course.
+    @classmethod
+    def _build_ora2_data_rows(cls, submission_information, usernames_map, block_display_names_map):
+        """
+        Build the `collect_ora2_data` rows for a chunk of submissions.
 
+        Assessments, assessment parts and feedback for the whole chunk are
+        loaded up front and the rows are built from in-memory indexes keyed
+        by submission uuid.
+
+        Args:
+            submission_information (list) - tuples of (student_item, submission, score),
+                as returned by submissions api's `get_all_course_submission_information`.
+            usernames_map - dictionary that maps anonymous ids to usernames.
+            block_display_names_map - dictionary that maps block usage keys to display names.
+        Yields:
+            list - one row per submission
         """
-        all_submission_information = list(sub_api.get_all_course_submission_information(course_id, 'openassessment'))
         usernames_enabled = _usernames_enabled()
+        submission_uuids = [submission['uuid'] for _, submission, _ in submission_information]
 
-        usernames_map = (
-            cls._map_students_and_scorers_ids_to_usernames(all_submission_information)
-            if usernames_enabled
-            else {}
-        )
-        block_display_names_map = cls._map_block_usage_keys_to_display_names(course_id)
-
-        all_submission_uuids = [submission['uuid'] for _, submission, _ in all_submission_information]
-        all_scored_peer_assessment_ids = {
-            assessment.id for assessment in peer_api.get_bulk_scored_assessments(all_submission_uuids)
+        scored_peer_assessment_ids = {
+            assessment.id for assessment in peer_api.get_bulk_scored_assessments(submission_uuids)
         }
+        assessments_by_submission = cls._bulk_load_assessments(submission_uuids)
+        feedback_by_submission = cls._bulk_load_feedback_text(submission_uuids)
 
-        rows = []
-        for student_item, submission, score in all_submission_information:
-            assessments = _use_read_replica(
-                Assessment.objects.prefetch_related('parts').
-                prefetch_related('rubric').
-                filter(
-                    submission_uuid=submission['uuid']
-                )
-            )
+        for student_item, submission, score in submission_information:
+            assessments = assessments_by_submission.get(submission['uuid'], [])
 
-            assessments_cell = cls._build_assessments_cell(assessments, usernames_map, all_scored_peer_assessment_ids)
+            assessments_cell = cls._build_assessments_cell(assessments, usernames_map, scored_peer_assessment_ids)
             assessments_parts_cell = cls._build_assessments_parts_cell(assessments)
             feedback_options_cell = cls._build_feedback_options_cell(assessments)
-            feedback_cell = cls._build_feedback_cell(submission['uuid'])
+            feedback_cell = feedback_by_submission.get(submission['uuid'], "")
 
             row_username_cell = (
                 [usernames_map.get(student_item["student_id"], "")]
@@ -690,7 +1165,7 @@ class OraAggregateData:
 
             problem_name = block_display_names_map.get(student_item['item_id'])
 
-            row = [
+            yield [
                 submission['uuid'],
                 student_item['item_id'],
                 problem_name,
@@ -708,7 +1183,64 @@ class OraAggregateData:
                 feedback_options_cell,
                 feedback_cell
             ]
-            rows.append(row)
+
+    @classmethod
+    def _iter_ora2_data_rows(cls, course_id, usernames_enabled, block_display_names_map):
+        """
+        Generator that yields the `collect_ora2_data` rows for a course.
+
+        Submissions are read lazily from the submissions API and processed
+        `BULK_CHUNK_SIZE` at a time, so only one chunk is held in memory.
+
+        Args:
+            course_id (string) - the course id of the course whose data we would like to return
+            usernames_enabled (bool) - whether the rows should include usernames.
+            block_display_names_map - dictionary that maps block usage keys to display names.
+        Yields:
+            list - one row per submission
+        """
+        all_submission_information = sub_api.get_all_course_submission_information(course_id, 'openassessment')
+        for submission_information_chunk in _chunked(all_submission_information, cls.BULK_CHUNK_SIZE):
+            usernames_map = (
+                cls._map_students_and_scorers_ids_to_usernames(submission_information_chunk)
+                if usernames_enabled
+                else {}
+            )
+            yield from cls._build_ora2_data_rows(
+                submission_information_chunk, usernames_map, block_display_names_map
+            )
+
+    @classmethod
+    def collect_ora2_data(cls, course_id, stream=False, stats=None):
+        """
+        Query database for aggregated ora2 response data.
+
+        Args:
+            course_id (string) - the course id of the course whose data we would like to return
+
+        Keyword Arguments:
+            stream (bool) - if True, data is a generator that yields the rows lazily
+                instead of a list, so the whole report never has to be held in memory.
+            stats (ExportStats) - collects the timings of the 'block_names' and 'ora2_data_rows' phases.
+
+        Returns:
+            A tuple containing two lists: headers and data.
+
+            headers is a list containing strings corresponding to the column headers of the data.
+            data is a list of lists, where each sub-list corresponds to a row in the table of all the data
+                for this course.
+
+        """
+        stats = stats if stats is not None else NullExportStats()
+        usernames_enabled = _usernames_enabled()
+        with stats.phase('block_names'):
+            block_display_names_map = cls._map_block_usage_keys_to_display_names(course_id)
+
+        rows = stats.iter_phase(
+            'ora2_data_rows', cls._iter_ora2_data_rows(course_id, usernames_enabled, block_display_names_map)
+        )
+        if not stream:
+            rows = list(rows)
 
         header_username_cell = (
             ['Username']
@@ -736,13 +1268,194 @@ class OraAggregateData:
         return header, rows
 
     @classmethod
-    def collect_ora2_summary(cls, course_id):
+    def _bulk_load_workflow_steps(cls, workflow_ids):
+        """
+        Load the steps of many workflows at once.
+
+        Args:
+            workflow_ids (list) - ids of the `AssessmentWorkflow`s
+
+        Returns:
+            dict mapping workflow ids to a dict of their `AssessmentWorkflowStep`s by name.
+        """
+        steps = _use_read_replica(
+            AssessmentWorkflowStep.objects.filter(
+                workflow_id__in=workflow_ids,
+                name__in=AssessmentWorkflow.STEPS,
+            )
+        )
+        steps_by_workflow = defaultdict(dict)
+        for step in steps:
+            steps_by_workflow[step.workflow_id][step.name] = step
+        return steps_by_workflow
+
+    @classmethod
+    def _bulk_load_peer_counts(cls, submission_uuids):
+        """
+        Count the peers graded by, and the peer grades received by, many submissions at once.
+
+        Args:
+            submission_uuids (list) - uuids of the submissions
+
+        Returns:
+            A tuple of two dicts, mapping submission uuids to the number of peers graded
+            and to the number of peer grades received.  Submissions without any are left out.
+        """
+        peers_graded = _use_read_replica(
+            PeerWorkflowItem.objects.filter(
+                scorer__submission_uuid__in=submission_uuids,
+                assessment__isnull=False,
+            ).values('scorer__submission_uuid').annotate(count=Count('id'))
+        )
+        graded_by = _use_read_replica(
+            PeerWorkflowItem.objects.filter(
+                author__submission_uuid__in=submission_uuids,
+                assessment__submission_uuid=F('author__submission_uuid'),
+                assessment__score_type=peer_api.PEER_TYPE,
+            ).values('author__submission_uuid').annotate(count=Count('id'))
+        )
+        return (
+            {item['scorer__submission_uuid']: item['count'] for item in peers_graded},
+            {item['author__submission_uuid']: item['count'] for item in graded_by},
+        )
+
+    @classmethod
+    def _bulk_load_summary_submissions(cls, submission_uuids, done_submission_uuids):
+        """
+        Load the students, staff score existence and final scores of many submissions at once.
+
+        Args:
+            submission_uuids (list) - uuids of the submissions
+            done_submission_uuids (list) - uuids of the submissions whose final score is needed
+
+        Returns:
+            A tuple (student_ids, staff_scored, scores): a dict mapping submission uuids to
+            student ids, the set of submission uuids with a staff assessment, and a dict
+            mapping submission uuids to their latest non-hidden `Score`.
+        """
+        submissions = _use_read_replica(
+            Submission.objects.filter(uuid__in=submission_uuids).values_list('uuid', 'student_item__student_id')
+        )
+        student_ids = {str(submission_uuid): student_id for submission_uuid, student_id in submissions}
+
+        staff_scored = set(_use_read_replica(
+            Assessment.objects.filter(
+                submission_uuid__in=submission_uuids,
+                score_type=STAFF_TYPE,
+            ).values_list('submission_uuid', flat=True).distinct()
+        ))
+
+        latest_scores = {}
+        if done_submission_uuids:
+            scores = _use_read_replica(
+                Score.objects.select_related('submission').filter(
+                    submission__uuid__in=done_submission_uuids
+                ).order_by('-id')
+            )
+            for score in scores:
+                latest_scores.setdefault(str(score.submission.uuid), score)
+
+        return student_ids, staff_scored, {
+            submission_uuid: score
+            for submission_uuid, score in latest_scores.items()
+            if not score.is_hidden()
+        }
+
+    @classmethod
+    def _iter_ora2_summary_rows(cls, course_id, steps):
+        """
+        Generator that yields the `collect_ora2_summary` rows for a course.
+
+        Workflows are processed in chunks of `BULK_CHUNK_SIZE`, with a fixed number of
+        aggregate queries per chunk rather than several queries per workflow.
+
+        Args:
+            course_id (string) - the course id of the course whose data we would like to return
+            steps (list) - the sorted workflow steps, matching the header columns.
+        Yields:
+            list - one row per workflow
+        """
+        workflows = _use_read_replica(
+            AssessmentWorkflow.objects.filter(course_id=course_id)
+        ).iterator(chunk_size=cls.BULK_CHUNK_SIZE)
+
+        for workflows_chunk in _chunked(workflows, cls.BULK_CHUNK_SIZE):
+            submission_uuids = [aw.submission_uuid for aw in workflows_chunk]
+            steps_by_workflow = cls._bulk_load_workflow_steps([aw.pk for aw in workflows_chunk])
+            peers_graded_counts, graded_by_counts = cls._bulk_load_peer_counts(submission_uuids)
+            student_ids, staff_scored, scores = cls._bulk_load_summary_submissions(
+                submission_uuids,
+                [aw.submission_uuid for aw in workflows_chunk if aw.status == AssessmentWorkflow.STATUS.done],
+            )
+
+            for aw in workflows_chunk:
+                student_id = student_ids.get(_normalize_uuid(aw.submission_uuid))
+                if student_id is None:
+                    continue
+
+                workflow_steps = steps_by_workflow.get(aw.pk, {})
+                steps_statuses = []
+                peers_graded = 0
+                graded_by_count = 0
+                for step in steps:
+                    workflow_step = workflow_steps.get(step)
+                    if workflow_step is None:
+                        if step == AssessmentWorkflow.STAFF_STEP_NAME:
+                            # A staff step is always available: status_details() creates
+                            # a missing one, as not complete but already graded.
+                            steps_statuses.extend([0, 1])
+                        else:
+                            # if no status for step, then the 'complete' and 'graded'
+                            # statuses should be empty.
+                            steps_statuses.extend(['', ''])
+                        continue
+
+                    steps_statuses.append(1 if workflow_step.is_submitter_complete() else 0)
+                    steps_statuses.append(1 if workflow_step.is_assessment_complete() else 0)
+
+                    # the peer step is special and has extra metadata
+                    if step == 'peer':
+                        peers_graded = peers_graded_counts.get(aw.submission_uuid, 0)
+                        graded_by_count = graded_by_counts.get(aw.submission_uuid, 0)
+
+                is_staff_grade_received = 1 if aw.submission_uuid in staff_scored else 0
+                is_final_grade_received = 1 if aw.status == AssessmentWorkflow.STATUS.done else 0
+
+                score = scores.get(_normalize_uuid(aw.submission_uuid))
+                if score is not None:
+                    final_grade_points_earned = score.points_earned
+                    final_grade_points_possible = score.points_possible
+                else:
+                    final_grade_points_earned = ''
+                    final_grade_points_possible = ''
+
+                row = [
+                    aw.item_id,
+                    student_id,
+                    aw.status,
+                ] + steps_statuses + [
+                    peers_graded,
+                    graded_by_count,
+                    is_staff_grade_received,
+                    is_final_grade_received,
+                    final_grade_points_earned,
+                    final_grade_points_possible,
+                ]
+                yield row
+
+    @classmethod
+    def collect_ora2_summary(cls, course_id, stream=False, stats=None):
         """
         Query database for aggregated ora2 summary data.
 
         Args:
             course_id (string) - the course id of the course whose data we would like to return
 
+        Keyword Arguments:
+            stream (bool) - if True, data is a generator that yields the rows lazily
+                instead of a list.
+            stats (ExportStats) - collects the timings of the 'ora2_summary_rows' phase.
+
         Returns:
             A tuple containing two lists: headers and data.
 
@@ -771,72 +1484,14 @@ class OraAggregateData:
                 final grade. will be empty if no final grade
         """
 
-        items = AssessmentWorkflow.objects.filter(course_id=course_id)
-
         # need the workflow steps set and sorted here so the data columns line
         # up with the headers
         steps = sorted(AssessmentWorkflow.STEPS)
 
-        rows = []
-        for aw in items:
-            statuses = aw.status_details()
-            try:
-                submission_dict = sub_api.get_submission_and_student(aw.submission_uuid)
-            except SubmissionNotFoundError:
-                continue
-
-            steps_statuses = []
-            peers_graded = 0
-            graded_by_count = 0
-            for step in steps:
-                if not statuses.get(step):
-                    # if no status for step, then the 'complete' and 'graded'
-                    # statuses should be empty.
-                    steps_statuses.append('')
-                    steps_statuses.append('')
-                    continue
-
-                # if we get to here, then a status exists for `step`
-
-                if statuses[step]['complete']:
-                    steps_statuses.append(1)
-                else:
-                    steps_statuses.append(0)
-
-                if statuses[step]['graded']:
-                    steps_statuses.append(1)
-                else:
-                    steps_statuses.append(0)
-
-                # the peer step is special and has extra metadata
-                if step == 'peer':
-                    peers_graded = statuses[step]['peers_graded_count'] or 0
-                    graded_by_count = statuses[step]['graded_by_count'] or 0
-
-            is_staff_grade_received = 1 if aw.staff_score_exists() else 0
-            is_final_grade_received = 1 if aw.status == AssessmentWorkflow.STATUS.done else 0
-
-            score = aw.score
-            if score is not None:
-                final_grade_points_earned = score['points_earned']
-                final_grade_points_possible = score['points_possible']
-            else:
-                final_grade_points_earned = ''
-                final_grade_points_possible = ''
-
-            row = [
-                aw.item_id,
-                submission_dict['student_item']['student_id'],
-                aw.status,
-            ] + steps_statuses + [
-                peers_graded,
-                graded_by_count,
-                is_staff_grade_received,
-                is_final_grade_received,
-                final_grade_points_earned,
-                final_grade_points_possible,
-            ]
-            rows.append(row)
+        stats = stats if stats is not None else NullExportStats()
+        rows = stats.iter_phase('ora2_summary_rows', cls._iter_ora2_summary_rows(course_id, steps))
+        if not stream:
+            rows = list(rows)
 
         steps_headers = list(chain.from_iterable(
             (
@@ -948,6 +1603,28 @@ class OraAggregateData:
         feedback_cell = cls._build_feedback_cell(submission_uuid)
         response_files = cls._build_response_file_links(submission)
 
+        yield from cls._build_assessment_data_rows(
+            row, assessments, median_scores, score, feedback_cell, response_files, {}
+        )
+
+    @classmethod
+    def _build_assessment_data_rows(
+        cls, row, assessments, median_scores, score, feedback_cell, response_files, rubric_points_possible
+    ):
+        """
+        Build the `generate_assessment_data` rows of a submission, one per assessment.
+
+        Args:
+            row (OrderedDict) - the cells shared by all the rows of the submission.
+            assessments (list) - the assessments of the submission, or [None] if there are none.
+            median_scores (dict) - median score of each criterion, see `Assessment.get_median_score_dict`.
+            score (dict) - the serialized final score of the submission, or an empty dict.
+            feedback_cell (string) - the feedback on the assessments of the submission.
+            response_files (string) - links to the files of the submission.
+            rubric_points_possible (dict) - cache of the points possible of each rubric, filled as needed.
+        Yields:
+            OrderedDict - one row per assessment
+        """
         for assessment in assessments:
             assessment_row = row.copy()
             if assessment:
@@ -969,13 +1646,118 @@ class OraAggregateData:
                 assessment_row[_('Assessment Scored At')] = assessment.scored_at.strftime('%F %T %Z')
                 assessment_row[_('Date/Time Final Score Given')] = score_created_at
                 assessment_row[_('Final Score Earned')] = score.get('points_earned', '')
-                assessment_row[_('Final Score Possible')] = score.get('points_possible', assessment.points_possible)
+                if 'points_possible' not in score and assessment.rubric_id not in rubric_points_possible:
+                    rubric_points_possible[assessment.rubric_id] = assessment.points_possible
+                assessment_row[_('Final Score Possible')] = score.get(
+                    'points_possible', rubric_points_possible.get(assessment.rubric_id)
+                )
                 assessment_row[_('Feedback Statements Selected')] = feedback_options_cell
                 assessment_row[_('Feedback on Assessment')] = feedback_cell
 
             assessment_row[_('Response Files')] = response_files
             yield assessment_row
 
+    @classmethod
+    def _bulk_load_report_submissions(cls, submission_uuids):
+        """
+        Load many submissions, their student items and their latest scores at once.
+
+        Args:
+            submission_uuids (list) - the submission uuids to load; invalid uuids are ignored.
+        Returns:
+            A tuple (submissions, scores): a dict mapping normalized submission uuids to
+            submission dicts (with `uuid`, `answer` and `student_item`), and a dict mapping
+            student item ids to their latest non-hidden score, as returned by `sub_api.get_score`.
+        """
+        valid_uuids = []
+        for submission_uuid in submission_uuids:
+            try:
+                valid_uuids.append(str(UUID(submission_uuid)))
+            except (TypeError, ValueError):
+                continue
+
+        submission_models = _use_read_replica(
+            Submission.objects.select_related('student_item').filter(uuid__in=valid_uuids)
+        )
+        submissions = {}
+        for submission in submission_models:
+            submissions[str(submission.uuid)] = {
+                'uuid': str(submission.uuid),
+                'answer': submission.answer,
+                'student_item': {
+                    'id': submission.student_item_id,
+                    'student_id': submission.student_item.student_id,
+                },
+            }
+
+        score_summaries = _use_read_replica(
+            ScoreSummary.objects.select_related('latest').filter(
+                student_item_id__in=[submission['student_item']['id'] for submission in submissions.values()]
+            )
+        )
+        scores = {
+            summary.student_item_id: {
+                'points_earned': summary.latest.points_earned,
+                'points_possible': summary.latest.points_possible,
+                'created_at': summary.latest.created_at,
+            }
+            for summary in score_summaries
+            if not summary.latest.is_hidden()
+        }
+        return submissions, scores
+
+    @classmethod
+    def bulk_generate_assessment_data(cls, xblock_id, submission_uuids):
+        """
+        Batched version of `generate_assessment_data`.
+
+        Submissions, assessments (with their parts and feedback options), final
+        scores and feedback are loaded for all the submissions at once.
+
+        Arguments:
+        * xblock_id: unique identifier for the current XBlock
+        * submission_uuids: list of unique identifiers for the submissions, or None
+        Yields:
+            for each item of `submission_uuids`, in order, the list of rows that
+            `generate_assessment_data` would generate for it.
+        """
+        submissions, scores = cls._bulk_load_report_submissions(submission_uuids)
+        assessments_by_submission = cls._bulk_load_assessments(list(submissions))
+        feedback_texts = cls._bulk_load_feedback_text([uuid for uuid in submission_uuids if uuid])
+        scores_by_submission = Assessment.bulk_scores_by_criterion(assessments_by_submission)
+        rubric_points_possible = {}
+
+        for submission_uuid in submission_uuids:
+            row = OrderedDict()
+            row[_('Item ID')] = xblock_id
+            row[_('Submission ID')] = submission_uuid or ''
+
+            submission = submissions.get(_normalize_uuid(submission_uuid)) if submission_uuid else None
+            if not submission:
+                # If no submission, just report block Item ID.
+                yield [row]
+                continue
+
+            row[_('Anonymized Student ID')] = submission['student_item']['student_id']
+
+            assessments = assessments_by_submission.get(submission['uuid'])
+            if assessments:
+                median_scores = Assessment.get_median_score_dict(scores_by_submission[submission['uuid']])
+            else:
+                # If no assessments, just report submission data.
+                median_scores = []
+                assessments = [None]
+
+            yield list(cls._build_assessment_data_rows(
+                row,
+                assessments,
+                median_scores,
+                scores.get(submission['student_item']['id'], {}),
+                feedback_texts.get(submission_uuid, ''),
+                cls._build_response_file_links(submission),
+                rubric_points_possible,
+            ))
+
 
 class OraDownloadData:
     """
@@ -999,8 +1781,50 @@ class OraDownloadData:
     )
     MAX_FILE_NAME_LENGTH = 255
 
+    # Number of attachments downloaded concurrently, which is also
+    # the size of the HTTP connection pool.
+    DOWNLOAD_WORKERS = 8
+    # Size of the chunks read from download responses and copied into the archive.
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    # Downloaded attachments bigger than this are spooled to disk
+    # instead of being kept in memory until they are archived.
+    DOWNLOAD_SPOOL_SIZE = 1024 * 1024
+
+    # Resumable archives record a checkpoint in their manifest every
+    # CHECKPOINT_INTERVAL files.
+    CHECKPOINT_INTERVAL = 100
+    MANIFEST_SUFFIX = '.manifest'
+
+    _http_session = None
+    _http_session_lock = threading.Lock()
+
+    @classmethod
+    def _get_http_session(cls):
+        """
+        Return the HTTP session shared by all attachment downloads,
+        with a connection pool large enough for the download workers.
+        """
+        with cls._http_session_lock:
+            if cls._http_session is None:
+                adapter = HTTPAdapter(pool_connections=cls.DOWNLOAD_WORKERS, pool_maxsize=cls.DOWNLOAD_WORKERS)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                cls._http_session = session
+            return cls._http_session
+
     @classmethod
     def _download_file_by_key(cls, key):
+        """
+        Download an attachment into a temporary file, streaming the response in chunks.
+        Small files stay in memory, larger ones are spooled to disk.
+
+        Returns:
+            file-like object positioned at the start of the content.
+
+        Raises:
+            FileMissingException if the file has no download URL.
+        """
         url = get_download_url(key)
         if not url:
             raise FileMissingException
@@ -1008,9 +1832,80 @@ class OraDownloadData:
             settings.LMS_ROOT_URL, url
         )
 
-        response = requests.get(download_url)
-        response.raise_for_status()
-        return response.content
+        with cls._get_http_session().get(download_url, stream=True) as response:
+            response.raise_for_status()
+            downloaded_file = tempfile.SpooledTemporaryFile(  # pylint: disable=consider-using-with
+                max_size=cls.DOWNLOAD_SPOOL_SIZE
+            )
+            try:
+                for chunk in response.iter_content(chunk_size=cls.DOWNLOAD_CHUNK_SIZE):
+                    downloaded_file.write(chunk)
+            except BaseException:
+                downloaded_file.close()
+                raise
+
+        downloaded_file.seek(0)
+        return downloaded_file
+
+    @classmethod
+    def _timed_download(cls, key, stats):
+        """
+        Download an attachment with `_download_file_by_key`, recording its latency in `stats`.
+        """
+        start = time.perf_counter()
+        downloaded_file = cls._download_file_by_key(key)
+        stats.record_download(time.perf_counter() - start)
+        return downloaded_file
+
+    @classmethod
+    def _download_attachments(cls, submission_files_data, executor, stats=None):
+        """
+        Generator that starts attachment downloads ahead of time and yields
+        `(file_data, download)` pairs in the original order.
+
+        `download` is a future that resolves to the downloaded file for
+        attachments, and None for answer texts.  At most twice as many
+        downloads as there are workers are in flight at any time, which
+        bounds the memory and disk used by downloaded but unarchived files.
+        The latency of the downloads is recorded in `stats`, if provided.
+
+        If the generator is closed before the end, e.g. because archiving failed,
+        the downloads that were not yielded are cancelled, or their files closed
+        once they finish.
+        """
+        pending = deque()
+        try:
+            for file_data in submission_files_data:
+                download = (
+                    (
+                        executor.submit(cls._timed_download, file_data['key'], stats)
+                        if stats is not None
+                        else executor.submit(cls._download_file_by_key, file_data['key'])
+                    )
+                    if file_data['type'] == cls.ATTACHMENT
+                    else None
+                )
+                pending.append((file_data, download))
+                if len(pending) > 2 * cls.DOWNLOAD_WORKERS:
+                    yield pending.popleft()
+
+            while pending:
+                yield pending.popleft()
+        finally:
+            for __, download in pending:
+                if download is not None and not download.cancel():
+                    download.add_done_callback(_close_downloaded_file)
+
+    @classmethod
+    def _write_downloaded_file(cls, zip_file, file_path, downloaded_file):
+        """
+        Copy a downloaded attachment into a new zip entry, in chunks.
+        """
+        with downloaded_file:
+            file_size = downloaded_file.seek(0, os.SEEK_END)
+            downloaded_file.seek(0)
+            with zip_file.open(file_path, 'w', force_zip64=file_size > ZIP64_LIMIT) as zip_entry:
+                shutil.copyfileobj(downloaded_file, zip_entry, cls.DOWNLOAD_CHUNK_SIZE)
 
     @classmethod
     def _map_ora_usage_keys_to_path_info(cls, course_id):
@@ -1193,7 +2088,52 @@ class OraDownloadData:
         return os.path.join(directory_name, submission_filename)
 
     @classmethod
-    def create_zip_with_attachments(cls, file, submission_files_data):
+    def _archive_submission_file(cls, zip_file, file_data, download):
+        """
+        Write a submission attachment or answer text into the zip.
+
+        Args:
+            zip_file (ZipFile): The archive to write to.
+            file_data (dict): The file information, as yielded by `collect_ora2_submission_files`.
+            download (Future or None): The attachment download, see `_download_attachments`.
+
+        Returns:
+            bool: Whether the file was found and written.
+        """
+        file_path = file_data['file_path']
+        try:
+            if download is not None:
+                cls._write_downloaded_file(zip_file, file_path, download.result())
+            else:
+                zip_file.writestr(file_path, file_data['content'])
+        except FileMissingException:
+            # added a header to csv file to indicate that the file was found or not.
+            # TODO: (EDUCATOR-5777) should we create a {file_path}.error.txt
+            # to indicate the file error more clearly?
+            file_info_string = (
+                "Course Id: {course_id} | "
+                "Block Id: {block_id} | "
+                "Student Id: {student_id} | "
+                "Key: {file_key} | "
+                "Name: {file_name} | "
+                "Type: {file_type}"
+            ).format(
+                course_id=file_data['course_id'],
+                block_id=file_data['block_id'],
+                student_id=file_data['student_id'],
+                file_key=file_data['key'],
+                file_name=file_data['name'],
+                file_type=file_data['type'],
+            )
+            logger.warning(
+                'File for submission could not be downloaded for ORA submission archive. %s',
+                file_info_string
+            )
+            return False
+        return True
+
+    @classmethod
+    def create_zip_with_attachments(cls, file, submission_files_data, stats=None):
         """
         Opens given stream as a zip file and writes into it all submission
         attachments and csv with list of all downloads.
@@ -1201,6 +2141,10 @@ class OraDownloadData:
         Files that cannot be found in the backend will not be included in the zip. It will be listed as file_found=False
         in the csv file.
 
+        Attachments are downloaded concurrently by `DOWNLOAD_WORKERS` threads sharing a pooled HTTP
+        session, and are copied into the zip in chunks, so neither network latency nor the size of
+        the largest file dominates the build.
+
         Example of result zip file structure:
         ```
         .
@@ -1218,58 +2162,236 @@ class OraDownloadData:
         │   └── [1] - edx - the_most_dangerous_kitten.jpg
         └── submissions.csv
         ```
+
+        If `stats` (an `ExportStats`) is provided, the 'archive' phase and the download latencies are recorded in it.
         """
+        stats = stats if stats is not None else NullExportStats()
         csv_output_buffer = StringIO()
 
         csvwriter = csv.DictWriter(csv_output_buffer, cls.SUBMISSIONS_CSV_HEADER, extrasaction='ignore')
         csvwriter.writeheader()
 
-        with ZipFile(file, 'w') as zip_file:
-            for file_data in submission_files_data:
-                key = file_data['key']
-                file_path = file_data['file_path']
-                file_found = False
+        with stats.phase('archive') as archive_phase:
+            initial_size = _stream_position(file)
+            with ZipFile(file, 'w') as zip_file, ThreadPoolExecutor(max_workers=cls.DOWNLOAD_WORKERS) as executor:
+                with closing(cls._download_attachments(submission_files_data, executor, stats)) as downloads:
+                    for file_data, download in downloads:
+                        file_found = False
+                        try:
+                            file_found = cls._archive_submission_file(zip_file, file_data, download)
+                        finally:
+                            csvwriter.writerow({**file_data, 'file_found': file_found})
+                            archive_phase.rows += 1
+
+                zip_file.writestr(
+                    'submissions.csv',
+                    csv_output_buffer.getvalue().encode('utf-8')
+                )
+            archive_phase.bytes += _stream_position(file) - initial_size
+
+        file.seek(0)
+        return True
+
+    @classmethod
+    def _read_manifest(cls, manifest_path):
+        """
+        Read the manifest of a partially built resumable archive.
+
+        The manifest is a JSON lines file.  Entries are only valid once they are
+        followed by a checkpoint record, which holds the size of the archive
+        after those entries were written and the offset of its central directory.
+
+        Returns:
+            A tuple (entries, checkpoint) for the last checkpoint: the list of
+            archived entries, and the checkpoint record (None if there is none).
+        """
+        if not os.path.exists(manifest_path):
+            return [], None
+
+        entries, pending_entries, checkpoint = [], [], None
+        with open(manifest_path, encoding='utf-8') as manifest:
+            for line in manifest:
                 try:
-                    file_content = (
-                        cls._download_file_by_key(key)
-                        if file_data['type'] == cls.ATTACHMENT
-                        else file_data['content']
-                    )
-                except FileMissingException:
-                    # added a header to csv file to indicate that the file was found or not.
-                    # TODO: (EDUCATOR-5777) should we create a {file_path}.error.txt
-                    # to indicate the file error more clearly?
-                    file_info_string = (
-                        "Course Id: {course_id} | "
-                        "Block Id: {block_id} | "
-                        "Student Id: {student_id} | "
-                        "Key: {file_key} | "
-                        "Name: {file_name} | "
-                        "Type: {file_type}"
-                    ).format(
-                        course_id=file_data['course_id'],
-                        block_id=file_data['block_id'],
-                        student_id=file_data['student_id'],
-                        file_key=file_data['key'],
-                        file_name=file_data['name'],
-                        file_type=file_data['type'],
-                    )
-                    logger.warning(
-                        'File for submission could not be downloaded for ORA submission archive. %s',
-                        file_info_string
-                    )
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may have been partially written
+                    break
+                if 'checkpoint' in record:
+                    entries.extend(pending_entries)
+                    pending_entries = []
+                    checkpoint = record
+                else:
+                    pending_entries.append(record['entry'])
+        return entries, checkpoint
+
+    @classmethod
+    def _checkpoint_path(cls, manifest_path, archive_size):
+        """
+        Path of the file holding the end of the archive (central directory) at a checkpoint.
+        """
+        return f"{manifest_path}.{archive_size}"
+
+    @classmethod
+    def _write_checkpoint(cls, manifest, zip_file, entries, previous_checkpoint):
+        """
+        Close the archive, then record archived entries and a checkpoint in the manifest.
+
+        Appending to the archive overwrites its central directory, so a copy of it is
+        kept next to the manifest for the archive to be restored to this checkpoint.
+
+        Returns:
+            dict: The checkpoint record.
+        """
+        central_directory_offset = zip_file.start_dir
+        zip_file.close()
+        archive_size = os.path.getsize(zip_file.filename)
+        checkpoint = {'checkpoint': archive_size, 'central_directory': central_directory_offset}
+
+        with open(zip_file.filename, 'rb') as archive, \
+                open(cls._checkpoint_path(manifest.name, archive_size), 'wb') as central_directory:
+            archive.seek(central_directory_offset)
+            shutil.copyfileobj(archive, central_directory)
+            central_directory.flush()
+            os.fsync(central_directory.fileno())
+
+        for entry in entries:
+            manifest.write(json.dumps({'entry': entry}) + '\n')
+        manifest.write(json.dumps(checkpoint) + '\n')
+        manifest.flush()
+        os.fsync(manifest.fileno())
+
+        if previous_checkpoint and previous_checkpoint['checkpoint'] != archive_size:
+            os.remove(cls._checkpoint_path(manifest.name, previous_checkpoint['checkpoint']))
+        return checkpoint
+
+    @classmethod
+    def _restore_checkpoint(cls, archive_path, manifest_path, checkpoint):
+        """
+        Bring the archive back to its state at a checkpoint, dropping whatever was written after it.
+
+        Returns:
+            bool: Whether the archive could be restored.
+        """
+        central_directory_offset = checkpoint['central_directory']
+        central_directory_path = cls._checkpoint_path(manifest_path, checkpoint['checkpoint'])
+        if not (os.path.exists(archive_path) and os.path.exists(central_directory_path)):
+            return False
+        if os.path.getsize(archive_path) < central_directory_offset:
+            return False
+
+        with open(central_directory_path, 'rb') as central_directory, open(archive_path, 'r+b') as archive:
+            archive.truncate(central_directory_offset)
+            archive.seek(central_directory_offset)
+            shutil.copyfileobj(central_directory, archive)
+        return True
+
+    @classmethod
+    def _remove_manifest(cls, manifest_path):
+        """
+        Remove the manifest of a resumable archive and the central directories of its checkpoints.
+        """
+        for pattern in ('', '.*'):
+            for path in glob.glob(glob.escape(manifest_path) + pattern):
+                os.remove(path)
+
+    @classmethod
+    def create_resumable_zip_with_attachments(cls, archive_path, submission_files_data, stats=None):
+        """
+        Build the same archive as `create_zip_with_attachments`, but in a way that can be resumed.
+
+        A manifest of the archived entries (`file_path`, `key`, `size`, ...) is kept next to the
+        archive, in `<archive_path>.manifest`.  Every `CHECKPOINT_INTERVAL` entries the archive is
+        closed, which makes it a valid zip file, and a checkpoint is recorded in the manifest.
+
+        If the build is interrupted, calling this method again with the same arguments restores
+        the archive to the last checkpoint, skips the entries that were already archived and
+        appends only the rest.  If it fails while an entry is being written, the archive is
+        restored to the last checkpoint right away, so that no partial entry is kept.
+        `submissions.csv` is generated from the manifest, and the manifest is removed once the
+        archive is complete.
+
+        Args:
+            archive_path (str): Path of the zip file to build.
+            submission_files_data (iterable of dict): As yielded by `collect_ora2_submission_files`.
+
+        Keyword Arguments:
+            stats (ExportStats): Collects the timings of the 'archive' phase and the download latencies.
+
+        Returns:
+            True
+        """
+        stats = stats if stats is not None else NullExportStats()
+        manifest_path = archive_path + cls.MANIFEST_SUFFIX
+        archived_entries, checkpoint = cls._read_manifest(manifest_path)
+
+        if checkpoint and cls._restore_checkpoint(archive_path, manifest_path, checkpoint):
+            logger.info(
+                "Resuming ORA submission archive %s after %d archived files", archive_path, len(archived_entries)
+            )
+            archive_size = checkpoint['checkpoint']
+        else:
+            # Nothing to resume from, e.g. the archive was removed: start over.
+            archived_entries, checkpoint, archive_size = [], None, 0
+            if os.path.exists(archive_path):
+                os.remove(archive_path)
+            cls._remove_manifest(manifest_path)
+
+        archived_paths = {entry['file_path'] for entry in archived_entries}
+        remaining_files_data = (
+            file_data for file_data in submission_files_data
+            if file_data['file_path'] not in archived_paths
+        )
+
+        with stats.phase('archive') as archive_phase, \
+                ThreadPoolExecutor(max_workers=cls.DOWNLOAD_WORKERS) as executor, \
+                open(manifest_path, 'a', encoding='utf-8') as manifest:
+            batch_entries = []
+            zip_file = ZipFile(archive_path, 'a')  # pylint: disable=consider-using-with
+            archived_count = len(zip_file.infolist())
+            downloads = cls._download_attachments(remaining_files_data, executor, stats)
+            try:
+                for file_data, download in downloads:
+                    file_found = cls._archive_submission_file(zip_file, file_data, download)
+                    archived_count = len(zip_file.infolist())
+                    entry = {field: file_data.get(field, '') for field in cls.SUBMISSIONS_CSV_HEADER}
+                    entry['file_found'] = file_found
+                    batch_entries.append(entry)
+                    archive_phase.rows += 1
+
+                    if len(batch_entries) >= cls.CHECKPOINT_INTERVAL:
+                        checkpoint = cls._write_checkpoint(manifest, zip_file, batch_entries, checkpoint)
+                        archived_entries.extend(batch_entries)
+                        batch_entries = []
+                        zip_file = ZipFile(archive_path, 'a')  # pylint: disable=consider-using-with
+            finally:
+                downloads.close()
+                if len(zip_file.infolist()) > archived_count:
+                    # The build failed while an entry was being written, which left it
+                    # truncated in the archive: drop the whole batch.
+                    zip_file.close()
+                    if not (checkpoint and cls._restore_checkpoint(archive_path, manifest_path, checkpoint)):
+                        os.remove(archive_path)
+                elif batch_entries:
+                    # Record the files archived so far, even if the build failed.
+                    checkpoint = cls._write_checkpoint(manifest, zip_file, batch_entries, checkpoint)
+                    archived_entries.extend(batch_entries)
                 else:
-                    file_found = True
-                    zip_file.writestr(file_path, file_content)
-                finally:
-                    csvwriter.writerow({**file_data, 'file_found': file_found})
+                    zip_file.close()
+                if os.path.exists(archive_path):
+                    archive_phase.bytes += os.path.getsize(archive_path) - archive_size
 
+        csv_output_buffer = StringIO()
+        csvwriter = csv.DictWriter(csv_output_buffer, cls.SUBMISSIONS_CSV_HEADER, extrasaction='ignore')
+        csvwriter.writeheader()
+        csvwriter.writerows(archived_entries)
+
+        with ZipFile(archive_path, 'a') as zip_file:
             zip_file.writestr(
                 'submissions.csv',
                 csv_output_buffer.getvalue().encode('utf-8')
             )
 
-        file.seek(0)
+        cls._remove_manifest(manifest_path)
         return True
 
     @classmethod
@@ -0,0 +1,101 @@
+"""
+Backfill the stored points of assessments made before they were recorded.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q, Sum
+from django.utils.timezone import now
+
+from openassessment.assessment.models import Assessment, AssessmentPart, Rubric
+
+
+class Command(BaseCommand):
+    """
+    Fill in `stored_points_earned` / `stored_points_possible` for assessments that do not have them.
+
+    Assessments are processed in batches of increasing id, each batch with
+    three queries: the batch of assessments, the points of their parts and
+    one bulk update (plus one query for rubrics not seen in earlier batches).
+    Only assessments made before the command started are considered, since
+    newer ones record their points as they are created.
+
+    Example:
+        ./manage.py backfill_assessment_points --batch-size 1000 --sleep 0.5
+    """
+
+    help = 'Backfill the stored points earned / possible of existing assessments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of assessments to update at a time.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Seconds to wait between batches, to limit the load on the database.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        started = now()
+        rubric_points_possible = {}
+        last_id = 0
+        total = 0
+        while True:
+            batch = list(
+                Assessment.objects.filter(
+                    Q(stored_points_earned__isnull=True) | Q(stored_points_possible__isnull=True),
+                    id__gt=last_id,
+                    scored_at__lt=started,
+                ).order_by('id').values_list('id', 'rubric_id')[:batch_size]
+            )
+            if not batch:
+                break
+
+            self._backfill(batch, rubric_points_possible)
+            total += len(batch)
+            last_id = batch[-1][0]
+            self.stdout.write("Backfilled {} assessments (up to id {})".format(total, last_id))
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write("Done, backfilled {} assessments".format(total))
+
+    @staticmethod
+    def _backfill(batch, rubric_points_possible):
+        """
+        Store the points of a batch of (assessment id, rubric id) tuples.
+
+        Args:
+            batch (list): The assessments to update.
+            rubric_points_possible (dict): Points possible of the rubrics seen so far, updated in place.
+        """
+        missing_rubric_ids = {rubric_id for __, rubric_id in batch} - set(rubric_points_possible)
+        if missing_rubric_ids:
+            rubric_points_possible.update(Rubric.bulk_points_possible(missing_rubric_ids))
+
+        points_earned = dict(
+            AssessmentPart.objects.filter(
+                assessment_id__in=[assessment_id for assessment_id, __ in batch]
+            ).values('assessment_id').annotate(points=Sum('option__points')).values_list('assessment_id', 'points')
+        )
+        Assessment.objects.bulk_update(
+            [
+                Assessment(
+                    id=assessment_id,
+                    # By convention, an assessment with no options (only feedback) earns 0 points.
+                    stored_points_earned=points_earned.get(assessment_id) or 0,
+                    stored_points_possible=rubric_points_possible[rubric_id],
+                )
+                for assessment_id, rubric_id in batch
+            ],
+            ['stored_points_earned', 'stored_points_possible'],
+        )
@@ -0,0 +1,283 @@
+"""
+Load test the peer grading APIs against a synthetic item.
+"""
+import random
+import time
+from collections import defaultdict
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from submissions.models import StudentItem, Submission
+
+from openassessment.assessment.api import peer as peer_api
+from openassessment.assessment.models import PeerWorkflow
+from openassessment.data import percentile
+from openassessment.workflow import api as workflow_api
+from openassessment.workflow.models import AssessmentWorkflow, AssessmentWorkflowStep
+
+STEPS = ['peer', 'self']
+
+RUBRIC = {
+    'prompts': [{'description': 'Benchmark prompt'}],
+    'criteria': [
+        {
+            'order_num': criterion_num,
+            'name': 'criterion_{}'.format(criterion_num),
+            'prompt': 'Criterion {}'.format(criterion_num),
+            'options': [
+                {
+                    'order_num': option_num,
+                    'name': 'option_{}'.format(option_num),
+                    'explanation': '',
+                    'points': option_num,
+                }
+                for option_num in range(4)
+            ],
+        }
+        for criterion_num in range(3)
+    ],
+}
+
+# The calls made in turn by every simulated learner
+CALLS = ('get_submission_to_assess', 'create_assessment', 'get_score', 'update_from_assessments')
+
+
+class Command(BaseCommand):
+    """
+    Replay interleaved peer grading sessions and report per-call latency and queries.
+
+    For each requested item size, a throwaway course / item is bulk inserted
+    inside a transaction: learners, submissions, peer workflows and assessment
+    workflows. Randomly chosen learners from an active pool then take their
+    next step through the peer grading loop:
+
+        get_submission_to_assess -> create_assessment -> get_score -> update_from_assessments
+
+    so the calls of many learners interleave the way they do when a class
+    works through peer grading together. The transaction is rolled back at
+    the end so nothing is left behind.
+
+    Example:
+        ./manage.py benchmark_peer_grading --learners 1000 10000 50000 --operations 2000
+    """
+
+    help = 'Benchmark the peer grading APIs for synthetic items of the given sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--learners',
+            type=int,
+            nargs='+',
+            default=[1000],
+            help='Number of learners in the synthetic item; several sizes are run one after another.'
+        )
+        parser.add_argument(
+            '--operations',
+            type=int,
+            default=1000,
+            help='Number of API calls to replay for each item size.'
+        )
+        parser.add_argument(
+            '--active',
+            type=int,
+            default=200,
+            help='Number of learners grading at the same time.'
+        )
+        parser.add_argument(
+            '--must-grade',
+            type=int,
+            default=3,
+            help='Number of peers each learner must assess.'
+        )
+        parser.add_argument(
+            '--must-be-graded-by',
+            type=int,
+            default=3,
+            help='Number of peer assessments each submission requires.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Seed for choosing which learner acts next.'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['learners']) < 2:
+            raise CommandError("At least two learners are required.")
+        if options['operations'] < 1 or options['active'] < 1:
+            raise CommandError("--operations and --active must be positive.")
+
+        requirements = {
+            'peer': {
+                'must_grade': options['must_grade'],
+                'must_be_graded_by': options['must_be_graded_by'],
+            }
+        }
+        chooser = random.Random(options['seed'])
+        for learners in options['learners']:
+            with transaction.atomic():
+                submissions = self._create_item(learners)
+                active = chooser.sample(submissions, min(options['active'], learners))
+                timings = self._replay(active, options['operations'], requirements, chooser)
+                transaction.set_rollback(True)
+            self._report(learners, timings)
+
+    @staticmethod
+    def _create_item(learners):
+        """
+        Bulk insert a synthetic item with a submission and workflows for every learner.
+
+        Returns:
+            list of (submission_uuid, student_id) tuples
+        """
+        course_id = 'course-v1:benchmark+{}+run'.format(uuid4().hex)
+        item_id = 'block-v1:benchmark+type@openassessment+block@{}'.format(uuid4().hex)
+        student_ids = ['learner_{}'.format(index) for index in range(learners)]
+
+        StudentItem.objects.bulk_create(
+            [
+                StudentItem(student_id=student_id, course_id=course_id, item_id=item_id, item_type='openassessment')
+                for student_id in student_ids
+            ],
+            batch_size=1000,
+        )
+        student_items = StudentItem.objects.filter(course_id=course_id, item_id=item_id).order_by('id')
+        Submission.objects.bulk_create(
+            [
+                Submission(
+                    uuid=uuid4(),
+                    student_item=student_item,
+                    attempt_number=1,
+                    answer={'parts': [{'text': 'Answer from {}'.format(student_item.student_id)}]},
+                )
+                for student_item in student_items
+            ],
+            batch_size=1000,
+        )
+        submissions = [
+            (str(submission_uuid), student_id)
+            for submission_uuid, student_id in Submission.objects.filter(
+                student_item__course_id=course_id, student_item__item_id=item_id
+            ).order_by('id').values_list('uuid', 'student_item__student_id')
+        ]
+
+        PeerWorkflow.objects.bulk_create(
+            [
+                PeerWorkflow(
+                    student_id=student_id,
+                    course_id=course_id,
+                    item_id=item_id,
+                    submission_uuid=submission_uuid,
+                )
+                for submission_uuid, student_id in submissions
+            ],
+            batch_size=1000,
+        )
+        AssessmentWorkflow.objects.bulk_create(
+            [
+                AssessmentWorkflow(
+                    submission_uuid=submission_uuid,
+                    course_id=course_id,
+                    item_id=item_id,
+                    status=STEPS[0],
+                )
+                for submission_uuid, __ in submissions
+            ],
+            batch_size=1000,
+        )
+        started = now()
+        workflow_ids = AssessmentWorkflow.objects.filter(course_id=course_id, item_id=item_id).values_list(
+            'id', flat=True
+        )
+        AssessmentWorkflowStep.objects.bulk_create(
+            [
+                AssessmentWorkflowStep(
+                    workflow_id=workflow_id,
+                    name=name,
+                    order_num=order_num,
+                    submitter_completed_at=None,
+                    assessment_completed_at=started if name == 'staff' else None,
+                )
+                for workflow_id in workflow_ids
+                for order_num, name in enumerate(['staff'] + STEPS)
+            ],
+            batch_size=1000,
+        )
+        return submissions
+
+    def _replay(self, active, operations, requirements, chooser):
+        """
+        Make `operations` API calls on behalf of randomly chosen active learners.
+
+        Returns:
+            dict mapping each call name to a list of (latency, query count) tuples
+        """
+        timings = defaultdict(list)
+        next_call = {submission_uuid: 0 for submission_uuid, __ in active}
+        for _ in range(operations):
+            submission_uuid, student_id = chooser.choice(active)
+            call = CALLS[next_call[submission_uuid]]
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                result = self._call(call, submission_uuid, student_id, requirements, chooser)
+                latency = time.perf_counter() - start
+            timings[call].append((latency, len(queries)))
+
+            if call == 'get_submission_to_assess' and result is None:
+                # Nothing to assess, so skip straight to checking on their own grade
+                next_call[submission_uuid] = CALLS.index('get_score')
+            else:
+                next_call[submission_uuid] = (next_call[submission_uuid] + 1) % len(CALLS)
+        return timings
+
+    @staticmethod
+    def _call(  # pylint: disable=too-many-positional-arguments
+        call, submission_uuid, student_id, requirements, chooser
+    ):
+        """
+        Make one peer grading API call for the given learner.
+        """
+        peer_requirements = requirements['peer']
+        if call == 'get_submission_to_assess':
+            return peer_api.get_submission_to_assess(submission_uuid, peer_requirements['must_be_graded_by'])
+        if call == 'create_assessment':
+            return peer_api.create_assessment(
+                submission_uuid,
+                student_id,
+                {criterion['name']: 'option_{}'.format(chooser.randint(0, 3)) for criterion in RUBRIC['criteria']},
+                {},
+                'Benchmark feedback',
+                RUBRIC,
+                peer_requirements['must_be_graded_by'],
+            )
+        if call == 'get_score':
+            return peer_api.get_score(submission_uuid, peer_requirements, {})
+        return workflow_api.update_from_assessments(submission_uuid, requirements, {})
+
+    def _report(self, learners, timings):
+        """
+        Write latency percentiles and query counts for each call.
+        """
+        self.stdout.write("== {} learners ==".format(learners))
+        for call in CALLS:
+            samples = timings.get(call)
+            if not samples:
+                continue
+            latencies = sorted(latency for latency, __ in samples)
+            query_counts = [count for __, count in samples]
+            self.stdout.write(
+                "{call}: calls={calls} p50={p50:.2f}ms p90={p90:.2f}ms p99={p99:.2f}ms "
+                "queries/call={queries:.1f} max_queries={max_queries}".format(
+                    call=call,
+                    calls=len(samples),
+                    p50=1000 * percentile(latencies, 50),
+                    p90=1000 * percentile(latencies, 90),
+                    p99=1000 * percentile(latencies, 99),
+                    queries=sum(query_counts) / float(len(query_counts)),
+                    max_queries=max(query_counts),
+                )
+            )
@@ -0,0 +1,142 @@
+"""
+Benchmark the strategies for choosing a submission to over grade.
+"""
+import random
+import time
+from functools import partial
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from openassessment.assessment.models import PeerWorkflow
+from openassessment.data import percentile
+
+
+def sample_from_all_candidates(scorer):
+    """
+    Pick a random over grading candidate for `scorer` by loading all of them.
+
+    This was the original over grading strategy, kept here as the baseline: it
+    reads every candidate row to choose one.
+
+    Returns:
+        submission_uuid (str) or None
+    """
+    query = list(PeerWorkflow.objects.raw(
+        "select pw.id, pw.submission_uuid "
+        "from assessment_peerworkflow pw "
+        "where course_id=%s "
+        "and item_id=%s "
+        "and student_id<>%s "
+        "and pw.cancelled_at is NULL "
+        "and pw.id not in ( "
+        "select pwi.author_id "
+        "from assessment_peerworkflowitem pwi "
+        "where pwi.scorer_id=%s"
+        "); ",
+        [scorer.course_id, scorer.item_id, scorer.student_id, scorer.id]
+    ))
+    workflow_count = len(query)
+    if workflow_count < 1:
+        return None
+
+    random_int = random.randint(0, workflow_count - 1)
+    return query[random_int].submission_uuid
+
+
+STRATEGIES = (
+    ('full_scan', sample_from_all_candidates),
+    ('random_offset', PeerWorkflow.get_submission_for_over_grading),
+)
+
+
+class Command(BaseCommand):
+    """
+    Compare the over grading sampling strategies on a synthetic item.
+
+    A throwaway course / item with the requested number of peer workflows is
+    bulk inserted inside a transaction, each strategy is timed against it, and
+    the transaction is rolled back so nothing is left behind.
+
+    Example:
+        ./manage.py benchmark_peer_over_grading --learners 50000 --iterations 100
+    """
+
+    help = 'Benchmark the random over grading selection for a synthetic peer item'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--learners',
+            type=int,
+            default=10000,
+            help='Number of peer workflows to create for the synthetic item.'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Number of selections to time for each strategy.'
+        )
+
+    def handle(self, *args, **options):
+        learners = options['learners']
+        iterations = options['iterations']
+        if learners < 2:
+            raise CommandError("At least two learners are required.")
+        if iterations < 1:
+            raise CommandError("At least one iteration is required.")
+
+        with transaction.atomic():
+            scorer = self._create_workflows(learners)
+            for name, sample in STRATEGIES:
+                self._run_strategy(name, partial(sample, scorer), iterations)
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _create_workflows(learners):
+        """
+        Bulk insert the synthetic peer workflows and return the one used as scorer.
+        """
+        course_id = 'course-v1:benchmark+{}+run'.format(uuid4().hex)
+        item_id = 'block-v1:benchmark+type@openassessment+block@{}'.format(uuid4().hex)
+        PeerWorkflow.objects.bulk_create(
+            [
+                PeerWorkflow(
+                    student_id='learner_{}'.format(index),
+                    course_id=course_id,
+                    item_id=item_id,
+                    submission_uuid=str(uuid4()),
+                )
+                for index in range(learners)
+            ],
+            batch_size=1000,
+        )
+        return PeerWorkflow.objects.filter(course_id=course_id, item_id=item_id).first()
+
+    def _run_strategy(self, name, sample, iterations):
+        """
+        Time `iterations` calls of `sample` and write a one line summary.
+        """
+        latencies = []
+        chosen = set()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                chosen.add(sample())
+                latencies.append(time.perf_counter() - start)
+
+        latencies.sort()
+        self.stdout.write(
+            "{name}: mean={mean:.2f}ms p50={p50:.2f}ms p90={p90:.2f}ms p99={p99:.2f}ms "
+            "queries/call={queries:.1f} distinct={distinct}".format(
+                name=name,
+                mean=1000 * sum(latencies) / iterations,
+                p50=1000 * percentile(latencies, 50),
+                p90=1000 * percentile(latencies, 90),
+                p99=1000 * percentile(latencies, 99),
+                queries=len(queries) / float(iterations),
+                distinct=len(chosen),
+            )
+        )
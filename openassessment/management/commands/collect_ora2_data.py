@@ -5,16 +5,29 @@ Command to retrieve all ORA2 data for a course in a .csv.
 This command differs from upload_oa_data in that it places all the data into one file.
 
 Generates the same format as the instructor dashboard downloads.
+
+Rows are written to the file as they are produced, so memory usage stays
+flat no matter how many submissions the course has.
+
+Several courses can be exported at once; with --workers, each course is
+exported by a separate process with its own database connection.
+
+With --stats, the timings of each phase of the export are reported along
+with the summary.
 """
 
 
 import csv
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 
-from openassessment.data import OraAggregateData
+from openassessment.data import ExportStats, NullExportStats, OraAggregateData
 
 
 class Command(BaseCommand):
@@ -22,7 +35,7 @@ class Command(BaseCommand):
     Query aggregated open assessment data, write to .csv
     """
 
-    help = ("Usage: collect_ora2_data <course_id> --output-dir=<output_dir>")
+    help = ("Usage: collect_ora2_data <course_id> [<course_id> ...] --output-dir=<output_dir> [--workers=<N>]")
 
     def add_arguments(self, parser):
         parser.add_argument('course_id', nargs='+', type=str)
@@ -42,14 +55,22 @@ class Command(BaseCommand):
             default=None,
             help="Write CSV file to the given name"
         )
-
-    @contextmanager
-    def open_csv_file(self, options, file_name):
-        if options['output_dir']:
-            with open(os.path.join(options['output_dir'], file_name), 'wb') as csv_file:
-                yield csv_file
-        else:
-            yield self.stdout
+        parser.add_argument(
+            '-w',
+            '--workers',
+            action='store',
+            dest='workers',
+            type=int,
+            default=1,
+            help="Number of courses exported in parallel, each by a separate process"
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            dest='stats',
+            default=False,
+            help="Report the wall time, queries, rows and bytes of each phase of the export"
+        )
 
     def handle(self, *args, **options):
         """
@@ -58,21 +79,101 @@ class Command(BaseCommand):
         if not options['course_id']:
             raise CommandError("Course ID must be specified to fetch data")
 
-        course_id = options['course_id']
-
-        if options['file_name']:
-            file_name = options['file_name']
+        course_ids = options['course_id']
+        output_dir = options['output_dir']
+        workers = options['workers']
+
+        if workers < 1:
+            raise CommandError("--workers must be a positive number")
+        if options['file_name'] and len(course_ids) > 1:
+            raise CommandError("--file-name can only be used with a single course")
+        if workers > 1 and not output_dir:
+            raise CommandError("--output-dir must be specified to export courses in parallel")
+
+        start = time.monotonic()
+        if workers > 1 and len(course_ids) > 1:
+            # Forked workers must not share the database connections of this process
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=connections.close_all,
+            ) as executor:
+                results = list(executor.map(
+                    _export_course,
+                    course_ids,
+                    [output_dir] * len(course_ids),
+                    [None] * len(course_ids),
+                    [None] * len(course_ids),
+                    [options['stats']] * len(course_ids),
+                ))
         else:
-            file_name = ("%s-ora2.csv" % course_id).replace("/", "-")
+            results = [
+                _export_course(
+                    course_id, output_dir, options['file_name'], stdout=self.stdout, collect_stats=options['stats']
+                )
+                for course_id in course_ids
+            ]
+        elapsed = time.monotonic() - start
+
+        self._write_summary(results, elapsed, self.stdout if output_dir else self.stderr)
+
+    @staticmethod
+    def _write_summary(results, elapsed, out):
+        """
+        Write the row count, export time and phase statistics of each course, and the totals.
+        """
+        for course_id, row_count, course_elapsed, stats_lines in results:
+            out.write(f"{course_id}: {row_count} rows in {course_elapsed:.2f}s")
+            for line in stats_lines:
+                out.write(f"  {line}")
+        out.write(
+            f"Exported {sum(result[1] for result in results)} rows "
+            f"from {len(results)} course(s) in {elapsed:.2f}s"
+        )
+
+
+@contextmanager
+def _open_csv_file(output_dir, file_name, stdout=None):
+    """
+    Open the CSV file in `output_dir`, or fall back on `stdout`.
+    """
+    if output_dir:
+        with open(os.path.join(output_dir, file_name), 'w', newline='', encoding='utf-8') as csv_file:
+            yield csv_file
+    else:
+        yield stdout
+
 
-        with self.open_csv_file(options, file_name) as csv_file:
+def _export_course(course_id, output_dir, file_name=None, stdout=None, collect_stats=False):
+    """
+    Write the ORA2 data of a course to a CSV file.
+
+    Returns:
+        A tuple (course_id, row_count, elapsed_seconds, stats_lines), where stats_lines is
+        the `ExportStats` report of the export if `collect_stats` is set, or an empty list.
+    """
+    start = time.monotonic()
+    if not file_name:
+        file_name = ("%s-ora2.csv" % course_id).replace("/", "-")
+
+    stats = ExportStats() if collect_stats else NullExportStats()
+    with stats.phase('export') as export_phase:
+        with _open_csv_file(output_dir, file_name, stdout) as csv_file:
             writer = csv.writer(csv_file, dialect='excel', quotechar='"', quoting=csv.QUOTE_ALL)
 
-            header, rows = OraAggregateData.collect_ora2_data(course_id)
+            header, rows = OraAggregateData.collect_ora2_data(course_id, stream=True, stats=stats)
 
             writer.writerow(header)
             for row in rows:
                 writer.writerow(_encode_row(row))
+                export_phase.rows += 1
+
+            if output_dir:
+                export_phase.bytes = csv_file.tell()
+
+    stats_lines = stats.report() if collect_stats else []
+    return course_id, export_phase.rows, time.monotonic() - start, stats_lines
 
 
 def _encode_row(data_list):
@@ -0,0 +1,68 @@
+"""
+Recompute the peer scores of a course or item in bulk.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from openassessment.assessment.api import peer as peer_api
+from openassessment.assessment.errors import PeerAssessmentRequestError
+from openassessment.assessment.models import PeerGradingStrategy
+
+
+class Command(BaseCommand):
+    """
+    Recompute peer scores with the given grading strategy and report the ones that change.
+
+    Nothing is written unless --apply is given, so the command can be run
+    first to review the differences.
+
+    Example:
+        ./manage.py recompute_peer_scores --course_id course-v1:edX+Demo+2024 --grading_strategy mean
+        ./manage.py recompute_peer_scores --course_id course-v1:edX+Demo+2024 --grading_strategy mean --apply
+    """
+
+    help = 'Recompute the peer scores of a course or item and optionally record the changed scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course_id',
+            dest='course_id',
+            required=True,
+            help='Course whose peer scores are recomputed',
+        )
+        parser.add_argument(
+            '--item_id',
+            dest='item_id',
+            help='Optional ORA block id to restrict the recomputation to',
+        )
+        parser.add_argument(
+            '--grading_strategy',
+            dest='grading_strategy',
+            choices=[PeerGradingStrategy.MEDIAN, PeerGradingStrategy.MEAN],
+            default=PeerGradingStrategy.MEDIAN,
+            help='How the peer assessments of each criterion are combined',
+        )
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+            help='Record the changed scores instead of only reporting them',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            changes = peer_api.recompute_peer_scores(
+                options['course_id'], options['grading_strategy'], item_id=options.get('item_id')
+            )
+        except PeerAssessmentRequestError as ex:
+            raise CommandError(str(ex)) from ex
+
+        for change in changes:
+            self.stdout.write(
+                "{submission_uuid}: {old_points_earned}/{old_points_possible} -> "
+                "{points_earned}/{points_possible}".format(**change)
+            )
+
+        if options['apply']:
+            applied = peer_api.apply_peer_score_changes(changes)
+            self.stdout.write("Recorded {} changed scores".format(applied))
+        else:
+            self.stdout.write("{} scores would change; run with --apply to record them".format(len(changes)))
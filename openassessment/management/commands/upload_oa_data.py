@@ -1,5 +1,10 @@
 """
 Generate CSV files for submission and assessment data, then upload to S3.
+
+With `--since` or `--checkpoint-file`, only the data created or modified
+after the previous export is included (see `CsvWriter.write_to_csv`).
+
+With `--stats`, the timings of each phase of the export are printed at the end.
 """
 
 
@@ -12,8 +17,10 @@ import tarfile
 import tempfile
 
 from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
 
-from openassessment.data import CsvWriter
+from openassessment.data import CsvWriter, ExportStats, NullExportStats
 from openassessment.fileupload.backends.s3 import _connect_to_s3
 
 
@@ -38,6 +45,34 @@ class Command(BaseCommand):
         self._history = []
         self._submission_counter = 0
 
+    def add_arguments(self, parser):
+        parser.add_argument('args', nargs='*')
+        parser.add_argument(
+            '--since',
+            action='store',
+            dest='since',
+            default=None,
+            help="Only export data created or modified after this ISO 8601 timestamp"
+        )
+        parser.add_argument(
+            '--checkpoint-file',
+            action='store',
+            dest='checkpoint_file',
+            default=None,
+            help=(
+                "File holding the watermark of the last export.  If it exists (and --since "
+                "is not given), only data created or modified since then is exported.  "
+                "The new watermark is written to it after a successful upload."
+            )
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            dest='stats',
+            default=False,
+            help="Print the wall time, queries, rows and bytes of each phase of the export"
+        )
+
     @property
     def history(self):
         """
@@ -69,23 +104,84 @@ class Command(BaseCommand):
             course_id = course_id.decode('utf-8')
         if isinstance(s3_bucket, bytes):
             s3_bucket = s3_bucket.decode('utf-8')
+        checkpoint_file = options.get('checkpoint_file')
+        since = self._load_watermark(options.get('since'), checkpoint_file)
+        stats = ExportStats() if options.get('stats') else NullExportStats()
         csv_dir = tempfile.mkdtemp()
 
         try:
-            print(f"Generating CSV files for course '{course_id}'")
-            self._dump_to_csv(course_id, csv_dir)
+            if since is None:
+                print(f"Generating CSV files for course '{course_id}'")
+            else:
+                print(f"Generating CSV files for course '{course_id}' with data since {since.isoformat()}")
+            watermark = self._dump_to_csv(course_id, csv_dir, since=since, stats=stats)
             print(f"Creating archive of CSV files in {csv_dir}")
-            archive_path = self._create_archive(csv_dir)
+            with stats.phase('archive') as archive_phase:
+                archive_path = self._create_archive(csv_dir)
+                archive_phase.bytes = os.path.getsize(archive_path)
             print(f"Uploading {archive_path} to {s3_bucket}/{course_id}")
-            url = self._upload(course_id, archive_path, s3_bucket)
+            with stats.phase('upload') as upload_phase:
+                url = self._upload(course_id, archive_path, s3_bucket)
+                upload_phase.bytes = os.path.getsize(archive_path)
             print("== Upload successful ==")
             print(f"Download URL (expires in {self.URL_EXPIRATION_HOURS} hours):\n{url}")
+            if checkpoint_file:
+                self._save_watermark(checkpoint_file, watermark)
+                print(f"Recorded watermark {watermark.isoformat()} in {checkpoint_file}")
+            if options.get('stats'):
+                print("== Export statistics ==")
+                for line in stats.report():
+                    print(line)
         finally:
             # Assume that the archive was created in the directory,
             # so to clean up we just need to delete the directory.
             shutil.rmtree(csv_dir)
 
-    def _dump_to_csv(self, course_id, csv_dir):
+    def _load_watermark(self, since, checkpoint_file):
+        """
+        Determine the watermark of the previous export.
+
+        Args:
+            since (unicode or None): ISO 8601 timestamp given on the command line.
+            checkpoint_file (unicode or None): Path to the checkpoint file.
+
+        Returns:
+            datetime or None: None means that everything should be exported.
+
+        Raises:
+            CommandError
+
+        """
+        if since is None and checkpoint_file and os.path.exists(checkpoint_file):
+            with open(checkpoint_file) as checkpoint:
+                since = checkpoint.read().strip()
+
+        if not since:
+            return None
+
+        watermark = parse_datetime(since)
+        if watermark is None:
+            raise CommandError(f"Invalid timestamp '{since}', expected an ISO 8601 date and time")
+        if is_naive(watermark):
+            watermark = make_aware(watermark, datetime.timezone.utc)
+        return watermark
+
+    def _save_watermark(self, checkpoint_file, watermark):
+        """
+        Record the watermark of this export in the checkpoint file.
+
+        Args:
+            checkpoint_file (unicode): Path to the checkpoint file.
+            watermark (datetime): The time at which the export started.
+
+        Returns:
+            None
+
+        """
+        with open(checkpoint_file, 'w') as checkpoint:
+            checkpoint.write(watermark.isoformat())
+
+    def _dump_to_csv(self, course_id, csv_dir, since=None, stats=None):
         """
         Create CSV files for submission/assessment data in a directory.
 
@@ -93,15 +189,19 @@ class Command(BaseCommand):
             course_id (unicode): The ID of the course to dump data from.
             csv_dir (unicode): The absolute path to the directory in which to create CSV files.
 
+        Keyword Arguments:
+            since (datetime): If provided, only export data created or modified after this time.
+            stats (ExportStats): Collects the timings of the export phases.
+
         Returns:
-            None
+            datetime: The watermark for the next incremental export.
         """
         output_streams = {
             name: open(os.path.join(csv_dir, rel_path), 'w')  # pylint: disable=consider-using-with
             for name, rel_path in self.OUTPUT_CSV_PATHS.items()
         }
-        csv_writer = CsvWriter(output_streams, self._progress_callback)
-        csv_writer.write_to_csv(course_id)
+        csv_writer = CsvWriter(output_streams, self._progress_callback, stats=stats)
+        return csv_writer.write_to_csv(course_id, since=since)
 
     def _create_archive(self, dir_path):
         """
@@ -0,0 +1,51 @@
+"""
+Tests for the management command that backfills the stored points of assessments.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from openassessment.assessment.models import Assessment, AssessmentPart
+from openassessment.assessment.serializers import rubric_from_dict
+from openassessment.assessment.test.constants import RUBRIC
+from openassessment.test_utils import CacheResetTest
+
+
+class BackfillAssessmentPointsTest(CacheResetTest):
+    """ Test the assessment points backfill command. """
+
+    def _create_assessment(self, rubric, selected):
+        assessment = Assessment.create(rubric, "Bob", "submission UUID", "PE")
+        AssessmentPart.create_from_option_names(assessment, selected)
+        return assessment
+
+    def test_backfill(self):
+        rubric = rubric_from_dict(RUBRIC)
+        points = {
+            self._create_assessment(rubric, {"vøȼȺƀᵾłȺɍɏ": "𝓰𝓸𝓸𝓭", "ﻭɼค๓๓คɼ": "єχ¢єℓℓєηт"}).id: 3,
+            self._create_assessment(rubric, {"vøȼȺƀᵾłȺɍɏ": "𝒑𝒐𝒐𝒓", "ﻭɼค๓๓คɼ": "𝒑𝒐𝒐𝒓"}).id: 0,
+            self._create_assessment(rubric, {"vøȼȺƀᵾłȺɍɏ": "єχ¢єℓℓєηт", "ﻭɼค๓๓คɼ": "𝓰𝓸𝓸𝓭"}).id: 3,
+        }
+        Assessment.objects.update(stored_points_earned=None, stored_points_possible=None)
+
+        out = StringIO()
+        call_command('backfill_assessment_points', batch_size=2, stdout=out)
+
+        self.assertEqual(
+            dict(Assessment.objects.values_list('id', 'stored_points_earned')),
+            points,
+        )
+        self.assertEqual(set(Assessment.objects.values_list('stored_points_possible', flat=True)), {4})
+        self.assertEqual(out.getvalue().splitlines()[-1], 'Done, backfilled 3 assessments')
+
+        # Nothing is left to backfill
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command('backfill_assessment_points', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), ['Done, backfilled 0 assessments'])
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command('backfill_assessment_points', batch_size=0)
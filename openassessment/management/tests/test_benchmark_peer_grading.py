@@ -0,0 +1,43 @@
+"""
+Tests for the management command that load tests the peer grading APIs.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from submissions.models import Submission
+
+from openassessment.assessment.models import Assessment, PeerWorkflow
+from openassessment.management.commands.benchmark_peer_grading import CALLS
+from openassessment.workflow.models import AssessmentWorkflow
+
+
+class BenchmarkPeerGradingTest(TestCase):
+    """ Test the peer grading benchmark command. """
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_peer_grading', learners=[10, 20], operations=60, active=5, seed=1, stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertIn('== 10 learners ==', output)
+        self.assertIn('== 20 learners ==', output)
+        for call in CALLS:
+            self.assertIn('{}: calls='.format(call), output)
+        self.assertIn('max_queries=', output)
+
+        # The synthetic item is rolled back
+        self.assertFalse(Submission.objects.exists())
+        self.assertFalse(PeerWorkflow.objects.exists())
+        self.assertFalse(AssessmentWorkflow.objects.exists())
+        self.assertFalse(Assessment.objects.exists())
+
+    def test_invalid_arguments(self):
+        with pytest.raises(CommandError):
+            call_command('benchmark_peer_grading', learners=[1])
+        with pytest.raises(CommandError):
+            call_command('benchmark_peer_grading', operations=0)
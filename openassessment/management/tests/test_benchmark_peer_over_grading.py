@@ -0,0 +1,36 @@
+"""
+Tests for the management command that benchmarks over grading selection.
+"""
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from openassessment.assessment.models import PeerWorkflow
+
+
+class BenchmarkPeerOverGradingTest(TestCase):
+    """ Test the over grading benchmark command. """
+
+    def test_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_peer_over_grading', learners=20, iterations=5, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('full_scan: '))
+        self.assertTrue(lines[1].startswith('random_offset: '))
+        for line in lines:
+            self.assertIn('p99=', line)
+            self.assertIn('queries/call=', line)
+
+        # The synthetic workflows are rolled back
+        self.assertFalse(PeerWorkflow.objects.exists())
+
+    def test_invalid_arguments(self):
+        with pytest.raises(CommandError):
+            call_command('benchmark_peer_over_grading', learners=1)
+        with pytest.raises(CommandError):
+            call_command('benchmark_peer_over_grading', iterations=0)
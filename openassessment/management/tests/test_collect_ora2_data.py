@@ -1,8 +1,14 @@
 """ Test the collect_ora2_data management command """
 
+from concurrent.futures import ThreadPoolExecutor
+import csv
+from io import StringIO
+import os
+import tempfile
 from unittest.mock import patch
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 
 from openassessment.test_utils import CacheResetTest
 
@@ -89,3 +95,79 @@ class CollectOra2DataTest(CacheResetTest):
             mock_writerow.assert_any_call(self.test_header)
             mock_writerow.assert_any_call(self.test_rows[0])
             mock_writerow.assert_any_call(self.unicode_encoded_row)
+
+    @patch('openassessment.management.commands.collect_ora2_data.OraAggregateData.collect_ora2_data')
+    def test_rows_are_streamed_to_file(self, mock_data):
+        """ Verify that rows are requested as a stream and written to the output file. """
+
+        mock_data.return_value = (self.test_header, iter(self.test_rows))
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('collect_ora2_data', self.COURSE_ID, output_dir=output_dir, file_name='ora2.csv')
+
+            with open(os.path.join(output_dir, 'ora2.csv'), newline='', encoding='utf-8') as csv_file:
+                written_rows = list(csv.reader(csv_file))
+
+        self.assertTrue(mock_data.call_args.kwargs['stream'])
+        self.assertEqual(written_rows, [self.test_header] + self.test_rows)
+
+    @patch('openassessment.management.commands.collect_ora2_data.OraAggregateData.collect_ora2_data')
+    def test_multiple_courses(self, mock_data):
+        """ Verify that each course is exported to its own file, and that a summary is written. """
+
+        mock_data.side_effect = lambda course_id, **kwargs: (self.test_header, iter(self.test_rows))
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('collect_ora2_data', 'course/1', 'course/2', output_dir=output_dir, stdout=out)
+
+            self.assertEqual(sorted(os.listdir(output_dir)), ['course-1-ora2.csv', 'course-2-ora2.csv'])
+
+        self.assertEqual([call.args[0] for call in mock_data.call_args_list], ['course/1', 'course/2'])
+        self.assertIn('course/1: 2 rows in', out.getvalue())
+        self.assertIn('course/2: 2 rows in', out.getvalue())
+        self.assertIn('Exported 4 rows from 2 course(s)', out.getvalue())
+
+    @patch('openassessment.management.commands.collect_ora2_data.connections')
+    @patch('openassessment.management.commands.collect_ora2_data.ProcessPoolExecutor')
+    @patch('openassessment.management.commands.collect_ora2_data.OraAggregateData.collect_ora2_data')
+    def test_workers(self, mock_data, mock_pool, mock_connections):
+        """ Verify that courses are exported by a pool of workers, with their own database connections. """
+
+        mock_data.side_effect = lambda course_id, **kwargs: (self.test_header, iter(self.test_rows))
+        mock_pool.side_effect = lambda max_workers, **kwargs: ThreadPoolExecutor(max_workers=max_workers)
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command(
+                'collect_ora2_data', 'course/1', 'course/2', 'course/3', output_dir=output_dir, workers=2, stdout=out
+            )
+
+            self.assertEqual(len(os.listdir(output_dir)), 3)
+
+        self.assertEqual(mock_pool.call_args.kwargs['max_workers'], 2)
+        self.assertEqual(mock_pool.call_args.kwargs['initializer'], mock_connections.close_all)
+        mock_connections.close_all.assert_called_once_with()
+        self.assertIn('Exported 6 rows from 3 course(s)', out.getvalue())
+
+    def test_workers_require_output_dir(self):
+        with self.assertRaises(CommandError):
+            call_command('collect_ora2_data', 'course/1', 'course/2', workers=2)
+
+    def test_file_name_with_multiple_courses(self):
+        with self.assertRaises(CommandError):
+            call_command('collect_ora2_data', 'course/1', 'course/2', file_name='ora2.csv')
+
+    @patch('openassessment.management.commands.collect_ora2_data.OraAggregateData.collect_ora2_data')
+    def test_stats(self, mock_data):
+        """ Verify that the phase statistics of each course are reported with --stats. """
+
+        mock_data.side_effect = lambda course_id, **kwargs: (self.test_header, iter(self.test_rows))
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('collect_ora2_data', self.COURSE_ID, output_dir=output_dir, stats=True, stdout=out)
+
+        self.assertIsNotNone(mock_data.call_args.kwargs['stats'])
+        self.assertIn('  export: ', out.getvalue())
+        self.assertIn('2 rows (', out.getvalue())
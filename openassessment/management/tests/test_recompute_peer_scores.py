@@ -0,0 +1,54 @@
+"""
+Tests for the management command that recomputes peer scores.
+"""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from openassessment.assessment.errors import PeerAssessmentRequestError
+
+CHANGES = [{
+    'submission_uuid': 'abc-123',
+    'old_points_earned': 6,
+    'old_points_possible': 14,
+    'points_earned': 9,
+    'points_possible': 14,
+}]
+
+
+@patch('openassessment.management.commands.recompute_peer_scores.peer_api.apply_peer_score_changes')
+@patch('openassessment.management.commands.recompute_peer_scores.peer_api.recompute_peer_scores')
+class RecomputePeerScoresTest(TestCase):
+    """ Test the peer score recomputation command. """
+
+    def test_report(self, mock_recompute, mock_apply):
+        mock_recompute.return_value = CHANGES
+        out = StringIO()
+        call_command('recompute_peer_scores', course_id='course_1', grading_strategy='mean', stdout=out)
+
+        mock_recompute.assert_called_once_with('course_1', 'mean', item_id=None)
+        mock_apply.assert_not_called()
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            ['abc-123: 6/14 -> 9/14', '1 scores would change; run with --apply to record them'],
+        )
+
+    def test_apply(self, mock_recompute, mock_apply):
+        mock_recompute.return_value = CHANGES
+        mock_apply.return_value = 1
+        out = StringIO()
+        call_command('recompute_peer_scores', course_id='course_1', item_id='item_1', apply=True, stdout=out)
+
+        mock_recompute.assert_called_once_with('course_1', 'median', item_id='item_1')
+        mock_apply.assert_called_once_with(CHANGES)
+        self.assertEqual(out.getvalue().splitlines()[-1], 'Recorded 1 changed scores')
+
+    def test_request_error(self, mock_recompute, mock_apply):
+        mock_recompute.side_effect = PeerAssessmentRequestError('Unsupported grading strategy')
+        with pytest.raises(CommandError):
+            call_command('recompute_peer_scores', course_id='course_1')
+        mock_apply.assert_not_called()
@@ -3,13 +3,18 @@ Tests for management command that uploads submission/assessment data.
 """
 
 
+import os
 import tarfile
-from io import BytesIO
+import tempfile
+from contextlib import redirect_stdout
+from io import BytesIO, StringIO
 from urllib.parse import urlparse
 
 
 import boto3
 import moto
+from django.core.management.base import CommandError
+from freezegun import freeze_time
 from submissions import api as sub_api
 from openassessment.management.commands import upload_oa_data
 from openassessment.test_utils import CacheResetTest
@@ -83,3 +88,47 @@ class UploadDataTest(CacheResetTest):
             ["s3.eu-west-1.amazonaws.com", "s3.amazonaws.com"]
         )
         self.assertIn(f"/{self.BUCKET_NAME}", parsed_url.path)
+
+    @moto.mock_s3
+    def test_checkpoint_file(self):
+        conn = boto3.client("s3")
+        conn.create_bucket(Bucket=self.BUCKET_NAME)
+
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            checkpoint_file = os.path.join(checkpoint_dir, 'checkpoint')
+
+            # The first export has no watermark and records one when it finishes
+            cmd = upload_oa_data.Command()
+            with freeze_time("2020-01-01 12:00:00"):
+                cmd.handle(self.COURSE_ID, self.BUCKET_NAME, checkpoint_file=checkpoint_file)
+            with open(checkpoint_file) as checkpoint:
+                self.assertEqual(checkpoint.read(), "2020-01-01T12:00:00+00:00")
+
+            # The next export picks up the recorded watermark
+            # pylint: disable=protected-access
+            watermark = cmd._load_watermark(None, checkpoint_file)
+            self.assertEqual(watermark.isoformat(), "2020-01-01T12:00:00+00:00")
+
+            # An explicit --since takes precedence over the checkpoint file
+            watermark = cmd._load_watermark("2019-06-01 08:30", checkpoint_file)
+            self.assertEqual(watermark.isoformat(), "2019-06-01T08:30:00+00:00")
+
+    @moto.mock_s3
+    def test_stats(self):
+        conn = boto3.client("s3")
+        conn.create_bucket(Bucket=self.BUCKET_NAME)
+
+        out = StringIO()
+        with redirect_stdout(out):
+            upload_oa_data.Command().handle(self.COURSE_ID, self.BUCKET_NAME, stats=True)
+
+        report = out.getvalue().split("== Export statistics ==\n")[1].splitlines()
+        self.assertEqual(
+            [line.split(':')[0] for line in report],
+            ['paginate', 'write', 'archive', 'upload'],
+        )
+
+    def test_invalid_since(self):
+        cmd = upload_oa_data.Command()
+        with self.assertRaises(CommandError):
+            cmd.handle(self.COURSE_ID, self.BUCKET_NAME, since="yesterday")
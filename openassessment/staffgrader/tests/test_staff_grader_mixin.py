@@ -20,7 +20,8 @@ from openassessment.xblock.test.base import (
 )
 
 
-@freeze_time("1969-07-20T22:56:00-04:00")
+# The local memory cache cannot look up missing keys before the epoch, so it keeps the real clock
+@freeze_time("1969-07-20T22:56:00-04:00", ignore=['django.core.cache'])
 class TestStaffGraderMixin(XBlockHandlerTestCase):
     """ Tests for interacting with submission grading/locking """
     test_submission_uuid = str(uuid4())
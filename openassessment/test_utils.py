@@ -6,10 +6,15 @@ Test utilities
 from django.core.cache import cache
 from django.test import TestCase, TransactionTestCase
 
+from openassessment.assessment.models import RUBRIC_INDEX_CACHE
+from openassessment.assessment.serializers import clear_rubric_lookups
+
 
 def _clear_all_caches():
     """Clear the default cache and any custom caches."""
     cache.clear()
+    RUBRIC_INDEX_CACHE.clear()
+    clear_rubric_lookups()
 
 
 class CacheResetTest(TestCase):
@@ -3,11 +3,15 @@ Tests for openassessment data aggregation.
 """
 
 from collections import OrderedDict
+from concurrent.futures import Future
 import csv
 from copy import deepcopy
 from io import StringIO, BytesIO, TextIOWrapper
+from itertools import chain
 import json
 import os.path
+import tempfile
+from types import GeneratorType
 import zipfile
 from typing import List
 from unittest.mock import call, Mock, patch, MagicMock
@@ -21,14 +25,16 @@ from django.test import TestCase, override_settings
 from submissions import api as sub_api, team_api as team_sub_api
 import openassessment.assessment.api.peer as peer_api
 from openassessment.data import (
-    CsvWriter, OraAggregateData, OraDownloadData, SubmissionFileUpload, OraSubmissionAnswerFactory,
+    CsvWriter, ExportStats, NullExportStats, OraAggregateData, OraDownloadData, SubmissionFileUpload,
+    OraSubmissionAnswerFactory,
     VersionNotFoundException, ZippedListSubmissionAnswer, OraSubmissionAnswer, ZIPPED_LIST_SUBMISSION_VERSIONS,
     TextOnlySubmissionAnswer, FileMissingException, map_anonymized_ids_to_usernames, map_anonymized_ids_to_user_data,
-    generate_assessment_to_data, generate_assessment_from_data, generate_assessment_data, parts_summary,
+    generate_assessment_to_data, generate_assessment_from_data, generate_assessment_data, parts_summary, percentile,
 )
 from openassessment.test_utils import TransactionCacheResetTest
 from openassessment.tests.factories import *  # pylint: disable=wildcard-import
 from openassessment.workflow import api as workflow_api, team_api as team_workflow_api
+from openassessment.workflow.models import AssessmentWorkflowStep
 
 
 COURSE_ID = "Test_Course"
@@ -205,6 +211,75 @@ COURSE_SETTINGS = {
 }
 
 
+class ExportStatsTest(TransactionCacheResetTest):
+    """
+    Test the collection of data export statistics.
+    """
+
+    def test_phase(self):
+        finished_phases = []
+        stats = ExportStats(callback=finished_phases.append)
+
+        for _ in range(2):
+            with stats.phase('load') as phase:
+                list(AssessmentWorkflowStep.objects.all())
+                phase.rows += 10
+                phase.bytes += 100
+
+        phase = stats.phases['load']
+        self.assertEqual(phase.queries, 2)
+        self.assertEqual(phase.rows, 20)
+        self.assertEqual(phase.bytes, 200)
+        self.assertGreater(phase.wall_time, 0)
+        self.assertEqual(finished_phases, [phase, phase])
+
+    def test_iter_phase(self):
+        finished_phases = []
+        stats = ExportStats(callback=finished_phases.append)
+
+        def rows():
+            for index in range(3):
+                list(AssessmentWorkflowStep.objects.all())
+                yield index
+
+        for _ in stats.iter_phase('rows', rows()):
+            # Queries made while consuming the rows are not part of the phase
+            list(AssessmentWorkflowStep.objects.all())
+
+        self.assertEqual(stats.phases['rows'].queries, 3)
+        self.assertEqual(stats.phases['rows'].rows, 3)
+        self.assertEqual(finished_phases, [stats.phases['rows']])
+
+    def test_download_latency_percentiles(self):
+        stats = ExportStats()
+        self.assertEqual(stats.download_latency_percentiles(), {})
+
+        for latency in range(1, 101):
+            stats.record_download(latency / 1000)
+
+        self.assertEqual(stats.download_latency_percentiles(), {50: 0.05, 90: 0.09, 99: 0.099})
+        self.assertEqual(stats.as_dict()['downloads'], 100)
+        self.assertEqual(stats.report(), ['downloads: 100 files, latency p50 0.050s, p90 0.090s, p99 0.099s'])
+
+    def test_percentile(self):
+        values = list(range(1, 11))
+        self.assertEqual([percentile(values, percent) for percent in (0, 10, 15, 50, 99, 100)], [1, 1, 2, 5, 10, 10])
+        self.assertEqual(percentile([7], 50), 7)
+
+    def test_null_stats(self):
+        stats = NullExportStats()
+        rows = iter([1, 2])
+
+        with patch('openassessment.data.connections') as mock_connections:
+            with stats.phase('load') as phase:
+                phase.rows += 1
+            self.assertIs(stats.iter_phase('rows', rows), rows)
+            stats.record_download(0.1)
+
+        mock_connections.all.assert_not_called()
+        self.assertEqual(stats.report(), [])
+
+
 @ddt.ddt
 class CsvWriterTest(TransactionCacheResetTest):
     """
@@ -281,6 +356,103 @@ class CsvWriterTest(TransactionCacheResetTest):
         # Check that we have the right number of rows
         self.assertEqual(len(rows), num_submissions)
 
+    @freeze_time("2020-01-01 12:23:34")
+    @patch.object(CsvWriter, 'QUERY_INTERVAL', 3)
+    def test_submission_pages_with_identical_timestamps(self):
+        # Workflows created at the same moment must still be paged
+        # through exactly once each.
+        expected_uuids = []
+        for index in range(10):
+            student_item = {
+                'student_id': f"test_user_{index}",
+                'course_id': 'test_course',
+                'item_id': 'test_item',
+                'item_type': 'openassessment',
+            }
+            submission = sub_api.create_submission(student_item, f"test submission {index}")
+            workflow_api.create_workflow(submission['uuid'], ['self'])
+            expected_uuids.append(submission['uuid'])
+
+        # pylint: disable=protected-access
+        pages = list(CsvWriter({})._submission_uuid_pages('test_course'))
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertCountEqual(list(chain.from_iterable(pages)), expected_uuids)
+
+    def test_write_to_csv_num_queries(self):
+        # The number of queries for a page doesn't depend on how many
+        # submissions are in the page.
+        self._load_fixture('db_fixtures/scored.json')
+        output_streams = self._output_streams(CsvWriter.MODELS)
+
+        # Two workflow pages (the second one empty), submissions, scores,
+        # assessment parts and feedback, plus the rubric's points possible,
+        # which are computed once per rubric (rubric, criteria and 3 options).
+        with self.assertNumQueries(11):
+            CsvWriter(output_streams).write_to_csv('edX/Enchantment_101/April_1')
+
+    def test_write_to_csv_since(self):
+        def _create_submissions(indices):
+            uuids = []
+            for index in indices:
+                student_item = {
+                    'student_id': f"test_user_{index}",
+                    'course_id': 'test_course',
+                    'item_id': 'test_item',
+                    'item_type': 'openassessment',
+                }
+                submission = sub_api.create_submission(student_item, f"test submission {index}")
+                workflow_api.create_workflow(submission['uuid'], ['self'])
+                uuids.append(submission['uuid'])
+            return uuids
+
+        with freeze_time("2020-01-01 12:00:00"):
+            _create_submissions(range(3))
+            watermark = CsvWriter(self._output_streams(['submission'])).write_to_csv('test_course')
+
+        self.assertEqual(watermark.isoformat(), "2020-01-01T12:00:00+00:00")
+
+        with freeze_time("2020-01-02 12:00:00"):
+            new_uuids = _create_submissions(range(3, 5))
+
+        output_streams = self._output_streams(['submission'])
+        CsvWriter(output_streams).write_to_csv('test_course', since=watermark)
+
+        output_streams['submission'].seek(0)
+        rows = list(csv.reader(output_streams['submission']))[1:]
+        self.assertCountEqual([row[0] for row in rows], new_uuids)
+
+    def test_write_to_csv_since_score_changes(self):
+        uuids = []
+        with freeze_time("2020-01-01 12:00:00"):
+            for index in range(3):
+                student_item = {
+                    'student_id': f"test_user_{index}",
+                    'course_id': 'test_course',
+                    'item_id': 'test_item',
+                    'item_type': 'openassessment',
+                }
+                submission = sub_api.create_submission(student_item, f"test submission {index}")
+                workflow_api.create_workflow(submission['uuid'], ['self'])
+                uuids.append(submission['uuid'])
+            sub_api.set_score(uuids[2], 1, 2)
+            watermark = CsvWriter(self._output_streams(['submission'])).write_to_csv('test_course')
+
+        # Scores set or reset straight through the submissions API are exported
+        with freeze_time("2020-01-02 12:00:00"):
+            sub_api.set_score(uuids[0], 2, 2)
+            sub_api.reset_score("test_user_2", 'test_course', 'test_item')
+
+        output_streams = self._output_streams(['submission', 'score'])
+        CsvWriter(output_streams).write_to_csv('test_course', since=watermark)
+
+        output_streams['submission'].seek(0)
+        rows = list(csv.reader(output_streams['submission']))[1:]
+        self.assertCountEqual([row[0] for row in rows], [uuids[0], uuids[2]])
+        output_streams['score'].seek(0)
+        rows = list(csv.DictReader(output_streams['score']))
+        self.assertEqual([row['points_earned'] for row in rows], ['2'])
+
     def test_other_course_id(self):
         # Try a course ID with no submissions
         self._load_fixture('db_fixtures/scored.json')
@@ -911,6 +1083,54 @@ class TestOraAggregateDataIntegration(TransactionCacheResetTest):
                 _, rows = OraAggregateData.collect_ora2_data(COURSE_ID)
         self.assertEqual(json.dumps(answer, ensure_ascii=False), rows[1][7])
 
+    def test_collect_ora2_data_chunked(self):
+        """
+        Splitting submissions into chunks doesn't change the generated report.
+        """
+        with patch('openassessment.data.map_anonymized_ids_to_usernames', return_value=USERNAME_MAPPING):
+            expected_headers, expected_data = OraAggregateData.collect_ora2_data(COURSE_ID)
+            with patch.object(OraAggregateData, 'BULK_CHUNK_SIZE', 1):
+                headers, data = OraAggregateData.collect_ora2_data(COURSE_ID)
+
+        self.assertEqual(headers, expected_headers)
+        self.assertEqual(data, expected_data)
+
+    def test_collect_ora2_data_stream(self):
+        with patch('openassessment.data.map_anonymized_ids_to_usernames', return_value=USERNAME_MAPPING):
+            expected_headers, expected_data = OraAggregateData.collect_ora2_data(COURSE_ID)
+            headers, rows = OraAggregateData.collect_ora2_data(COURSE_ID, stream=True)
+
+            self.assertEqual(headers, expected_headers)
+            self.assertIsInstance(rows, GeneratorType)
+            self.assertEqual(list(rows), expected_data)
+
+    def test_collect_ora2_summary_stream(self):
+        expected_headers, expected_data = OraAggregateData.collect_ora2_summary(COURSE_ID)
+        headers, rows = OraAggregateData.collect_ora2_summary(COURSE_ID, stream=True)
+
+        self.assertEqual(headers, expected_headers)
+        self.assertIsInstance(rows, GeneratorType)
+        self.assertEqual(list(rows), expected_data)
+
+    def test_build_ora2_data_rows_num_queries(self):
+        """
+        The number of queries needed to build a chunk of rows doesn't depend
+        on the number of submissions or assessments in the chunk.
+        """
+        for index in range(3):
+            submission = self._create_submission(dict(STUDENT_ITEM, student_id=self._other_student(index)))
+            peer_api.get_submission_to_assess(submission['uuid'], 1)
+            self._create_assessment(submission['uuid'])
+
+        submission_information = list(sub_api.get_all_course_submission_information(COURSE_ID, 'openassessment'))
+        self.assertEqual(len(submission_information), 5)
+
+        # Scored peer assessments, assessments, parts, feedback, feedback options and feedback text
+        with self.assertNumQueries(6):
+            # pylint: disable=protected-access
+            rows = list(OraAggregateData._build_ora2_data_rows(submission_information, {}, {}))
+        self.assertEqual(len(rows), 5)
+
     def test_collect_ora2_summary(self):
         headers, data = OraAggregateData.collect_ora2_summary(COURSE_ID)
 
@@ -977,6 +1197,44 @@ class TestOraAggregateDataIntegration(TransactionCacheResetTest):
             2,
         ])
 
+    def test_collect_ora2_data_stats(self):
+        stats = ExportStats()
+
+        with patch('openassessment.data.map_anonymized_ids_to_usernames', return_value=USERNAME_MAPPING):
+            _, rows = OraAggregateData.collect_ora2_data(COURSE_ID, stream=True, stats=stats)
+            self.assertEqual(list(stats.phases), ['block_names'])
+
+            rows = list(rows)
+        self.assertEqual(list(stats.phases), ['block_names', 'ora2_data_rows'])
+        self.assertEqual(stats.phases['ora2_data_rows'].rows, len(rows))
+        self.assertGreater(stats.phases['ora2_data_rows'].queries, 0)
+
+    def test_collect_ora2_summary_num_queries(self):
+        """
+        The number of queries needed for the summary doesn't depend on the number of workflows.
+        """
+        for index in range(3):
+            submission = self._create_submission(dict(STUDENT_ITEM, student_id=self._other_student(index)))
+            peer_api.get_submission_to_assess(submission['uuid'], 1)
+            self._create_assessment(submission['uuid'])
+
+        # Workflows, steps, peers graded, graded by, submissions, staff assessments and scores
+        with self.assertNumQueries(7):
+            _, data = OraAggregateData.collect_ora2_summary(COURSE_ID)
+        self.assertEqual(len(data), 5)
+
+    def test_collect_ora2_summary_missing_staff_step(self):
+        """
+        Workflows without a staff step are reported as if it had been created,
+        without writing to the database.
+        """
+        AssessmentWorkflowStep.objects.filter(name='staff').delete()
+
+        _, data = OraAggregateData.collect_ora2_summary(COURSE_ID)
+
+        self.assertEqual([row[7:9] for row in data], [[0, 1], [0, 1]])
+        self.assertFalse(AssessmentWorkflowStep.objects.filter(name='staff').exists())
+
     def test_collect_ora2_responses(self):
         item_id2 = self._other_item(2)
         item_id3 = self._other_item(3)
@@ -1220,6 +1478,42 @@ class TestOraAggregateDataIntegration(TransactionCacheResetTest):
             ]),
         ], rows)
 
+    def test_bulk_generate_assessment_data(self):
+        """
+        The batched report yields, for each submission, the rows of `generate_assessment_data`.
+        """
+        other_submission = self._create_submission(dict(STUDENT_ITEM, student_id=self._other_student(1)))
+        peer_api.get_submission_to_assess(other_submission['uuid'], 1)
+        self._create_assessment(other_submission['uuid'])
+        self._create_assessment_feedback(self.submission['uuid'])
+        submission_uuids = [
+            self.submission['uuid'], None, other_submission['uuid'], self.scorer_submission['uuid'], None,
+        ]
+
+        rows = list(OraAggregateData.bulk_generate_assessment_data('block_id_goes_here', submission_uuids))
+
+        self.assertEqual(rows, [
+            list(OraAggregateData.generate_assessment_data('block_id_goes_here', submission_uuid))
+            for submission_uuid in submission_uuids
+        ])
+
+    def test_bulk_generate_assessment_data_num_queries(self):
+        """
+        The number of queries of the batched report doesn't depend on the number of submissions.
+        """
+        submission_uuids = [self.submission['uuid'], self.scorer_submission['uuid']]
+        for index in range(3):
+            submission = self._create_submission(dict(STUDENT_ITEM, student_id=self._other_student(index)))
+            peer_api.get_submission_to_assess(submission['uuid'], 1)
+            self._create_assessment(submission['uuid'])
+            submission_uuids.append(submission['uuid'])
+
+        # Submissions, scores, assessments, parts, feedback, feedback options and feedback text.
+        # The points possible of unscored submissions are stored on their assessments.
+        with self.assertNumQueries(7):
+            rows = list(OraAggregateData.bulk_generate_assessment_data('block_id_goes_here', submission_uuids))
+        self.assertEqual(len(rows), 5)
+
 
 @ddt.ddt
 class TestOraDownloadDataIntegration(TransactionCacheResetTest):
@@ -1502,17 +1796,18 @@ class TestOraDownloadDataIntegration(TransactionCacheResetTest):
         file_content = b'file_content'
 
         with patch(
-            'openassessment.data.OraDownloadData._download_file_by_key', return_value=file_content
+            'openassessment.data.OraDownloadData._download_file_by_key', side_effect=lambda key: BytesIO(file_content)
         ) as download_mock:
             OraDownloadData.create_zip_with_attachments(file, self.submission_files_data)
 
+            # Attachments are downloaded concurrently, so the calls may happen in any order
             download_mock.assert_has_calls([
                 call(self.file_key_5),
                 call(self.file_key_4),
                 call(self.file_key_1),
                 call(self.file_key_2),
                 call(self.file_key_3),
-            ])
+            ], any_order=True)
 
         with zipfile.ZipFile(file) as zip_file:
 
@@ -1563,7 +1858,9 @@ class TestOraDownloadDataIntegration(TransactionCacheResetTest):
 
         file_content = b'file_content'
 
-        with patch('openassessment.data.OraDownloadData._download_file_by_key', return_value=file_content):
+        with patch(
+            'openassessment.data.OraDownloadData._download_file_by_key', side_effect=lambda key: BytesIO(file_content)
+        ):
             OraDownloadData.create_zip_with_attachments(file, self.submission_files_data)
 
         with zipfile.ZipFile(file) as zip_file:
@@ -1596,7 +1893,7 @@ class TestOraDownloadDataIntegration(TransactionCacheResetTest):
                 call(self.file_key_1),
                 call(self.file_key_2),
                 call(self.file_key_3),
-            ])
+            ], any_order=True)
 
         with zipfile.ZipFile(file) as zip_file:
             # archive should contain only three parts text file and one csv because all of the attachments are invalid
@@ -1654,6 +1951,295 @@ class TestOraDownloadDataIntegration(TransactionCacheResetTest):
                     else:
                         self.assertTrue(zipfile.Path(zip_file, row['file_path']).exists())
 
+    @override_settings(LMS_ROOT_URL='https://lms.example.com')
+    @patch.object(OraDownloadData, 'DOWNLOAD_SPOOL_SIZE', 10)
+    def test_download_file_by_key(self):
+        chunks = [b'x' * 8] * 4
+        session = MagicMock()
+        response = session.get.return_value.__enter__.return_value
+        response.iter_content.return_value = iter(chunks)
+
+        with patch('openassessment.data.get_download_url', return_value='/files/key'):
+            with patch.object(OraDownloadData, '_get_http_session', return_value=session):
+                # pylint: disable=protected-access
+                with OraDownloadData._download_file_by_key('key') as downloaded_file:
+                    # Content bigger than the spool size is written to disk
+                    self.assertTrue(downloaded_file._rolled)
+                    self.assertEqual(downloaded_file.read(), b''.join(chunks))
+
+        session.get.assert_called_once_with('https://lms.example.com/files/key', stream=True)
+        response.raise_for_status.assert_called_once_with()
+
+    @override_settings(LMS_ROOT_URL='https://lms.example.com')
+    def test_download_file_by_key_interrupted(self):
+        session = MagicMock()
+        response = session.get.return_value.__enter__.return_value
+        response.iter_content.side_effect = ConnectionError('Connection reset')
+
+        with patch('openassessment.data.get_download_url', return_value='/files/key'), \
+                patch.object(OraDownloadData, '_get_http_session', return_value=session), \
+                patch('openassessment.data.tempfile.SpooledTemporaryFile') as mock_file:
+            with self.assertRaises(ConnectionError):
+                OraDownloadData._download_file_by_key('key')  # pylint: disable=protected-access
+
+        mock_file.return_value.close.assert_called_once_with()
+
+    def test_download_file_by_key_missing(self):
+        with patch('openassessment.data.get_download_url', return_value=None):
+            with self.assertRaises(FileMissingException):
+                OraDownloadData._download_file_by_key('key')  # pylint: disable=protected-access
+
+    def test_create_resumable_zip_with_attachments(self):
+        """
+        A resumable archive has the same content as the regular one, and its manifest is removed at the end.
+        """
+        file_content = b'file_content'
+        with tempfile.TemporaryDirectory() as directory, patch(
+            'openassessment.data.OraDownloadData._download_file_by_key', side_effect=lambda key: BytesIO(file_content)
+        ):
+            archive_path = os.path.join(directory, 'submissions.zip')
+            OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            self.assertFalse(os.path.exists(archive_path + OraDownloadData.MANIFEST_SUFFIX))
+            with zipfile.ZipFile(archive_path) as zip_file:
+                self.assertEqual(
+                    sorted(zip_file.namelist()),
+                    sorted([file_data['file_path'] for file_data in self.submission_files_data] + ['submissions.csv'])
+                )
+                submissions_csv = list(csv.DictReader(StringIO(zip_file.read('submissions.csv').decode('utf-8'))))
+
+        self.assertEqual(
+            [row['file_path'] for row in submissions_csv],
+            [file_data['file_path'] for file_data in self.submission_files_data]
+        )
+        self.assertTrue(all(row['file_found'] == 'True' for row in submissions_csv))
+
+    @patch.object(OraDownloadData, 'CHECKPOINT_INTERVAL', 2)
+    def test_resume_zip_with_attachments(self):
+        """
+        An interrupted archive is resumed from its last checkpoint, without downloading the archived files again.
+        """
+        file_content = b'file_content'
+        downloaded_keys = []
+
+        def failing_download(key):
+            if key == self.file_key_2:
+                raise RuntimeError('Connection reset')
+            downloaded_keys.append(key)
+            return BytesIO(file_content)
+
+        def download(key):
+            downloaded_keys.append(key)
+            return BytesIO(file_content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'submissions.zip')
+
+            with patch('openassessment.data.OraDownloadData._download_file_by_key', side_effect=failing_download):
+                with self.assertRaises(RuntimeError):
+                    OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            # The files archived before the failure are checkpointed and kept
+            self.assertTrue(os.path.exists(archive_path + OraDownloadData.MANIFEST_SUFFIX))
+            with zipfile.ZipFile(archive_path) as zip_file:
+                archived_paths = zip_file.namelist()
+            self.assertEqual(
+                archived_paths, [file_data['file_path'] for file_data in self.submission_files_data[:5]]
+            )
+
+            downloaded_keys.clear()
+            with patch('openassessment.data.OraDownloadData._download_file_by_key', side_effect=download):
+                OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            self.assertEqual(sorted(downloaded_keys), sorted([self.file_key_2, self.file_key_3]))
+            self.assertFalse(os.path.exists(archive_path + OraDownloadData.MANIFEST_SUFFIX))
+            with zipfile.ZipFile(archive_path) as zip_file:
+                self.assertIsNone(zip_file.testzip())
+                self.assertEqual(
+                    zip_file.namelist(),
+                    [file_data['file_path'] for file_data in self.submission_files_data] + ['submissions.csv']
+                )
+                submissions_csv = list(csv.DictReader(StringIO(zip_file.read('submissions.csv').decode('utf-8'))))
+
+        self.assertEqual(len(submissions_csv), len(self.submission_files_data))
+
+    @patch.object(OraDownloadData, 'CHECKPOINT_INTERVAL', 2)
+    def test_resume_zip_after_partially_written_entry(self):
+        """
+        A failure while an entry is being written restores the archive to the last checkpoint.
+        """
+        file_content = b'file_content'
+
+        class InterruptedFile(BytesIO):
+            def read(self, *args, **kwargs):
+                if self.tell():
+                    raise OSError('Interrupted')
+                return super().read(1)
+
+        def interrupted_download(key):
+            return InterruptedFile(file_content) if key == self.file_key_2 else BytesIO(file_content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'submissions.zip')
+
+            with patch(
+                'openassessment.data.OraDownloadData._download_file_by_key', side_effect=interrupted_download
+            ):
+                with self.assertRaises(OSError):
+                    OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            with zipfile.ZipFile(archive_path) as zip_file:
+                self.assertEqual(
+                    zip_file.namelist(), [file_data['file_path'] for file_data in self.submission_files_data[:4]]
+                )
+
+            with patch(
+                'openassessment.data.OraDownloadData._download_file_by_key',
+                side_effect=lambda key: BytesIO(file_content)
+            ):
+                OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            with zipfile.ZipFile(archive_path) as zip_file:
+                self.assertIsNone(zip_file.testzip())
+                self.assertEqual(
+                    zip_file.namelist(),
+                    [file_data['file_path'] for file_data in self.submission_files_data] + ['submissions.csv']
+                )
+                self.assertEqual(zip_file.read(self.submission_files_data[5]['file_path']), file_content)
+
+    @patch.object(OraDownloadData, 'CHECKPOINT_INTERVAL', 2)
+    def test_resume_zip_after_crash(self):
+        """
+        An archive left with data written past its last checkpoint is restored before being resumed.
+        """
+        file_content = b'file_content'
+
+        def failing_download(key):
+            if key == self.file_key_2:
+                raise RuntimeError('Connection reset')
+            return BytesIO(file_content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'submissions.zip')
+            with patch('openassessment.data.OraDownloadData._download_file_by_key', side_effect=failing_download):
+                with self.assertRaises(RuntimeError):
+                    OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            # A killed process leaves the start of a new entry over the central directory
+            with zipfile.ZipFile(archive_path) as zip_file:
+                central_directory_offset = zip_file.start_dir
+            with open(archive_path, 'r+b') as archive:
+                archive.seek(central_directory_offset)
+                archive.write(b'PK\x03\x04' + b'\x00' * 1000)
+
+            with patch(
+                'openassessment.data.OraDownloadData._download_file_by_key',
+                side_effect=lambda key: BytesIO(file_content)
+            ):
+                OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            with zipfile.ZipFile(archive_path) as zip_file:
+                self.assertIsNone(zip_file.testzip())
+                self.assertEqual(
+                    zip_file.namelist(),
+                    [file_data['file_path'] for file_data in self.submission_files_data] + ['submissions.csv']
+                )
+            self.assertEqual(os.listdir(directory), ['submissions.zip'])
+
+    @patch.object(OraDownloadData, 'CHECKPOINT_INTERVAL', 2)
+    def test_resume_zip_without_archive(self):
+        """
+        A manifest left without its archive is ignored, and the archive is built from scratch.
+        """
+        file_content = b'file_content'
+
+        def failing_download(key):
+            if key == self.file_key_2:
+                raise RuntimeError('Connection reset')
+            return BytesIO(file_content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            archive_path = os.path.join(directory, 'submissions.zip')
+            with patch('openassessment.data.OraDownloadData._download_file_by_key', side_effect=failing_download):
+                with self.assertRaises(RuntimeError):
+                    OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+            os.remove(archive_path)
+
+            with patch(
+                'openassessment.data.OraDownloadData._download_file_by_key',
+                side_effect=lambda key: BytesIO(file_content)
+            ):
+                OraDownloadData.create_resumable_zip_with_attachments(archive_path, self.submission_files_data)
+
+            with zipfile.ZipFile(archive_path) as zip_file:
+                self.assertEqual(
+                    zip_file.namelist(),
+                    [file_data['file_path'] for file_data in self.submission_files_data] + ['submissions.csv']
+                )
+
+    def test_create_zip_with_attachments_stats(self):
+        stats = ExportStats()
+        file = BytesIO()
+
+        with patch(
+            'openassessment.data.OraDownloadData._download_file_by_key', side_effect=lambda key: BytesIO(b'content')
+        ):
+            OraDownloadData.create_zip_with_attachments(file, self.submission_files_data, stats=stats)
+
+        self.assertEqual(stats.phases['archive'].rows, len(self.submission_files_data))
+        self.assertEqual(stats.phases['archive'].bytes, len(file.getvalue()))
+        self.assertEqual(len(stats.download_latencies), 5)
+
+    @patch.object(OraDownloadData, 'DOWNLOAD_WORKERS', 1)
+    def test_download_attachments_window(self):
+        """
+        Downloads are started ahead of time, but never more than twice
+        the number of workers, and are yielded in the original order.
+        """
+        files_data = [
+            {'type': OraDownloadData.ATTACHMENT, 'key': f'key_{index}'} for index in range(5)
+        ] + [{'type': OraDownloadData.TEXT, 'key': ''}]
+        executor = Mock()
+
+        # pylint: disable=protected-access
+        downloads = OraDownloadData._download_attachments(iter(files_data), executor)
+        first_file_data, _ = next(downloads)
+
+        self.assertEqual(first_file_data, files_data[0])
+        self.assertEqual(executor.submit.call_count, 3)
+
+        remaining = list(downloads)
+        self.assertEqual([file_data for file_data, _ in remaining], files_data[1:])
+        self.assertIsNone(remaining[-1][1])
+        self.assertEqual(executor.submit.call_count, 5)
+
+    @patch.object(OraDownloadData, 'DOWNLOAD_WORKERS', 1)
+    def test_download_attachments_closed_early(self):
+        """
+        Closing the generator early cancels the pending downloads, and closes the files of the finished ones.
+        """
+        files_data = [{'type': OraDownloadData.ATTACHMENT, 'key': f'key_{index}'} for index in range(3)]
+        finished = Future()
+        finished.set_result(BytesIO(b'content'))
+        running, queued = Mock(), Mock()
+        running.cancel.return_value = False
+        queued.cancel.return_value = True
+        executor = Mock()
+        executor.submit.side_effect = [Mock(), running, queued]
+
+        # pylint: disable=protected-access
+        downloads = OraDownloadData._download_attachments(iter(files_data), executor)
+        next(downloads)
+        downloads.close()
+
+        running.add_done_callback.assert_called_once()
+        queued.add_done_callback.assert_not_called()
+
+        # The callback closes the file once the download finishes
+        close_file = running.add_done_callback.call_args[0][0]
+        close_file(finished)
+        self.assertTrue(finished.result().closed)
+
     @ddt.data(
         (
             "Section",
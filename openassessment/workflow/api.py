@@ -4,11 +4,14 @@ Public interface for the Assessment Workflow.
 """
 import logging
 
+from django.core.cache import cache
 from django.db import DatabaseError
 
 from submissions import api as sub_api
 from openassessment.assessment.errors import PeerAssessmentError, PeerAssessmentInternalError
 
+from .cache import WORKFLOW_CACHE_TIMEOUT, bump_workflow_version, get_workflow_version, workflow_cache_key
+from .context import WorkflowUpdateContext
 from .errors import (AssessmentWorkflowError, AssessmentWorkflowInternalError, AssessmentWorkflowNotFoundError,
                      AssessmentWorkflowRequestError)
 from .models import AssessmentWorkflow, AssessmentWorkflowCancellation
@@ -104,7 +107,10 @@ def get_workflow_for_submission(submission_uuid, assessment_requirements, course
     """Returns Assessment Workflow information
 
     This will implicitly call `update_from_assessments()` to make sure we
-    give the most current information. Unlike `create_workflow()`, this function
+    give the most current information, unless nothing the workflow depends on
+    has changed since it was last read with the same requirements, in which
+    case the cached workflow is returned (see `openassessment.workflow.cache`).
+    Unlike `create_workflow()`, this function
     will check our assessment sequences to see if they are complete. We pass
     in the `assessment_requirements` each time we make the request because the
     canonical requirements are stored in the `OpenAssessmentBlock` problem
@@ -175,7 +181,19 @@ def get_workflow_for_submission(submission_uuid, assessment_requirements, course
         }
 
     """
-    return update_from_assessments(submission_uuid, assessment_requirements, course_settings)
+    # Read the stamp before updating, so that a change made during the update
+    # invalidates the workflow cached below.
+    version = get_workflow_version(submission_uuid)
+    cache_key = workflow_cache_key(submission_uuid, assessment_requirements, course_settings)
+    if version is not None:
+        cached = cache.get(cache_key)
+        if cached is not None and cached['version'] == version:
+            return cached['workflow']
+
+    workflow = _update_from_assessments(submission_uuid, assessment_requirements, course_settings)
+    if version is not None:
+        cache.set(cache_key, {'version': version, 'workflow': workflow}, WORKFLOW_CACHE_TIMEOUT)
+    return workflow
 
 
 def update_from_assessments(
@@ -271,14 +289,38 @@ def update_from_assessments(
             }
         }
 
+    """
+    serialized = _update_from_assessments(
+        submission_uuid,
+        assessment_requirements,
+        course_settings,
+        override_submitter_requirements
+    )
+    bump_workflow_version(submission_uuid)
+    return serialized
+
+
+def _update_from_assessments(
+    submission_uuid,
+    assessment_requirements,
+    course_settings,
+    override_submitter_requirements=False
+):
+    """
+    Update the workflow and serialize it, without invalidating its cached copies.
+
+    See `update_from_assessments()` for the arguments and return value.
     """
     workflow = _get_workflow_model(submission_uuid)
 
     try:
+        # The data loaded to update the workflow is reused for its status details.
+        context = WorkflowUpdateContext(submission_uuid)
         workflow.update_from_assessments(
             assessment_requirements,
             course_settings,
-            override_submitter_requirements
+            override_submitter_requirements,
+            context=context
         )
         logger.info(
             "Updated workflow for submission UUID %s with requirements %s and course setttings %s",
@@ -286,7 +328,7 @@ def update_from_assessments(
             assessment_requirements,
             course_settings
         )
-        return _serialized_with_details(workflow)
+        return _serialized_with_details(workflow, context)
     except PeerAssessmentError as err:
         err_msg = "Could not update assessment workflow: %s"
         logger.exception(err_msg, err)
@@ -385,12 +427,12 @@ def _get_workflow_model(submission_uuid):
     return workflow
 
 
-def _serialized_with_details(workflow):
+def _serialized_with_details(workflow, context=None):
     """
     Given a workflow, return its serialized version with added status details.
     """
     data_dict = AssessmentWorkflowSerializer(workflow).data
-    data_dict["status_details"] = workflow.status_details()
+    data_dict["status_details"] = workflow.status_details(context)
     return data_dict
 
 
@@ -422,6 +464,7 @@ def cancel_workflow(submission_uuid, comments, cancelled_by_id, assessment_requi
         assessment_requirements,
         course_settings
     )
+    bump_workflow_version(submission_uuid)
 
 
 def get_assessment_workflow_cancellation(submission_uuid):
@@ -0,0 +1,90 @@
+"""
+Change detection for assessment workflows.
+
+Every submission has a version stamp in the cache, dropped whenever something
+its workflow depends on changes (an assessment of the submission or by its
+author, a score, a workflow update or cancellation). A serialized workflow is cached
+together with the stamp it was computed under, so it can be served as is
+for as long as the stamp has not moved.
+"""
+import hashlib
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.timezone import now
+
+# How long, in seconds, version stamps and serialized workflows are kept.
+WORKFLOW_CACHE_TIMEOUT = getattr(settings, "ORA_WORKFLOW_CACHE_TIMEOUT", 60 * 60)
+
+
+def _version_cache_key(submission_uuid):
+    """
+    Cache key of the version stamp of a submission's workflow.
+    """
+    return f"workflow.version.{submission_uuid}"
+
+
+def get_workflow_version(submission_uuid):
+    """
+    Return the current version stamp of a submission's workflow, creating one if needed.
+
+    Args:
+        submission_uuid (str): The submission tracked by the workflow.
+
+    Returns:
+        str, or None if the cache cannot store the stamp.
+    """
+    key = _version_cache_key(submission_uuid)
+    version = cache.get(key)
+    if version is None:
+        # Only one of concurrent requests creates the stamp; the others read it.
+        cache.add(key, uuid4().hex, WORKFLOW_CACHE_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_workflow_version(*submission_uuids):
+    """
+    Record that the workflows of the given submissions may have changed.
+
+    Their cached serialized workflows are not served anymore, and the next
+    read recomputes them.  Inside a transaction, the stamps are dropped right
+    away, for the reads made in the transaction, and again once it commits:
+    until then, concurrent requests still read the previous data, and may have
+    cached a workflow computed from it under a new stamp.
+
+    Args:
+        submission_uuids (str): The submissions tracked by the workflows.
+    """
+    keys = [_version_cache_key(submission_uuid) for submission_uuid in submission_uuids]
+    cache.delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def workflow_cache_key(submission_uuid, assessment_requirements, course_settings):
+    """
+    Cache key of a submission's serialized workflow, updated with the given requirements.
+
+    The key includes the current date, since whether flexible peer grading
+    applies depends on the age of the submission.
+
+    Args:
+        submission_uuid (str): The submission tracked by the workflow.
+        assessment_requirements (dict): The requirements of each assessment step.
+        course_settings (dict): The course-level settings of the workflow update.
+
+    Returns:
+        str
+    """
+    fingerprint = hashlib.sha1(
+        json.dumps(
+            [assessment_requirements, course_settings, now().date()],
+            sort_keys=True,
+            default=str,
+        ).encode('utf-8')
+    ).hexdigest()
+    return f"workflow.serialized.{submission_uuid}.{fingerprint}"
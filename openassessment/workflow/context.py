@@ -0,0 +1,139 @@
+"""
+Data shared by the assessment step APIs while an assessment workflow is updated.
+
+A single `AssessmentWorkflow.update_from_assessments` call asks every step API
+whether the submitter and the assessments are finished, whether the step can be
+skipped or started, and for a score, and most of those questions need the same
+peer workflow, submission and assessments. The workflow creates one
+`WorkflowUpdateContext` per update and hands it to the step APIs that accept a
+`context` keyword argument, so each piece of data is loaded at most once.
+"""
+from submissions import api as sub_api
+
+from openassessment.assessment.models import Assessment, PeerWorkflow
+from openassessment.assessment.score_type_constants import PEER_TYPE, SELF_TYPE, STAFF_TYPE
+
+
+class WorkflowUpdateContext:
+    """
+    Lazily loaded data about one submission, kept for the duration of a workflow update.
+
+    Every value is loaded on first access and then reused. Step APIs that
+    change the underlying data (for example by creating the peer workflow)
+    must call `invalidate` so that later steps see the change.
+    """
+
+    def __init__(self, submission_uuid, steps=None):
+        """
+        Args:
+            submission_uuid (str): The submission tracked by the workflow being updated.
+            steps (list): The workflow's `AssessmentWorkflowStep` models, if already loaded.
+        """
+        self.submission_uuid = submission_uuid
+        self.steps = steps
+        self._values = {}
+
+    def _get(self, key, loader):
+        """
+        Return the value stored under `key`, loading it with `loader` the first time.
+        """
+        if key not in self._values:
+            self._values[key] = loader()
+        return self._values[key]
+
+    def is_loaded(self, key):
+        """
+        Whether the value of the property `key` has been loaded already.
+        """
+        return key in self._values
+
+    def invalidate(self, *keys):
+        """
+        Forget the given values (or all of them if no key is given) so they are loaded again.
+
+        Args:
+            keys (str): Names of the properties to reload, e.g. "peer_workflow".
+        """
+        if not keys:
+            self._values.clear()
+        for key in keys:
+            self._values.pop(key, None)
+        if "peer_workflow" in keys:
+            self._values.pop("peer_graded_by_items", None)
+            self._values.pop("peers_graded_count", None)
+
+    @property
+    def submission(self):
+        """
+        The serialized submission, with its student item.
+        """
+        return self._get(
+            "submission", lambda: sub_api.get_submission_and_student(self.submission_uuid)
+        )
+
+    @property
+    def peer_workflow(self):
+        """
+        The `PeerWorkflow` of the submission, or None if peer assessment has not started.
+        """
+        return self._get("peer_workflow", lambda: PeerWorkflow.get_by_submission_uuid(self.submission_uuid))
+
+    @property
+    def peer_graded_by_items(self):
+        """
+        The `PeerWorkflowItem`s of the peer assessments the submission received, latest first.
+        """
+        def load():
+            if self.peer_workflow is None:
+                return []
+            return list(
+                self.peer_workflow.graded_by.filter(
+                    assessment__submission_uuid=self.submission_uuid,
+                    assessment__score_type=PEER_TYPE
+                ).select_related('assessment').order_by('-assessment')
+            )
+        return self._get("peer_graded_by_items", load)
+
+    @property
+    def peers_graded_count(self):
+        """
+        The number of peers the submitter has assessed.
+        """
+        def load():
+            if self.peer_workflow is None:
+                return 0
+            return self.peer_workflow.num_peers_graded()
+        return self._get("peers_graded_count", load)
+
+    @property
+    def self_and_staff_assessments(self):
+        """
+        The self and staff `Assessment`s of the submission, latest first.
+        """
+        return self._get(
+            "self_and_staff_assessments",
+            lambda: list(
+                Assessment.objects.filter(
+                    submission_uuid=self.submission_uuid,
+                    score_type__in=[SELF_TYPE, STAFF_TYPE],
+                ).order_by('-scored_at', '-id')
+            )
+        )
+
+    def latest_assessment(self, score_type):
+        """
+        The latest self or staff `Assessment` of the submission.
+
+        Args:
+            score_type (str): Either `SELF_TYPE` or `STAFF_TYPE`.
+
+        Returns:
+            Assessment or None
+        """
+        return next(
+            (
+                assessment for assessment in self.self_and_staff_assessments
+                if assessment.score_type == score_type
+            ),
+            None
+        )
@@ -12,11 +12,13 @@ need to then generate a matching migration for it using:
 
 
 import importlib
+import inspect
 import logging
 from uuid import uuid4
 
 from django.conf import settings
 from django.db import DatabaseError, models, transaction
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils.timezone import now
 
@@ -26,10 +28,14 @@ from model_utils import Choices
 from model_utils.models import StatusModel, TimeStampedModel
 
 from submissions import api as sub_api, team_api as sub_team_api
+from submissions.models import Submission, score_reset, score_set
 from openassessment.assessment.errors.base import AssessmentError
+from openassessment.assessment.models import Assessment, PeerWorkflow, PeerWorkflowItem
 from openassessment.assessment.signals import assessment_complete_signal
 from openassessment.xblock.utils.notifications import send_grade_assigned_notification
 
+from .cache import bump_workflow_version
+from .context import WorkflowUpdateContext
 from .errors import AssessmentApiLoadError, AssessmentWorkflowError, AssessmentWorkflowInternalError
 
 logger = logging.getLogger('openassessment.workflow.models')  # pylint: disable=invalid-name
@@ -51,6 +57,32 @@ ASSESSMENT_API_DICT = getattr(
 )
 
 
+def call_step_api(func, *args, context=None):
+    """
+    Call an assessment API function, handing it the workflow update context if it accepts one.
+
+    Assessment APIs are configured in the Django settings, so not all of them
+    take a `context` keyword argument.
+
+    Args:
+        func (callable): The assessment API function.
+        args: The positional arguments of the function.
+
+    Keyword Arguments:
+        context (WorkflowUpdateContext): The data preloaded for the current workflow update.
+
+    Returns:
+        The result of the function.
+    """
+    if context is not None:
+        parameters = inspect.signature(func).parameters
+        if 'context' in parameters or any(
+            parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()
+        ):
+            return func(*args, context=context)
+    return func(*args)
+
+
 class AssessmentWorkflow(TimeStampedModel, StatusModel):
     """Tracks the open-ended assessment status of a student submission.
 
@@ -224,7 +256,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             score = sub_api.get_latest_score_for_submission(self.submission_uuid)
         return score
 
-    def status_details(self):
+    def status_details(self, context=None):
         """
         Returns workflow status in the form of a dictionary. Each step in the
         workflow is a key, and each key maps to a dictionary defining whether
@@ -234,9 +266,12 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         For the 'peer' step there will be extra keys in its mapped dictionary:
         - 'peers_graded_count': how many peers the submitter has assessed
         - 'graded_by_count': how many peers the submitter been assessed by
+
+        Args:
+            context (WorkflowUpdateContext): Optional data preloaded by a workflow update.
         """
         status_dict = {}
-        steps = self._get_steps()
+        steps = self._get_steps(context)
         for step in steps:
             status_dict[step.name] = {
                 "complete": step.is_submitter_complete(),
@@ -245,13 +280,17 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             }
             if step.name == 'peer':
                 # the number passed here is arbitrary and ignored
-                _, peers_graded_count = step.api().has_finished_required_evaluating(self.submission_uuid, 1)
-                graded_by_count = step.api().get_graded_by_count(self.submission_uuid)
+                _, peers_graded_count = call_step_api(
+                    step.api().has_finished_required_evaluating, self.submission_uuid, 1, context=context
+                )
+                graded_by_count = call_step_api(
+                    step.api().get_graded_by_count, self.submission_uuid, context=context
+                )
                 status_dict[step.name]['peers_graded_count'] = peers_graded_count
                 status_dict[step.name]['graded_by_count'] = graded_by_count
         return status_dict
 
-    def get_score(self, assessment_requirements, course_settings, step_for_name):
+    def get_score(self, assessment_requirements, course_settings, step_for_name, context=None):
         """Iterate through the assessment APIs in priority order
          and return the first reported score.
 
@@ -262,6 +301,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                 met.  Note that the requirements could change if the author
                 updates the problem definition.
             step_for_name (dict): a key value pair for step name: step
+            context (WorkflowUpdateContext): Optional data preloaded by a workflow update.
 
         Returns:
              score dict.
@@ -283,7 +323,9 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                         step_requirements = None
                     else:
                         step_requirements = assessment_requirements.get(assessment_step_name, {})
-                    score = get_score_func(self.identifying_uuid, step_requirements, course_settings)
+                    score = call_step_api(
+                        get_score_func, self.identifying_uuid, step_requirements, course_settings, context=context
+                    )
                     if not score and assessment_step.is_staff_step():
                         if step_requirements and step_requirements.get('required', False):
                             break  # A staff score was not found, and one is required. Return None
@@ -296,7 +338,8 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         self,
         assessment_requirements,
         course_settings,
-        override_submitter_requirements=False
+        override_submitter_requirements=False,
+        context=None
     ):
         """Query assessment APIs and change our status if appropriate.
 
@@ -341,19 +384,26 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             override_submitter_requirements (bool): If True, the presence of a new
                 staff score will cause all of the submitter's requirements to be
                 fulfilled, moving the workflow to DONE and exposing their grade.
+            context (WorkflowUpdateContext): Optional context to preload the data
+                the assessment APIs need into. It can be passed on to
+                `status_details` afterwards. A new one is used if not given.
         """
         if self.status == self.STATUS.cancelled:
             return
 
+        if context is None:
+            context = WorkflowUpdateContext(self.submission_uuid)
+
         # Update our AssessmentWorkflowStep models with the latest from our APIs
-        steps = self._get_steps()
+        steps = self._get_steps(context)
 
         step_for_name = {step.name: step for step in steps}
 
         new_staff_score = self.get_score(
             assessment_requirements,
             course_settings,
-            {self.STAFF_STEP_NAME: step_for_name.get(self.STAFF_STEP_NAME, None)}
+            {self.STAFF_STEP_NAME: step_for_name.get(self.STAFF_STEP_NAME, None)},
+            context
         )
         if new_staff_score:
             # new_staff_score is just the most recent staff score, it may already be recorded in sub_api
@@ -365,7 +415,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                     ] or old_score['points_earned'] != new_staff_score['points_earned']
             ):
                 # Set the staff score using submissions api, and log that fact
-                self.set_staff_score(new_staff_score)
+                self.set_staff_score(new_staff_score, context=context)
                 self.save()
                 logger.info(
                     "Workflow for submission UUID %s has updated score using %s assessment.",
@@ -382,8 +432,8 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                         step.submitter_completed_at = common_now
                     step.save()
                 if self.status == self.STATUS.done:
-                    score = self.get_score(assessment_requirements, course_settings, step_for_name)
-                    submission_dict = sub_api.get_submission_and_student(self.submission_uuid)
+                    score = self.get_score(assessment_requirements, course_settings, step_for_name, context)
+                    submission_dict = context.submission
                     if submission_dict['student_item']['student_id']:
                         send_grade_assigned_notification(self.item_id,
                                                          submission_dict['student_item']['student_id'], score)
@@ -394,7 +444,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
 
         # Go through each step and update its status.
         for step in steps:
-            step.update(self.submission_uuid, assessment_requirements, course_settings)
+            step.update(self.submission_uuid, assessment_requirements, course_settings, context)
 
         possible_statuses = []
         skipped_statuses = []
@@ -404,7 +454,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         for step in steps:
             all_statuses.append(step.name)
             if step.submitter_completed_at is None:
-                if step.can_skip(self.submission_uuid, assessment_requirements):
+                if step.can_skip(self.submission_uuid, assessment_requirements, context):
                     skipped_statuses.append(step.name)
                 else:
                     possible_statuses.append(step.name)
@@ -426,7 +476,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                 if self.status in all_statuses and all_statuses.index(self.status) >= all_statuses.index(step_name):
                     skip_step.skip()
                     # skiping an assessment step should also start it
-                    skip_step.start(self.submission_uuid)
+                    skip_step.start(self.submission_uuid, context)
 
         new_status = next(
             iter(possible_statuses),
@@ -437,25 +487,19 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         # appropriate assessment API.
         new_step = step_for_name.get(new_status)
         if new_step is not None:
-            new_step.start(self.submission_uuid)
-
-        # If the submitter is beginning the next assessment, notify the
-        # appropriate assessment API.
-        new_step = step_for_name.get(new_status)
-        if new_step is not None:
-            new_step.start(self.submission_uuid)
+            new_step.start(self.submission_uuid, context)
 
         # If the submitter has done all they need to do, let's check to see if
         # all steps have been fully assessed (i.e. we can score it).
         if new_status == self.STATUS.waiting and all(step.assessment_completed_at for step in steps):
-            score = self.get_score(assessment_requirements, course_settings, step_for_name)
+            score = self.get_score(assessment_requirements, course_settings, step_for_name, context)
             # If we found a score, then we're done
             if score is not None:
                 # Only set the score if it's not a staff score, in which case it will have already been set above
                 if score.get("staff_id") is None:
-                    self.set_score(score)
+                    self.set_score(score, context=context)
                 new_status = self.STATUS.done
-                submission_dict = sub_api.get_submission_and_student(self.submission_uuid)
+                submission_dict = context.submission
                 if submission_dict['student_item']['student_id']:
                     send_grade_assigned_notification(self.item_id, submission_dict['student_item']['student_id'], score)
 
@@ -469,16 +513,39 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                 new_status
             )
 
-    def _get_steps(self):
+    def _get_steps(self, context=None):
         """
         Simple helper function for retrieving all the steps in the given
         Workflow.
+
+        Args:
+            context (WorkflowUpdateContext): Optional data preloaded by a workflow
+                update. The steps are loaded into it the first time.
+        """
+        if context is not None and context.steps is not None:
+            return context.steps
+
+        all_steps = list(self.steps.all())
+        # Do not return steps that are not recognized in the AssessmentWorkflow.
+        steps = [step for step in all_steps if step.name in AssessmentWorkflow.STEPS]
+        if not steps or not any(step.name == self.STATUS.staff for step in all_steps):
+            steps = self._add_missing_steps(all_steps)
+
+        if context is not None:
+            context.steps = steps
+        return steps
+
+    def _add_missing_steps(self, all_steps):
+        """
+        Add the staff step, or default steps, that older workflows may be missing,
+        and return the steps recognized in the AssessmentWorkflow.
+
+        Args:
+            all_steps (list): The steps of the workflow, before any is added.
         """
         # A staff step must always be available, to allow for staff overrides
-        try:
-            self.steps.get(name=self.STATUS.staff)
-        except AssessmentWorkflowStep.DoesNotExist:
-            for step in list(self.steps.all()):
+        if not any(step.name == self.STATUS.staff for step in all_steps):
+            for step in all_steps:
                 step.order_num += 1
             staff_step, _ = AssessmentWorkflowStep.objects.get_or_create(
                 name=self.STATUS.staff,
@@ -504,7 +571,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
 
         return steps
 
-    def set_staff_score(self, score, reason=None):
+    def set_staff_score(self, score, reason=None, context=None):
         """
         Set a staff score for the workflow.
 
@@ -516,11 +583,15 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             is_override (bool): Optionally True if staff is overriding a previous score.
             reason (string): An optional parameter specifying the reason for the staff grade. A default value
                 will be used in the event that this parameter is not provided.
+            context (WorkflowUpdateContext): Optional data preloaded by a workflow update.
 
         """
         if reason is None:
             reason = "A staff member has defined the score for this submission"
-        sub_dict = sub_api.get_submission_and_student(self.submission_uuid)
+        if context is not None:
+            sub_dict = context.submission
+        else:
+            sub_dict = sub_api.get_submission_and_student(self.submission_uuid)
         sub_api.reset_score(
             sub_dict['student_item']['student_id'],
             self.course_id,
@@ -536,7 +607,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             annotation_reason=reason
         )
 
-    def set_score(self, score):
+    def set_score(self, score, context=None):
         """
         Set a score for the workflow.
 
@@ -546,20 +617,24 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         Args:
             score (dict): A dict containing 'points_earned' and
                 'points_possible'.
+            context (WorkflowUpdateContext): Optional data preloaded by a workflow update.
 
         """
-        if not self.staff_score_exists():
+        if not self.staff_score_exists(context):
             sub_api.set_score(
                 self.submission_uuid,
                 score["points_earned"],
                 score["points_possible"]
             )
 
-    def staff_score_exists(self):
+    def staff_score_exists(self, context=None):
         """
         Check if a staff score exists for this submission.
+
+        Args:
+            context (WorkflowUpdateContext): Optional data preloaded by a workflow update.
         """
-        steps = self._get_steps()
+        steps = self._get_steps(context)
         step_for_name = {step.name: step for step in steps}
         staff_step = step_for_name.get(self.STAFF_STEP_NAME)
         if staff_step is not None:
@@ -770,7 +845,7 @@ class TeamAssessmentWorkflow(AssessmentWorkflow):
     def _team_staff_step(self):
         return self._get_steps()[0]
 
-    def _get_steps(self):
+    def _get_steps(self, context=None):  # pylint: disable=unused-argument
         """
         Simple helper function for retrieving all the steps in the given
         TeamAssessmentWorkflow. In this case, it's somewhat trivial, since a
@@ -892,24 +967,24 @@ class AssessmentWorkflowStep(models.Model):
     def is_staff_step(self):
         return self.name in self.staff_step_types
 
-    def can_skip(self, submission_uuid, assessment_requirements):
+    def can_skip(self, submission_uuid, assessment_requirements, context=None):
         if assessment_requirements is None:
             step_reqs = None
         else:
             step_reqs = assessment_requirements.get(self.name)
 
         can_be_skipped = getattr(self.api(), 'can_be_skipped', lambda sid, reqs: False)
-        return can_be_skipped(submission_uuid, step_reqs)
+        return call_step_api(can_be_skipped, submission_uuid, step_reqs, context=context)
 
     def skip(self):
         if not self.skipped:
             self.skipped = True
             self.save()
 
-    def start(self, submission_uuid):
+    def start(self, submission_uuid, context=None):
         on_start_func = getattr(self.api(), 'on_start', None)
         if on_start_func is not None:
-            on_start_func(submission_uuid)
+            call_step_api(on_start_func, submission_uuid, context=context)
 
     def unskip(self):
         if self.skipped:
@@ -954,13 +1029,17 @@ class AssessmentWorkflowStep(models.Model):
             logger.warning(msg)
             return None
 
-    def update(self, submission_uuid, assessment_requirements, course_settings):
+    def update(self, submission_uuid, assessment_requirements, course_settings, context=None):
         """
         Updates the AssessmentWorkflowStep models with the requirements
         specified from the Workflow API.
 
         Intended for internal use by update_from_assessments(). See
         update_from_assessments() documentation for more details.
+
+        Args:
+            context (WorkflowUpdateContext): Optional data preloaded by the workflow update,
+                handed to the assessment API.
         """
         # Once a step is completed, it will not be revisited based on updated requirements.
         step_changed = False
@@ -976,12 +1055,16 @@ class AssessmentWorkflowStep(models.Model):
         assessment_finished = getattr(self.api(), 'assessment_is_finished', default_finished)
 
         # Has the user completed their obligations for this step?
-        if not self.is_submitter_complete() and submitter_finished(submission_uuid, step_reqs):
+        if not self.is_submitter_complete() and call_step_api(
+            submitter_finished, submission_uuid, step_reqs, context=context
+        ):
             self.submitter_completed_at = now()
             step_changed = True
 
         # Has the step received a score?
-        if not self.is_assessment_complete() and assessment_finished(submission_uuid, step_reqs, course_settings):
+        if not self.is_assessment_complete() and call_step_api(
+            assessment_finished, submission_uuid, step_reqs, course_settings, context=context
+        ):
             self.assessment_completed_at = now()
             step_changed = True
 
@@ -1031,6 +1114,62 @@ def update_workflow_async(sender, **kwargs):  # pylint: disable=unused-argument
         logger.exception(msg)
 
 
+@receiver(post_save, sender=Assessment)
+@receiver(post_save, sender=PeerWorkflow)
+@receiver(post_save, sender=AssessmentWorkflow)
+def bump_workflow_version_on_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the cached workflow of the submission a saved model belongs to.
+    """
+    bump_workflow_version(instance.submission_uuid)
+
+
+@receiver(post_save, sender=AssessmentWorkflowStep)
+def bump_workflow_version_on_step_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the cached workflow of a saved step.
+    """
+    bump_workflow_version(instance.workflow.submission_uuid)
+
+
+@receiver(post_save, sender=PeerWorkflowItem)
+def bump_workflow_version_on_peer_item_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the cached workflows of both the author and the scorer of a peer workflow item.
+    """
+    bump_workflow_version(instance.submission_uuid, instance.scorer.submission_uuid)
+
+
+@receiver(score_set)
+@receiver(score_reset)
+def bump_workflow_version_on_score_change(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the cached workflows of a learner whose score was set or reset.
+
+    Scores can be changed without going through the workflow, for example when
+    peer scores are recomputed or when staff reset or override a learner's
+    score from the LMS.
+
+    Keyword Arguments:
+        anonymous_user_id (str): The learner whose score changed.
+        course_id (str): The course of the scored item.
+        item_id (str): The scored item.
+    """
+    try:
+        submission_uuids = Submission.objects.filter(
+            student_item__student_id=kwargs['anonymous_user_id'],
+            student_item__course_id=kwargs['course_id'],
+            student_item__item_id=kwargs['item_id'],
+        ).values_list('uuid', flat=True)
+        bump_workflow_version(*[str(submission_uuid) for submission_uuid in submission_uuids])
+    except DatabaseError:
+        logger.exception(
+            "Database error occurred while invalidating the cached workflows of learner %s for item %s",
+            kwargs['anonymous_user_id'],
+            kwargs['item_id'],
+        )
+
+
 class AssessmentWorkflowCancellation(models.Model):
     """Model for tracking cancellations of assessment workflow.
 
@@ -7,9 +7,12 @@ from django.test.utils import override_settings
 from pytest import raises
 
 import submissions.api as sub_api
+from openassessment.assessment.api import peer as peer_api
+from openassessment.assessment.api import self as self_api
 from openassessment.assessment.models import PeerWorkflow, StudentTrainingWorkflow
 from openassessment.test_utils import CacheResetTest
 import openassessment.workflow.api as workflow_api
+from openassessment.workflow.cache import bump_workflow_version, get_workflow_version
 from openassessment.workflow.errors import AssessmentWorkflowInternalError
 from openassessment.workflow.models import AssessmentWorkflow
 
@@ -227,7 +230,7 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         when there are no assessments in the "completed" peer step.
         """
         with raises(workflow_api.AssessmentWorkflowInternalError):
-            mock_get_workflow.raises = PeerWorkflow.DoesNotExist
+            mock_get_workflow.side_effect = PeerWorkflow.DoesNotExist
             mock_get_staff_score.return_value = {
                 "points_earned": 10,
                 "points_possible": 10,
@@ -301,6 +304,134 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         # This call will throw exceptions if the workflow is in an invalid state
         workflow_api.update_from_assessments(submission["uuid"], {}, {})
 
+    def test_update_query_counts(self):
+        # A refresh of the workflow loads the data the assessment APIs need
+        # once, whatever the number of steps.
+        requirements = {
+            "peer": {"must_grade": 1, "must_be_graded_by": 1},
+            "self": {},
+            "staff": {},
+        }
+        __, submission = self._create_workflow_with_status(
+            "user 1", "test/1/1", "peer-problem", "peer", answer=ANSWER_1
+        )
+        __, other_submission = self._create_workflow_with_status(
+            "user 2", "test/1/1", "peer-problem", "peer", answer=ANSWER_2
+        )
+
+        # The peer step is skipped, which starts the peer workflow
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertEqual(workflow["status"], "self")
+        with self.assertNumQueries(6):
+            workflow_api.update_from_assessments(submission["uuid"], requirements, {})
+
+        # Both learners assess each other, which completes the peer step
+        for scorer_submission, scorer_id in ((submission, "user 1"), (other_submission, "user 2")):
+            peer_api.get_submission_to_assess(scorer_submission["uuid"], 1)
+            peer_api.create_assessment(
+                scorer_submission["uuid"], scorer_id, {"secret": "yes"}, {}, "", RUBRIC_DICT, 1
+            )
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertTrue(workflow["status_details"]["peer"]["complete"])
+        self.assertEqual(workflow["status_details"]["peer"]["graded_by_count"], 1)
+        with self.assertNumQueries(6):
+            workflow_api.update_from_assessments(submission["uuid"], requirements, {})
+
+        # Self assessment completes the workflow
+        self_api.create_assessment(submission["uuid"], "user 1", {"secret": "yes"}, {}, "", RUBRIC_DICT)
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertEqual(workflow["status"], "done")
+        self.assertEqual(workflow["score"]["points_earned"], 1)
+        with self.assertNumQueries(9):
+            workflow_api.update_from_assessments(submission["uuid"], requirements, {})
+
+    def test_get_workflow_skips_unchanged_refresh(self):
+        requirements = {
+            "peer": {"must_grade": 1, "must_be_graded_by": 1},
+            "self": {},
+        }
+        __, submission = self._create_workflow_with_status(
+            "user 1", "test/1/1", "peer-problem", "peer", answer=ANSWER_1
+        )
+        __, other_submission = self._create_workflow_with_status(
+            "user 2", "test/1/1", "peer-problem", "peer", answer=ANSWER_2
+        )
+        # The first read skips the peer step, which changes the workflow, so
+        # the second one refreshes it again
+        workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertEqual(workflow["status"], "self")
+
+        # Nothing changed since, so the cached workflow is served as is
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {}),
+                workflow
+            )
+
+        # Other requirements are never served the cached workflow
+        with patch.object(AssessmentWorkflow, "update_from_assessments") as mock_update:
+            workflow_api.get_workflow_for_submission(submission["uuid"], {"peer": requirements["peer"]}, {})
+        mock_update.assert_called_once()
+
+        # Being assessed by a peer refreshes the workflow
+        peer_api.get_submission_to_assess(other_submission["uuid"], 1)
+        peer_api.create_assessment(
+            other_submission["uuid"], "user 2", {"secret": "yes"}, {}, "", RUBRIC_DICT, 1
+        )
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertEqual(workflow["status_details"]["peer"]["graded_by_count"], 1)
+
+        # So does assessing a peer
+        self.assertFalse(workflow["status_details"]["peer"]["complete"])
+        peer_api.get_submission_to_assess(submission["uuid"], 1)
+        peer_api.create_assessment(
+            submission["uuid"], "user 1", {"secret": "yes"}, {}, "", RUBRIC_DICT, 1
+        )
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertTrue(workflow["status_details"]["peer"]["complete"])
+
+        # And an explicit update
+        workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        workflow_api.update_from_assessments(submission["uuid"], requirements, {})
+        with patch.object(AssessmentWorkflow, "update_from_assessments") as mock_update:
+            workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        mock_update.assert_called_once()
+
+    def test_score_change_refreshes_cached_workflow(self):
+        requirements = {"self": {}}
+        __, submission = self._create_workflow_with_status(
+            "user 1", "test/1/1", "self-problem", "self", steps=["self"]
+        )
+        self_api.create_assessment(submission["uuid"], "user 1", {"secret": "yes"}, {}, "", RUBRIC_DICT)
+        workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertEqual(workflow["status"], "done")
+        self.assertEqual(workflow["score"]["points_earned"], 1)
+
+        # Scores set or reset directly through the submissions API are picked up
+        sub_api.set_score(submission["uuid"], 3, 5)
+        workflow = workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        self.assertEqual(workflow["score"]["points_earned"], 3)
+
+        workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        sub_api.reset_score("user 1", "test/1/1", "self-problem")
+        with patch.object(AssessmentWorkflow, "update_from_assessments") as mock_update:
+            workflow_api.get_workflow_for_submission(submission["uuid"], requirements, {})
+        mock_update.assert_called_once()
+
+    def test_bump_workflow_version_on_commit(self):
+        submission_uuid = "submission-uuid"
+        version = get_workflow_version(submission_uuid)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_workflow_version(submission_uuid)
+            # A concurrent read still sees the data as it was before the commit
+            concurrent_version = get_workflow_version(submission_uuid)
+            self.assertNotEqual(concurrent_version, version)
+
+        self.assertNotIn(get_workflow_version(submission_uuid), (version, concurrent_version))
+
     def test_get_status_counts(self):
         # Initially, the counts should all be zero
         counts = workflow_api.get_status_counts(
@@ -8,8 +8,9 @@ from freezegun import freeze_time
 from django.utils.timezone import now
 
 from openassessment.test_utils import CacheResetTest
+from openassessment.workflow.context import WorkflowUpdateContext
 from openassessment.workflow.errors import AssessmentWorkflowInternalError
-from openassessment.workflow.models import TeamAssessmentWorkflow, AssessmentWorkflowStep
+from openassessment.workflow.models import TeamAssessmentWorkflow, AssessmentWorkflowStep, call_step_api
 from openassessment.workflow.test.factories import AssessmentWorkflowStepFactory
 
 
@@ -164,3 +165,40 @@ class TeamAssessmentTest(CacheResetTest):
         self.assertEqual(workflow.status, TeamAssessmentWorkflow.STATUS.done)
         self.assertEqual(workflow._team_staff_step.assessment_completed_at, now())  # pylint: disable=protected-access
         mock_set_team_score.assert_not_called()
+
+
+class CallStepApiTest(CacheResetTest):
+    """ Tests for handing the workflow update context to the assessment APIs """
+
+    def test_context_passed_when_accepted(self):
+        context = WorkflowUpdateContext('submission-uuid')
+
+        def submitter_is_finished(submission_uuid, requirements, context=None):
+            return submission_uuid, requirements, context
+
+        self.assertEqual(
+            call_step_api(submitter_is_finished, 'submission-uuid', {}, context=context),
+            ('submission-uuid', {}, context)
+        )
+
+    def test_context_not_passed_when_not_accepted(self):
+        def submitter_is_finished(submission_uuid, requirements):
+            return submission_uuid, requirements
+
+        self.assertEqual(
+            call_step_api(submitter_is_finished, 'submission-uuid', {}, context=WorkflowUpdateContext('uuid')),
+            ('submission-uuid', {})
+        )
+
+    def test_context_values_loaded_once(self):
+        context = WorkflowUpdateContext('submission-uuid')
+        with self.assertNumQueries(1):
+            self.assertIsNone(context.peer_workflow)
+            self.assertIsNone(context.peer_workflow)
+            self.assertEqual(context.peer_graded_by_items, [])
+            self.assertEqual(context.peers_graded_count, 0)
+
+        context.invalidate('peer_workflow')
+        self.assertFalse(context.is_loaded('peer_workflow'))
+        with self.assertNumQueries(1):
+            self.assertIsNone(context.peer_workflow)
@@ -4,6 +4,7 @@ Grade step in the OpenAssessment XBlock.
 
 
 import copy
+from itertools import islice
 
 from lazy import lazy
 from xblock.core import XBlock
@@ -296,7 +297,9 @@ class GradeMixin:
                 for assessment in assessments
             )
 
-        max_scores = peer_api.get_rubric_max_scores(submission_uuid)
+        max_scores = peer_api.get_rubric_max_scores(
+            submission_uuid, (peer_assessments or []) + [self_assessment, staff_assessment]
+        )
         median_scores = None
         assessment_steps = self.assessment_steps
         if staff_assessment:
@@ -761,12 +764,24 @@ class GradeMixin:
 
         xblock_id = self.get_xblock_id()
         num_rows = 0
-        for user_state in user_state_iterator:
-            submission_uuid = user_state.state.get('submission_uuid')
-            for row in OraAggregateData.generate_assessment_data(xblock_id, submission_uuid):
-                num_rows += 1
-                yield (user_state.username, row)
-
-            if limit_responses is not None and num_rows >= limit_responses:
-                # End the iterator here
-                break
+        user_states = iter(user_state_iterator)
+        chunk_size = OraAggregateData.BULK_CHUNK_SIZE
+        if limit_responses is not None:
+            chunk_size = max(min(chunk_size, limit_responses), 1)
+        # User states are processed in chunks, so that the data of all the
+        # submissions in a chunk can be loaded at once.
+        while True:
+            user_states_chunk = list(islice(user_states, chunk_size))
+            if not user_states_chunk:
+                return
+
+            submission_uuids = [user_state.state.get('submission_uuid') for user_state in user_states_chunk]
+            rows_by_user = OraAggregateData.bulk_generate_assessment_data(xblock_id, submission_uuids)
+            for user_state, rows in zip(user_states_chunk, rows_by_user):
+                for row in rows:
+                    num_rows += 1
+                    yield (user_state.username, row)
+
+                if limit_responses is not None and num_rows >= limit_responses:
+                    # End the iterator here
+                    return
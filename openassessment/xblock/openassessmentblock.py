@@ -565,10 +565,11 @@ class OpenAssessmentBlock(
         """
         # On page load, update the workflow status.
         # We need to do this here because peers may have graded us, in which
-        # case we may have a score available.
+        # case we may have a score available.  The update is skipped if
+        # nothing has changed since the workflow was last read.
 
         try:
-            self.update_workflow_status()
+            self.update_workflow_status(skip_if_unchanged=True)
         except AssessmentWorkflowError:
             # Log the exception, but continue loading the page
             logger.exception('An error occurred while updating the workflow on page load.')
@@ -619,10 +620,11 @@ class OpenAssessmentBlock(
         """
         # On page load, update the workflow status.
         # We need to do this here because peers may have graded us, in which
-        # case we may have a score available.
+        # case we may have a score available.  The update is skipped if
+        # nothing has changed since the workflow was last read.
 
         try:
-            self.update_workflow_status()
+            self.update_workflow_status(skip_if_unchanged=True)
         except AssessmentWorkflowError:
             # Log the exception, but continue loading the page
             logger.exception('An error occurred while updating the workflow on page load.')
@@ -594,7 +594,9 @@ class StaffAreaMixin:
         })
 
         if peer_assessments or self_assessment or staff_assessment:
-            max_scores = peer_api.get_rubric_max_scores(submission_uuid)
+            max_scores = peer_api.get_rubric_max_scores(
+                submission_uuid, (peer_assessments or []) + [self_assessment, staff_assessment]
+            )
             for criterion in context["rubric_criteria"]:
                 criterion["total_value"] = max_scores[criterion["name"]]
 
@@ -5,10 +5,12 @@ Tests for grade handlers in Open Assessment XBlock.
 
 import copy
 import json
+from unittest.mock import Mock, patch
 
 import ddt
 
 from openassessment.assessment.api import peer as peer_api
+from openassessment.data import OraAggregateData
 
 from .base import (
     PEER_ASSESSMENTS,
@@ -520,3 +522,29 @@ class TestGrade(XBlockHandlerTestCase, SubmitAssessmentsMixin, SubmissionTestMix
                 self.assertEqual(assessment['criterion']['label'], expected_criterion_label)
                 expected_option_label = option_labels[(assessment['criterion']['name'], assessment['option']['name'])]
                 self.assertEqual(assessment['option']['label'], expected_option_label)
+
+    @scenario('data/grade_scenario.xml', user_id='Greggs')
+    def test_generate_report_data(self, xblock):
+        # Create submissions and assessments
+        self.create_submission_and_assessments(
+            xblock, self.SUBMISSION, self.PEERS, PEER_ASSESSMENTS, SELF_ASSESSMENT
+        )
+        user_states = [
+            Mock(username='Greggs', state={'submission_uuid': xblock.submission_uuid}),
+            Mock(username='Nobody', state={}),
+        ]
+
+        with patch.object(OraAggregateData, 'BULK_CHUNK_SIZE', 1):
+            report = list(xblock.generate_report_data(iter(user_states)))
+
+        expected_rows = list(
+            OraAggregateData.generate_assessment_data(xblock.get_xblock_id(), xblock.submission_uuid)
+        )
+        self.assertEqual(len(expected_rows), 3)
+        self.assertEqual(report, [('Greggs', row) for row in expected_rows] + [
+            ('Nobody', {'Item ID': xblock.get_xblock_id(), 'Submission ID': ''}),
+        ])
+
+        # Rows are only generated up to the limit
+        limited_report = list(xblock.generate_report_data(iter(user_states), limit_responses=1))
+        self.assertEqual(limited_report, [('Greggs', row) for row in expected_rows])
@@ -396,11 +396,13 @@ class TestOpenAssessment(XBlockHandlerTestCase):
         with patch('openassessment.xblock.workflow_mixin.workflow_api') as mock_api:
             self.runtime.render(xblock, "student_view")
             self.assertEqual(mock_api.update_from_assessments.call_count, 0)
+            self.assertEqual(mock_api.get_workflow_for_submission.call_count, 0)
 
         # Simulate one submission made (we have a submission ID)
         xblock.submission_uuid = 'test_submission'
 
-        # Now that we have a submission, the workflow should get updated
+        # Now that we have a submission, the workflow should get updated,
+        # unless nothing changed since it was last read
         with patch('openassessment.xblock.workflow_mixin.workflow_api') as mock_api:
             self.runtime.render(xblock, "student_view")
             expected_reqs = {
@@ -411,7 +413,8 @@ class TestOpenAssessment(XBlockHandlerTestCase):
                     "grading_strategy": "median",
                 }
             }
-            mock_api.update_from_assessments.assert_called_once_with('test_submission', expected_reqs, {})
+            mock_api.get_workflow_for_submission.assert_any_call('test_submission', expected_reqs, {})
+            self.assertEqual(mock_api.update_from_assessments.call_count, 0)
 
     @scenario('data/basic_scenario.xml')
     def test_student_view_workflow_error(self, xblock):
@@ -106,7 +106,7 @@ class WorkflowMixin:
 
         return course_settings
 
-    def update_workflow_status(self, submission_uuid=None):
+    def update_workflow_status(self, submission_uuid=None, skip_if_unchanged=False):
         """
         Update the status of a workflow.  For example, change the status
         from peer-assessment to self-assessment.  Creates a score
@@ -115,6 +115,8 @@ class WorkflowMixin:
         Keyword Arguments:
             submission_uuid (str): The submission associated with the workflow to update.
                 Defaults to the submission created by the current student.
+            skip_if_unchanged (bool): If True, skip the update when nothing the
+                workflow depends on has changed since it was last read.
 
         Returns:
             None
@@ -128,7 +130,10 @@ class WorkflowMixin:
         if submission_uuid is not None:
             requirements = self.workflow_requirements()
             course_settings = self.get_course_workflow_settings()
-            workflow_api.update_from_assessments(submission_uuid, requirements, course_settings)
+            if skip_if_unchanged:
+                workflow_api.get_workflow_for_submission(submission_uuid, requirements, course_settings)
+            else:
+                workflow_api.update_from_assessments(submission_uuid, requirements, course_settings)
 
     def get_workflow_info(self, submission_uuid=None):
         """